@@ -0,0 +1 @@
+"""unbrowsed benchmarks."""
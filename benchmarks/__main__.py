@@ -0,0 +1,204 @@
+"""
+Run the unbrowsed benchmarks.
+
+Usage::
+
+    python -m benchmarks run --nodes 1000 10000 --output results.json
+    python -m benchmarks compare baseline.json results.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from importlib.metadata import version
+
+from unbrowsed import parse_html
+from unbrowsed.index import get_index
+
+from benchmarks.documents import DocumentSpec, generate_document
+from benchmarks.queries import QUERIES
+
+PRESETS = {
+    "quick": [1_000, 10_000],
+    "default": [1_000, 10_000, 100_000],
+    "full": [1_000, 10_000, 100_000, 1_000_000],
+}
+
+
+def measure(function, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings: list[float]) -> dict:
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "runs": timings,
+    }
+
+
+def run_document(spec: DocumentSpec, queries: list[str], repeat: int):
+    """
+    Benchmark the given queries on a document generated from the spec.
+
+    Cold timings run the query on a freshly parsed document, warm timings
+    repeat it on the same tracked document, where its indexes are reused.
+    The outcomes remembered for the document are dropped before each warm
+    run, so that they measure the indexes rather than memo hits.
+    """
+    html = generate_document(spec)
+    parse_timings = measure(lambda: parse_html(html), repeat)
+    dom = parse_html(html)
+    document = {
+        **spec._asdict(),
+        "elements": len(dom.css("*")),
+        "bytes": len(html.encode()),
+        "parse_seconds": summarize(parse_timings),
+    }
+
+    results = []
+    for name in queries:
+        query = QUERIES[name]
+        cold = []
+        for _ in range(repeat):
+            fresh = parse_html(html)
+            cold.extend(measure(lambda: query(fresh), 1))
+        warm_dom = parse_html(html, tracked=True)
+        query(warm_dom)
+        memo = get_index(warm_dom).results
+        warm = []
+        for _ in range(repeat):
+            memo.clear()
+            warm.extend(measure(lambda: query(warm_dom), 1))
+        results.append(
+            {
+                "document": document,
+                "query": name,
+                "cold_seconds": summarize(cold),
+                "warm_seconds": summarize(warm),
+            }
+        )
+        print(
+            f"{spec.nodes:>9} nodes  {name:<28}"
+            f" cold {statistics.median(cold) * 1000:10.2f} ms"
+            f"  warm {statistics.median(warm) * 1000:10.2f} ms",
+            file=sys.stderr,
+        )
+    return results
+
+
+def run(arguments) -> dict:
+    nodes = arguments.nodes or PRESETS[arguments.preset]
+    results = []
+    for count in nodes:
+        spec = DocumentSpec(
+            nodes=count,
+            depth=arguments.depth,
+            table_rows=arguments.table_rows,
+            form_density=arguments.form_density,
+            idref_density=arguments.idref_density,
+            seed=arguments.seed,
+        )
+        results.extend(run_document(spec, arguments.query, arguments.repeat))
+
+    return {
+        "unbrowsed": version("unbrowsed"),
+        "selectolax": version("selectolax"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "results": results,
+    }
+
+
+def result_key(result: dict) -> tuple:
+    document = result["document"]
+    spec = tuple(document[field] for field in DocumentSpec._fields)
+    return spec + (result["query"],)
+
+
+def compare(baseline: dict, current: dict) -> list[dict]:
+    """
+    Compare the median timings of two runs, matching results by document
+    spec and query. A ratio above 1 means the current run is slower.
+    """
+    baseline_results = {
+        result_key(result): result for result in baseline["results"]
+    }
+    rows = []
+    for result in current["results"]:
+        previous = baseline_results.get(result_key(result))
+        if previous is None:
+            continue
+        row = {
+            "nodes": result["document"]["nodes"],
+            "query": result["query"],
+        }
+        for timing in ["cold_seconds", "warm_seconds"]:
+            before = previous[timing]["median"]
+            after = result[timing]["median"]
+            row[timing.replace("seconds", "ratio")] = (
+                after / before if before else None
+            )
+        rows.append(row)
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--nodes", type=int, nargs="+")
+    run_parser.add_argument(
+        "--preset", choices=sorted(PRESETS), default="default"
+    )
+    run_parser.add_argument("--depth", type=int, default=8)
+    run_parser.add_argument("--table-rows", type=int, default=10)
+    run_parser.add_argument("--form-density", type=float, default=0.2)
+    run_parser.add_argument("--idref-density", type=float, default=0.1)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument(
+        "--query",
+        nargs="+",
+        choices=sorted(QUERIES),
+        default=list(QUERIES),
+    )
+    run_parser.add_argument(
+        "--output", type=argparse.FileType("w"), default=sys.stdout
+    )
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare two benchmark results"
+    )
+    compare_parser.add_argument("baseline", type=argparse.FileType())
+    compare_parser.add_argument("current", type=argparse.FileType())
+
+    arguments = parser.parse_args(argv)
+    if arguments.command == "run":
+        json.dump(run(arguments), arguments.output, indent=2)
+        arguments.output.write("\n")
+    else:
+        rows = compare(
+            json.load(arguments.baseline), json.load(arguments.current)
+        )
+        for row in rows:
+            print(json.dumps(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Synthetic HTML documents for the benchmarks."""
+
+import random
+from typing import NamedTuple
+
+NEEDLE_BUTTON = "Needle button"
+NEEDLE_DESCRIPTION = "Needle description"
+NEEDLE_TEXT = "Needle text"
+NEEDLE_LABEL = "Needle label"
+
+
+class DocumentSpec(NamedTuple):
+    """
+    Shape of a generated document.
+
+    Attributes:
+        nodes: Approximate number of elements.
+        depth: Nesting depth of the sections wrapping the content.
+        table_rows: Rows of each generated table.
+        form_density: Fraction of content blocks that are forms.
+        idref_density: Fraction of controls labelled or described through
+                       aria-labelledby / aria-describedby.
+        seed: Seed of the random generator, for reproducible documents.
+    """
+
+    nodes: int = 1000
+    depth: int = 8
+    table_rows: int = 10
+    form_density: float = 0.2
+    idref_density: float = 0.1
+    seed: int = 0
+
+
+def generate_document(spec: DocumentSpec) -> str:
+    """
+    Generate an HTML document matching the given spec.
+
+    Besides the filler content, the document contains exactly one of each
+    needle: a button named ``NEEDLE_BUTTON`` and described by
+    ``NEEDLE_DESCRIPTION``, a paragraph with ``NEEDLE_TEXT`` and an input
+    labelled ``NEEDLE_LABEL``, placed in the last block so that queries
+    have to scan the whole document.
+    """
+    rng = random.Random(spec.seed)
+    blocks = []
+    elements = 0
+    counter = 0
+    budget = max(spec.nodes - 3 - 2 * spec.depth - 6, 0)
+
+    while elements < budget:
+        counter += 1
+        kind = rng.random()
+        if kind < spec.form_density:
+            block, count = form_block(counter, spec, rng)
+        elif kind < spec.form_density + 0.1:
+            block, count = table_block(counter, spec)
+        else:
+            block, count = content_block(counter, spec, rng)
+        blocks.append(block)
+        elements += count
+
+    blocks.append(
+        f"<div><p>{NEEDLE_TEXT}</p>"
+        f'<button aria-describedby="needle-hint">{NEEDLE_BUTTON}</button>'
+        f'<span id="needle-hint">{NEEDLE_DESCRIPTION}</span>'
+        f'<label for="needle-input">{NEEDLE_LABEL}</label>'
+        f'<input id="needle-input" type="text"></div>'
+    )
+
+    opening = "".join(
+        f'<section aria-label="Section {level}">'
+        for level in range(spec.depth)
+    )
+    closing = "</section>" * spec.depth
+    return (
+        "<!DOCTYPE html><html><head><title>Benchmark</title></head><body>"
+        f"<main>{opening}{''.join(blocks)}{closing}</main></body></html>"
+    )
+
+
+def content_block(counter: int, spec: DocumentSpec, rng: random.Random):
+    attributes = idref_attributes(counter, spec, rng)
+    block = (
+        f'<article id="item-{counter}"><h2 id="title-{counter}">'
+        f"Article {counter}</h2><p>Paragraph {counter} with "
+        f'<a href="/items/{counter}">link {counter}</a> and '
+        f"<b>bold {counter}</b> text.</p>"
+        f"<button{attributes}>Action {counter}</button></article>"
+    )
+    return block, 6
+
+
+def form_block(counter: int, spec: DocumentSpec, rng: random.Random):
+    attributes = idref_attributes(counter, spec, rng)
+    block = (
+        f'<form><h3 id="title-{counter}">Form {counter}</h3>'
+        f'<label for="field-{counter}">Field {counter}</label>'
+        f'<input id="field-{counter}" type="text"{attributes}>'
+        f"<label>Option {counter}"
+        f'<input type="checkbox" name="option-{counter}"></label>'
+        f'<select id="choice-{counter}"><option>One</option>'
+        f"<option>Two</option></select>"
+        f"<button>Submit {counter}</button></form>"
+    )
+    return block, 10
+
+
+def table_block(counter: int, spec: DocumentSpec):
+    rows = "".join(
+        f"<tr><td>Row {row}</td><td>Value {counter}.{row}</td></tr>"
+        for row in range(spec.table_rows)
+    )
+    block = (
+        f"<table><thead><tr><th>Name</th><th>Value</th></tr></thead>"
+        f"<tbody>{rows}</tbody></table>"
+    )
+    return block, 6 + 3 * spec.table_rows
+
+
+def idref_attributes(
+    counter: int, spec: DocumentSpec, rng: random.Random
+) -> str:
+    if rng.random() >= spec.idref_density:
+        return ""
+    return (
+        f' aria-labelledby="title-{counter}"'
+        f' aria-describedby="title-{counter}"'
+    )
@@ -0,0 +1,31 @@
+"""Queries measured by the benchmarks."""
+
+from unbrowsed import (
+    query_all_by_role,
+    query_by_label_text,
+    query_by_role,
+    query_by_text,
+)
+
+from benchmarks.documents import (
+    NEEDLE_BUTTON,
+    NEEDLE_DESCRIPTION,
+    NEEDLE_LABEL,
+    NEEDLE_TEXT,
+)
+
+QUERIES = {
+    "query_by_text": lambda dom: query_by_text(dom, NEEDLE_TEXT),
+    "query_by_text[inexact]": lambda dom: query_by_text(
+        dom, NEEDLE_TEXT.lower(), exact=False
+    ),
+    "query_by_role": lambda dom: query_by_role(dom, "main"),
+    "query_by_role[name]": lambda dom: query_by_role(
+        dom, "button", name=NEEDLE_BUTTON
+    ),
+    "query_by_role[description]": lambda dom: query_by_role(
+        dom, "button", description=NEEDLE_DESCRIPTION
+    ),
+    "query_all_by_role": lambda dom: query_all_by_role(dom, "button"),
+    "query_by_label_text": lambda dom: query_by_label_text(dom, NEEDLE_LABEL),
+}
@@ -1,9 +1,44 @@
+from unbrowsed.accessibility import (
+    aria_snapshot,
+    assert_aria_snapshot,
+    diff_accessibility,
+)
+from unbrowsed.aio import (
+    aget_all_by_role,
+    aget_by_label_text,
+    aget_by_role,
+    aget_by_text,
+    aparse_html,
+    aparse_html_bytes,
+    aparse_html_file,
+    aquery_all_by_role,
+    aquery_by_label_text,
+    aquery_by_role,
+    aquery_by_text,
+    configure_executor,
+)
+from unbrowsed.budgets import set_budget
+from unbrowsed.document import Document
 from unbrowsed.exceptions import (
     MultipleElementsFoundError,
     NoElementsFoundError,
+    QueryBudgetExceededError,
+)
+from unbrowsed.explain import QueryPlan, explain
+from unbrowsed.instrumentation import QueryStats, stats
+from unbrowsed.lint import Finding, Rule, lint
+from unbrowsed.locators import Locator
+from unbrowsed.memo import SubtreeMemo
+from unbrowsed.parser import (
+    HTMLDocument,
+    parse_html,
+    parse_html_bytes,
+    parse_html_file,
 )
-from unbrowsed.parser import parse_html
 from unbrowsed.queries import (
+    ByLabelText,
+    ByRole,
+    ByText,
     Result,
     get_all_by_role,
     get_by_label_text,
@@ -17,6 +52,10 @@ from unbrowsed.queries import (
 
 __all__ = [
     "parse_html",
+    "parse_html_bytes",
+    "parse_html_file",
+    "HTMLDocument",
+    "Document",
     "query_by_label_text",
     "get_by_label_text",
     "query_by_text",
@@ -25,7 +64,36 @@ __all__ = [
     "get_by_role",
     "query_all_by_role",
     "get_all_by_role",
+    "aparse_html",
+    "aparse_html_bytes",
+    "aparse_html_file",
+    "aquery_by_label_text",
+    "aget_by_label_text",
+    "aquery_by_text",
+    "aget_by_text",
+    "aquery_by_role",
+    "aget_by_role",
+    "aquery_all_by_role",
+    "aget_all_by_role",
+    "configure_executor",
     "MultipleElementsFoundError",
     "NoElementsFoundError",
+    "QueryBudgetExceededError",
+    "set_budget",
     "Result",
+    "QueryStats",
+    "stats",
+    "ByRole",
+    "ByText",
+    "ByLabelText",
+    "QueryPlan",
+    "explain",
+    "lint",
+    "Rule",
+    "Finding",
+    "diff_accessibility",
+    "aria_snapshot",
+    "assert_aria_snapshot",
+    "SubtreeMemo",
+    "Locator",
 ]
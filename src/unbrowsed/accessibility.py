@@ -0,0 +1,657 @@
+"""
+unbrowsed accessibility trees.
+
+The accessibility tree keeps the elements with a meaningful role, with
+their accessible name and description, and the text they contain. Generic
+and presentational elements are left out and their contents hoisted to the
+nearest kept ancestor; hidden elements are left out with their contents.
+
+Every node carries a digest of its role, name, description and the digests
+of its children, so two trees can be compared top-down, skipping identical
+subtrees with a single comparison.
+
+The tree can also be rendered as an ARIA snapshot, streamed line by line
+from a walk of the document.
+"""
+
+import bisect
+import hashlib
+import itertools
+import json
+import textwrap
+from collections.abc import Hashable, Iterable, Iterator, Sequence
+from difflib import SequenceMatcher
+from typing import NamedTuple, Optional, TextIO, Union
+
+from selectolax.lexbor import LexborHTMLParser as Parser
+from selectolax.lexbor import LexborNode
+
+from unbrowsed.document import Document
+from unbrowsed.index import DocumentIndex, get_index
+from unbrowsed.instrumentation import ACTIVE, record
+from unbrowsed.memo import SubtreeMemo
+from unbrowsed.resolvers import (
+    AccessibleDescriptionResolver,
+    AccessibleNameResolver,
+    RoleResolver,
+)
+from unbrowsed.types import ElementState
+from unbrowsed.utils import get_css_path
+
+IGNORED_ROLES = frozenset({"", "generic", "none", "presentation"})
+
+HIDDEN_TAGS = frozenset({"head", "noscript", "script", "style", "template"})
+
+# Elements AccessibleNameResolver names after their text. Their text is
+# part of their name, so it is not repeated as text nodes.
+NAME_FROM_CONTENT_TAGS = frozenset(
+    {"a", "button", "h1", "h2", "h3", "h4", "h5", "h6"}
+)
+
+# Text runs on across these elements; any other element breaks it.
+INLINE_TAGS = frozenset(
+    {
+        "a",
+        "abbr",
+        "b",
+        "bdi",
+        "bdo",
+        "cite",
+        "code",
+        "data",
+        "dfn",
+        "em",
+        "i",
+        "kbd",
+        "label",
+        "mark",
+        "q",
+        "s",
+        "samp",
+        "small",
+        "span",
+        "strong",
+        "sub",
+        "sup",
+        "time",
+        "u",
+        "var",
+    }
+)
+
+TEXT_ROLE = "text"
+
+DIGEST_SIZE = 16
+
+# The states shown in ARIA snapshots, besides the heading level.
+SNAPSHOT_STATES = ("checked", "disabled", "expanded", "pressed", "selected")
+
+# Gaps between matched children are compared item by item up to this size.
+MAX_GAP_COMPARISONS = 4096
+
+
+class AccessibleNode:
+    """
+    A node of the accessibility tree.
+
+    Attributes:
+        role: The role of the element, or ``"text"`` for text.
+        name: The accessible name, or the text of a text node.
+        description: The accessible description.
+        element: The element, or the parent element of a text node.
+        depth: The depth of the node in the accessibility tree.
+        children: The child nodes, in document order.
+        digest: A hash of the role, name, description and the digests of
+                the children.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(
+        self,
+        role: str,
+        name: Optional[str],
+        description: Optional[str],
+        element: LexborNode,
+        depth: int,
+    ):
+        self.role = role
+        self.name = name
+        self.description = description
+        self.element = element
+        self.depth = depth
+        self.children: list["AccessibleNode"] = []
+        self.digest = b""
+
+    def __repr__(self) -> str:
+        return f"AccessibleNode({self.role!r}, {self.name!r})"
+
+    @property
+    def locator(self) -> str:
+        """A CSS selector locating the element of the node."""
+        return get_css_path(self.element)
+
+    def compute_digest(self) -> bytes:
+        """Hash the node, once the digests of its children are known."""
+        hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        for value in (self.role, self.name, self.description):
+            if value is None:
+                hasher.update(b"\x00")
+            else:
+                hasher.update(b"\x01")
+                hasher.update(value.encode("utf-8", "surrogatepass"))
+                hasher.update(b"\x00")
+        for child in self.children:
+            hasher.update(child.digest)
+        self.digest = hasher.digest()
+        return self.digest
+
+
+def is_hidden(element: LexborNode) -> bool:
+    attributes = element.attributes
+    return (
+        element.tag in HIDDEN_TAGS
+        or "hidden" in attributes
+        or (attributes.get("aria-hidden") or "").strip().lower() == "true"
+    )
+
+
+def walk(
+    dom: Union[Parser, Document], memo: Optional[SubtreeMemo] = None
+) -> Iterator[AccessibleNode]:
+    """
+    Yield the nodes of the accessibility tree in document order, without
+    their children, so that the tree never has to be held in memory.
+
+    Adjacent text is merged into one text node, joined the way element
+    text is, so that it reads as ``get_by_text`` matches it. With a
+    ``memo``, the roles and names of shared subtrees come from it.
+    """
+    if isinstance(dom, Document):
+        dom = dom.parse()
+    root = dom.root
+    if root is None:
+        return
+    known = memo.resolve(dom) if memo is not None else {}
+
+    visited = 0
+    pending: Optional[AccessibleNode] = None
+    pending_run = -1
+    # Text is merged within a run, which elements other than inline ones
+    # break. Stack items: (node, depth, run, inside a name-from-content).
+    stack = [(root, 0, 0, False)]
+    runs = 0
+    while stack:
+        node, depth, run, in_name = stack.pop()
+        if node.is_text_node:
+            if in_name:
+                continue
+            text = (node.text_content or "").strip()
+            if not text:
+                continue
+            if pending is not None and pending_run == run:
+                pending.name = f"{pending.name}{text}"
+                continue
+            if pending is not None:
+                yield pending
+            pending = AccessibleNode(
+                TEXT_ROLE, text, None, node.parent, depth  # type: ignore
+            )
+            pending_run = run
+            continue
+
+        if not node.is_element_node or is_hidden(node):
+            continue
+        visited += 1
+
+        resolution = known.get(node)
+        if resolution is not None:
+            roles = resolution[0]
+        else:
+            roles = RoleResolver(element=node, target_role="").get_roles()
+        role = roles[0] if roles else ""
+        kept = role not in IGNORED_ROLES
+        if kept or node.tag not in INLINE_TAGS:
+            if pending is not None:
+                yield pending
+                pending = None
+            runs += 1
+            run = runs
+        if kept:
+            if resolution is not None:
+                name = resolution[1]
+            else:
+                name = AccessibleNameResolver(node).resolve()
+            description = AccessibleDescriptionResolver(node).resolve()
+            in_name = in_name or bool(
+                name and node.tag in NAME_FROM_CONTENT_TAGS
+            )
+            yield AccessibleNode(role, name, description, node, depth)
+            depth += 1
+
+        children = []
+        child = node.child
+        while child is not None:
+            children.append((child, depth, run, in_name))
+            child = child.next
+        stack.extend(reversed(children))
+
+    if pending is not None:
+        yield pending
+    if ACTIVE.get():
+        record("nodes_visited", visited)
+
+
+def build_tree(
+    dom: Union[Parser, Document], memo: Optional[SubtreeMemo] = None
+) -> Optional[AccessibleNode]:
+    """
+    Build the accessibility tree of a document, with the digests of every
+    subtree.
+
+    Args:
+        dom: The document.
+        memo: A memo of the roles and names of subtrees shared between
+              documents.
+
+    Returns:
+        AccessibleNode: The root node, for the ``<html>`` element, or
+        ``None`` for an empty document.
+
+    .. versionadded:: 0.1.0a24
+    """
+    nodes = []
+    ancestors: list[AccessibleNode] = []
+    for node in walk(dom, memo=memo):
+        while len(ancestors) > node.depth:
+            ancestors.pop()
+        if ancestors:
+            ancestors[-1].children.append(node)
+        ancestors.append(node)
+        nodes.append(node)
+
+    # Children come after their parent in document order.
+    for node in reversed(nodes):
+        node.compute_digest()
+    return nodes[0] if nodes else None
+
+
+class Change(NamedTuple):
+    """
+    A difference between two accessibility trees.
+
+    Attributes:
+        kind: ``"added"``, ``"removed"``, or ``"changed"`` when a node
+              kept its role but not its name or description.
+        before: The node in the first tree, unless added.
+        after: The node in the second tree, unless removed.
+
+    Added and removed nodes stand for their whole subtree.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    kind: str
+    before: Optional[AccessibleNode]
+    after: Optional[AccessibleNode]
+
+    def format(self) -> str:
+        """Render the change as one line of text."""
+        if self.before is None or self.after is None:
+            sign = "+" if self.before is None else "-"
+            node = self.after or self.before
+            return f"{sign} {describe_node(node)}"  # type: ignore
+        return (
+            f"~ {describe_node(self.before)} -> "
+            f"{describe_node(self.after)}"
+        )
+
+
+def describe_node(node: AccessibleNode) -> str:
+    text = node.role
+    if node.name is not None:
+        text = f"{text} {node.name!r}"
+    if node.description is not None:
+        text = f"{text} ({node.description!r})"
+    return text
+
+
+def get_unique_anchors(
+    old: Sequence[Hashable],
+    new: Sequence[Hashable],
+    bounds: tuple[int, int, int, int],
+) -> list[tuple[int, int]]:
+    """
+    Return the longest run of items occurring exactly once on both sides,
+    in the same order on both (patience diff).
+    """
+    i1, i2, j1, j2 = bounds
+    positions: dict[Hashable, list[int]] = {}
+    for i in range(i1, i2):
+        positions.setdefault(old[i], [i, -1, 0])[2] += 1
+    for j in range(j1, j2):
+        entry = positions.get(new[j])
+        if entry is not None:
+            entry[1] = j if entry[1] == -1 else -2
+    candidates = [
+        (i, j) for i, j, count in positions.values() if count == 1 and j >= 0
+    ]
+    candidates.sort()
+
+    # Longest increasing subsequence of the new positions.
+    tails: list[int] = []
+    tail_indexes: list[int] = []
+    previous: list[int] = []
+    for index, (_, j) in enumerate(candidates):
+        position = bisect.bisect_left(tails, j)
+        if position == len(tails):
+            tails.append(j)
+            tail_indexes.append(index)
+        else:
+            tails[position] = j
+            tail_indexes[position] = index
+        previous.append(tail_indexes[position - 1] if position else -1)
+
+    anchors = []
+    index = tail_indexes[-1] if tail_indexes else -1
+    while index != -1:
+        anchors.append(candidates[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def align(
+    old: Sequence[Hashable], new: Sequence[Hashable]
+) -> list[tuple[int, int]]:
+    """
+    Match the equal items of two sequences, keeping their order.
+
+    Common prefixes and suffixes are matched first, then items unique on
+    both sides anchor the rest. Small gaps without anchors fall back to
+    ``difflib``; larger ones are left unmatched. This keeps the cost close
+    to linear when few items differ.
+    """
+    matches = []
+    stack = [(0, len(old), 0, len(new))]
+    while stack:
+        i1, i2, j1, j2 = stack.pop()
+        while i1 < i2 and j1 < j2 and old[i1] == new[j1]:
+            matches.append((i1, j1))
+            i1 += 1
+            j1 += 1
+        while i1 < i2 and j1 < j2 and old[i2 - 1] == new[j2 - 1]:
+            i2 -= 1
+            j2 -= 1
+            matches.append((i2, j2))
+        if i1 == i2 or j1 == j2:
+            continue
+
+        anchors = get_unique_anchors(old, new, (i1, i2, j1, j2))
+        if anchors:
+            matches.extend(anchors)
+            starts = [(i1, j1)] + [(i + 1, j + 1) for i, j in anchors]
+            ends = anchors + [(i2, j2)]
+            for (start_i, start_j), (end_i, end_j) in zip(starts, ends):
+                stack.append((start_i, end_i, start_j, end_j))
+        elif (i2 - i1) * (j2 - j1) <= MAX_GAP_COMPARISONS:
+            matcher = SequenceMatcher(
+                None, old[i1:i2], new[j1:j2], autojunk=False
+            )
+            for a, b, size in matcher.get_matching_blocks():
+                matches.extend((i1 + a + k, j1 + b + k) for k in range(size))
+    matches.sort()
+    return matches
+
+
+def iter_gaps(
+    old: list[AccessibleNode], new: list[AccessibleNode]
+) -> Iterator[tuple[list[AccessibleNode], list[AccessibleNode]]]:
+    """Yield the runs of nodes left between the nodes of equal digest."""
+    i = j = 0
+    matches = align(
+        [node.digest for node in old], [node.digest for node in new]
+    )
+    for matched_i, matched_j in matches + [(len(old), len(new))]:
+        if i < matched_i or j < matched_j:
+            yield old[i:matched_i], new[j:matched_j]
+        i, j = matched_i + 1, matched_j + 1
+
+
+def pair_nodes(
+    old: list[AccessibleNode], new: list[AccessibleNode]
+) -> Iterator[Union[tuple[AccessibleNode, AccessibleNode], Change]]:
+    """
+    Pair up the nodes with the same role, in order. Nodes left unpaired
+    were removed or added.
+    """
+    i = j = 0
+    matches = align([node.role for node in old], [node.role for node in new])
+    for matched_i, matched_j in matches + [(len(old), len(new))]:
+        for node in old[i:matched_i]:
+            yield Change("removed", node, None)
+        for node in new[j:matched_j]:
+            yield Change("added", None, node)
+        if matched_i < len(old):
+            yield old[matched_i], new[matched_j]
+        i, j = matched_i + 1, matched_j + 1
+
+
+def diff_nodes(
+    before: AccessibleNode, after: AccessibleNode
+) -> Iterator[Change]:
+    """Compare two nodes of the same role and their subtrees."""
+    # Items are pairs of nodes to compare, or changes ready to be yielded,
+    # so that changes come out in document order.
+    stack: list[Union[tuple[AccessibleNode, AccessibleNode], Change]] = [
+        (before, after)
+    ]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Change):
+            yield item
+            continue
+        old, new = item
+        if old.digest == new.digest:
+            continue
+        if (old.name, old.description) != (new.name, new.description):
+            yield Change("changed", old, new)
+
+        items: list[Union[tuple[AccessibleNode, AccessibleNode], Change]] = []
+        # Children with equal digests are identical; the others are paired
+        # up by role and compared further.
+        for old_gap, new_gap in iter_gaps(old.children, new.children):
+            items.extend(pair_nodes(old_gap, new_gap))
+        stack.extend(reversed(items))
+
+
+def diff_accessibility(
+    dom_a: Union[Parser, Document],
+    dom_b: Union[Parser, Document],
+    memo: Optional[SubtreeMemo] = None,
+) -> list[Change]:
+    """
+    Compare the accessibility trees of two documents.
+
+    Subtrees with the same roles, names, descriptions and structure have
+    the same digest and are skipped without being walked, so comparing two
+    versions of a large page costs little more than building their trees.
+
+    Example::
+
+        for change in diff_accessibility(before, after):
+            print(change.format())
+
+    Args:
+        dom_a: The first document.
+        dom_b: The second document.
+        memo: A memo of the roles and names of subtrees shared between
+              documents, such as the two versions of the page.
+
+    Returns:
+        list[Change]: The differences, in document order.
+
+    .. versionadded:: 0.1.0a24
+    """
+    before = build_tree(dom_a, memo=memo)
+    after = build_tree(dom_b, memo=memo)
+    if before is None or after is None:
+        changes = []
+        if before is not None:
+            changes.append(Change("removed", before, None))
+        if after is not None:
+            changes.append(Change("added", None, after))
+        return changes
+    if before.role != after.role:
+        return [Change("removed", before, None), Change("added", None, after)]
+    return list(diff_nodes(before, after))
+
+
+def format_value(value: str) -> str:
+    """Quote a value unless it reads the same as plain YAML."""
+    if (
+        not value
+        or value != value.strip()
+        or value[0] in "!&*[]{}|>'\"%@`#,?:-"
+        or any(char in value for char in "\n\r\t")
+        or ": " in value
+        or " #" in value
+    ):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def format_states(state: ElementState) -> str:
+    parts = []
+    for name in SNAPSHOT_STATES:
+        value = getattr(state, name)
+        if value is True:
+            parts.append(f"[{name}]")
+        elif value == "mixed":
+            parts.append(f"[{name}=mixed]")
+    if state.level is not None:
+        parts.append(f"[level={state.level}]")
+    return "".join(f" {part}" for part in parts)
+
+
+def format_node(node: AccessibleNode, index: DocumentIndex) -> str:
+    """
+    Render a node as a snapshot line, without its children.
+
+    The states of the element are taken from the state table when it is
+    already built, and resolved for the element alone otherwise, so that
+    a snapshot stopped early only did the work of the lines it rendered.
+    """
+    indent = "  " * node.depth
+    if node.role == TEXT_ROLE:
+        return f"{indent}- text: {format_value(node.name or '')}"
+    line = f"{indent}- {node.role}"
+    if node.name:
+        line += f" {json.dumps(node.name, ensure_ascii=False)}"
+    return line + format_states(index.get_state(node.element, build=False))
+
+
+def iter_aria_snapshot(dom: Union[Parser, Document]) -> Iterator[str]:
+    """
+    Yield the lines of the ARIA snapshot of a document, rendering each one
+    only when it is asked for.
+
+    .. versionadded:: 0.1.0a24
+    """
+    if isinstance(dom, Document):
+        dom = dom.parse()
+    index = get_index(dom)
+    previous: Optional[AccessibleNode] = None
+    for node in walk(dom):
+        if previous is not None:
+            line = format_node(previous, index)
+            # Lines of nodes with children end with a colon, like YAML.
+            yield f"{line}:" if node.depth > previous.depth else line
+        previous = node
+    if previous is not None:
+        yield format_node(previous, index)
+
+
+def aria_snapshot(
+    dom: Union[Parser, Document], file: Optional[TextIO] = None
+) -> Optional[str]:
+    """
+    Render the accessibility tree of a document as indented, YAML-like
+    text, one line per node, with its role, name and states::
+
+        - document:
+          - navigation "Main":
+            - link "Home"
+          - main:
+            - heading "Welcome" [level=1]
+            - checkbox "Remember me" [checked]
+            - text: Signed in as Ada
+
+    The output only depends on the tree, so it can be kept as a golden
+    file and checked with ``assert_aria_snapshot``.
+
+    Args:
+        dom: The document.
+        file: A text file to write the snapshot to, line by line, instead
+              of returning it. Use it for very large documents.
+
+    Returns:
+        str: The snapshot, ending with a newline, unless written to
+        ``file``.
+
+    .. versionadded:: 0.1.0a24
+    """
+    lines = iter_aria_snapshot(dom)
+    if file is None:
+        return "".join(f"{line}\n" for line in lines)
+    for line in lines:
+        file.write(line)
+        file.write("\n")
+    return None
+
+
+def assert_aria_snapshot(
+    dom: Union[Parser, Document], expected: Union[str, Iterable[str]]
+) -> None:
+    """
+    Check the ARIA snapshot of a document against an expected one.
+
+    Lines are compared as they are rendered, and the comparison stops at
+    the first difference, without rendering the rest of the document.
+    Blank lines and trailing whitespace are ignored, and a string is
+    dedented first, so that snapshots can be written inline.
+
+    Example::
+
+        assert_aria_snapshot(dom, '''
+            - document:
+              - button "Save"
+        ''')
+
+        with open("home.snapshot") as golden:
+            assert_aria_snapshot(dom, golden)
+
+    Args:
+        dom: The document.
+        expected: The expected snapshot, as a string, or as lines, such as
+                  an open file.
+
+    Raises:
+        AssertionError: If the snapshots differ.
+
+    .. versionadded:: 0.1.0a24
+    """
+    if isinstance(expected, str):
+        expected = textwrap.dedent(expected).splitlines()
+    expected_lines = (line.rstrip() for line in expected if line.strip())
+    actual_lines = iter_aria_snapshot(dom)
+    for number, pair in enumerate(
+        itertools.zip_longest(expected_lines, actual_lines), start=1
+    ):
+        expected_line, actual_line = pair
+        if expected_line != actual_line:
+            raise AssertionError(
+                f"ARIA snapshot differs at line {number}:\n"
+                f"  expected: {expected_line or '(end of snapshot)'}\n"
+                f"  actual:   {actual_line or '(end of snapshot)'}"
+            )
@@ -0,0 +1,221 @@
+"""
+unbrowsed asyncio API.
+
+Awaitable versions of the parse and query functions. The work runs in an
+executor, so that parsing and scanning large documents does not block the
+event loop.
+
+Queries on the same document run one at a time under a lock of that
+document, which keeps its indexes and remembered outcomes consistent when
+many queries are gathered; queries on different documents and parsing
+run as concurrently as the executor allows. The number of jobs in flight
+is bounded, so that gathering thousands of pages does not queue
+thousands of sources at once.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import weakref
+from collections.abc import Callable, Coroutine
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Optional, TypeVar, Union
+
+from unbrowsed.document import Document
+from unbrowsed.parser import (
+    HTMLDocument,
+    parse_html,
+    parse_html_bytes,
+    parse_html_file,
+)
+from unbrowsed.queries import (
+    get_all_by_role,
+    get_by_label_text,
+    get_by_role,
+    get_by_text,
+    query_all_by_role,
+    query_by_label_text,
+    query_by_role,
+    query_by_text,
+)
+
+DEFAULT_MAX_CONCURRENCY = 64
+
+# Sources shorter than this are parsed on the event loop, where it is
+# cheaper than a trip to the executor.
+INLINE_SIZE = 16 * 1024
+
+T = TypeVar("T")
+
+# The lock of each document queried, and the one shared by the documents
+# that cannot be weakly referenced, like plain LexborHTMLParser instances.
+LOCKS: "weakref.WeakKeyDictionary[Any, threading.Lock]" = (
+    weakref.WeakKeyDictionary()
+)
+LOCKS_LOCK = threading.Lock()
+SHARED_LOCK = threading.Lock()
+CONFIG: dict[str, Any] = {
+    "executor": None,
+    "owned": False,
+    "max_concurrency": DEFAULT_MAX_CONCURRENCY,
+}
+SEMAPHORES: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def configure_executor(
+    executor: Optional[Executor] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> None:
+    """
+    Configure where the asyncio API runs its work.
+
+    Args:
+        executor: The executor to run parsing and queries in. It must run
+                  them in the same process, like a ``ThreadPoolExecutor``,
+                  whose threads then query different documents at once.
+                  Defaults to a single-thread executor owned by unbrowsed.
+        max_concurrency: The number of jobs that may be waiting for or
+                         running in the executor at once; further calls
+                         wait on the event loop.
+
+    .. versionadded:: 0.1.0a24
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1.")
+    if CONFIG["owned"]:
+        CONFIG["executor"].shutdown(wait=False)
+    CONFIG["executor"] = executor
+    CONFIG["owned"] = False
+    CONFIG["max_concurrency"] = max_concurrency
+    SEMAPHORES.clear()
+
+
+def get_executor() -> Executor:
+    if CONFIG["executor"] is None:
+        CONFIG["executor"] = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="unbrowsed"
+        )
+        CONFIG["owned"] = True
+    return CONFIG["executor"]
+
+
+def get_semaphore(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    semaphore = SEMAPHORES.get(loop)
+    if semaphore is None:
+        semaphore = SEMAPHORES[loop] = asyncio.Semaphore(
+            CONFIG["max_concurrency"]
+        )
+    return semaphore
+
+
+def get_lock(dom: Any) -> threading.Lock:
+    """
+    Return the lock of a document. A ``Document`` has its own lock, which
+    its parsed document does not share.
+    """
+    try:
+        with LOCKS_LOCK:
+            lock = LOCKS.get(dom)
+            if lock is None:
+                lock = LOCKS[dom] = threading.Lock()
+    except TypeError:
+        return SHARED_LOCK
+    return lock
+
+
+def run_locked(
+    lock: threading.Lock, function: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    with lock:
+        return function(*args, **kwargs)
+
+
+async def run(function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a function in the configured executor."""
+    loop = asyncio.get_running_loop()
+    # Like asyncio.to_thread, so that stats() blocks and budgets follow.
+    context = contextvars.copy_context()
+    async with get_semaphore(loop):
+        return await loop.run_in_executor(
+            get_executor(),
+            functools.partial(context.run, function, *args, **kwargs),
+        )
+
+
+async def aparse_html(html: str, tracked: bool = False) -> HTMLDocument:
+    """
+    Awaitable version of ``parse_html``.
+
+    .. versionadded:: 0.1.0a24
+    """
+    if len(html) < INLINE_SIZE:
+        return parse_html(html, tracked=tracked)
+    return await run(parse_html, html, tracked=tracked)
+
+
+async def aparse_html_bytes(
+    data: bytes, encoding: Optional[str] = None, tracked: bool = False
+) -> HTMLDocument:
+    """
+    Awaitable version of ``parse_html_bytes``.
+
+    .. versionadded:: 0.1.0a24
+    """
+    if len(data) < INLINE_SIZE:
+        return parse_html_bytes(data, encoding=encoding, tracked=tracked)
+    return await run(
+        parse_html_bytes, data, encoding=encoding, tracked=tracked
+    )
+
+
+async def aparse_html_file(
+    path: Union[str, os.PathLike],
+    encoding: Optional[str] = None,
+    tracked: bool = False,
+) -> HTMLDocument:
+    """
+    Awaitable version of ``parse_html_file``. The file is read in the
+    executor too.
+
+    .. versionadded:: 0.1.0a24
+    """
+    return await run(parse_html_file, path, encoding=encoding, tracked=tracked)
+
+
+def make_async(
+    function: Callable[..., T],
+) -> Callable[..., Coroutine[Any, Any, T]]:
+    """
+    Build the awaitable version of a query function, run under the lock
+    of the document it queries.
+    """
+
+    @functools.wraps(function)
+    async def wrapper(
+        dom: Union[HTMLDocument, Document], *args: Any, **kwargs: Any
+    ) -> T:
+        return await run(
+            run_locked, get_lock(dom), function, dom, *args, **kwargs
+        )
+
+    wrapper.__name__ = wrapper.__qualname__ = f"a{function.__name__}"
+    wrapper.__doc__ = (
+        f"Awaitable version of ``{function.__name__}``, run in the "
+        "executor set with ``configure_executor``.\n\n"
+        ".. versionadded:: 0.1.0a24\n"
+    )
+    return wrapper
+
+
+aquery_by_label_text = make_async(query_by_label_text)
+aget_by_label_text = make_async(get_by_label_text)
+aquery_by_text = make_async(query_by_text)
+aget_by_text = make_async(get_by_text)
+aquery_by_role = make_async(query_by_role)
+aget_by_role = make_async(get_by_role)
+aquery_all_by_role = make_async(query_all_by_role)
+aget_all_by_role = make_async(get_all_by_role)
@@ -0,0 +1,139 @@
+"""
+unbrowsed query budgets.
+
+Bounds the work a query may do on a large document, by wall time or by the
+number of elements it visits. Traversal loops report their progress with
+``if BUDGETS.get(): spend()``, so queries without a budget pay a single
+context variable lookup per element, and the clock is only read every
+``CHECK_INTERVAL`` elements. Budgets are kept in a context variable, so
+that a query only charges the budgets of its own thread or task.
+"""
+
+import functools
+import time
+from contextvars import ContextVar
+from collections.abc import Callable
+from typing import Any, Optional, TypeVar
+
+from unbrowsed.exceptions import QueryBudgetExceededError
+
+CHECK_INTERVAL = 1024
+
+# The budgets of the query functions currently running, outermost first.
+BUDGETS: ContextVar[tuple["Budget", ...]] = ContextVar("BUDGETS", default=())
+
+# The limits applied to every top-level query call, see ``set_budget``.
+DEFAULT_LIMITS: dict[str, Optional[float]] = {
+    "timeout": None,
+    "max_nodes": None,
+}
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Budget:
+    """The limits of a single query call and the work done so far."""
+
+    def __init__(
+        self,
+        query: str,
+        timeout: Optional[float] = None,
+        max_nodes: Optional[int] = None,
+    ):
+        self.query = query
+        self.timeout = timeout
+        self.max_nodes = max_nodes
+        self.visited = 0
+        self.next_check = CHECK_INTERVAL
+        self.start = time.perf_counter()
+        self.deadline = None if timeout is None else self.start + timeout
+
+    def spend(self, count: int) -> None:
+        self.visited += count
+        if self.max_nodes is not None and self.visited > self.max_nodes:
+            raise self.exceeded(f"visited more than {self.max_nodes} nodes")
+        if self.visited >= self.next_check:
+            self.next_check = self.visited + CHECK_INTERVAL
+            if (
+                self.deadline is not None
+                and time.perf_counter() > self.deadline
+            ):
+                raise self.exceeded(f"ran past its {self.timeout}s timeout")
+
+    def exceeded(self, reason: str) -> QueryBudgetExceededError:
+        stats = {
+            "query": self.query,
+            "timeout": self.timeout,
+            "max_nodes": self.max_nodes,
+            "nodes_visited": self.visited,
+            "elapsed": time.perf_counter() - self.start,
+        }
+        return QueryBudgetExceededError(
+            f"{self.query} {reason} "
+            f"({self.visited} nodes in {stats['elapsed']:.3f}s).",
+            stats,
+        )
+
+
+def spend(count: int = 1) -> None:
+    """
+    Charge visited elements to the running queries.
+
+    Callers check ``BUDGETS.get()`` first, so that nothing is done when no
+    budget is set.
+
+    Raises:
+        QueryBudgetExceededError:
+            If a running query exceeded its budget.
+    """
+    for budget in BUDGETS.get():
+        budget.spend(count)
+
+
+def set_budget(
+    timeout: Optional[float] = None, max_nodes: Optional[int] = None
+) -> None:
+    """
+    Set the limits of every query call that does not pass its own.
+
+    Call it without arguments to remove the limits.
+
+    Args:
+        timeout: The wall time a query may take, in seconds.
+        max_nodes: The number of elements a query may visit, including the
+                   ones visited to build the document index.
+
+    .. versionadded:: 0.1.0a24
+    """
+    DEFAULT_LIMITS["timeout"] = timeout
+    DEFAULT_LIMITS["max_nodes"] = max_nodes
+
+
+def budgeted(function: F) -> F:
+    """
+    Enforce the ``timeout`` and ``max_nodes`` keyword arguments of a query
+    function, falling back to the limits of ``set_budget``. Queries called
+    by another query share the budget of the outer call.
+    """
+    name = function.__name__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        timeout = kwargs.get("timeout")
+        max_nodes = kwargs.get("max_nodes")
+        if timeout is None and max_nodes is None:
+            if BUDGETS.get():
+                return function(*args, **kwargs)
+            timeout = DEFAULT_LIMITS["timeout"]
+            max_nodes = DEFAULT_LIMITS["max_nodes"]
+            if timeout is None and max_nodes is None:
+                return function(*args, **kwargs)
+
+        budget = Budget(name, timeout=timeout, max_nodes=max_nodes)
+        token = BUDGETS.set(BUDGETS.get() + (budget,))
+        try:
+            return function(*args, **kwargs)
+        finally:
+            BUDGETS.reset(token)
+
+    return wrapper  # type: ignore
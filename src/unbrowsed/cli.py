@@ -0,0 +1,468 @@
+"""
+unbrowsed command line.
+
+Runs queries and lint rules over directories or globs of HTML files and
+writes one JSON line per file and query.
+
+Usage::
+
+    python -m unbrowsed snapshots/ --role button --name Save --text Welcome
+    python -m unbrowsed "exports/**/*.html" --label Email --workers 8
+    python -m unbrowsed snapshots/ --lint
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from importlib.metadata import version
+from typing import Any, NamedTuple, Optional, TextIO, Union
+
+from unbrowsed.budgets import DEFAULT_LIMITS, set_budget
+from unbrowsed.exceptions import (
+    MultipleElementsFoundError,
+    QueryBudgetExceededError,
+)
+from unbrowsed.lint import lint
+from unbrowsed.memo import SubtreeMemo
+from unbrowsed.parser import HTMLDocument, parse_html_bytes
+from unbrowsed.queries import ByLabelText, ByRole, ByText
+from unbrowsed.utils import get_css_path
+
+Query = Union[ByRole, ByText, ByLabelText]
+
+HTML_EXTENSIONS = (".html", ".htm")
+
+# Files submitted to the pool per worker, bounding memory on large runs.
+FILES_PER_WORKER = 4
+
+# Roles and names of the subtrees shared by the pages of a site, kept for
+# the life of each worker process.
+MEMO = SubtreeMemo()
+
+
+class Batch(NamedTuple):
+    """What to run on every file."""
+
+    queries: list[Query]
+    lint: bool = False
+    timeout: Optional[float] = None
+    max_nodes: Optional[int] = None
+
+
+class Signature(NamedTuple):
+    """What identifies the content of a file between runs."""
+
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+class FileResult(NamedTuple):
+    """The outcome of a file; ``records`` is ``None`` when unchanged."""
+
+    path: str
+    signature: Optional[Signature]
+    records: Optional[list[dict[str, Any]]]
+
+
+def iter_files(paths: Iterable[str]) -> Iterator[str]:
+    """
+    Yield the HTML files of the given directories, globs and files, lazily
+    and in a stable order.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, directories, files in os.walk(path):
+                directories.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(HTML_EXTENSIONS):
+                        yield os.path.join(root, name)
+        elif glob.has_magic(path):
+            yield from sorted(glob.iglob(path, recursive=True))
+        else:
+            # Missing files are yielded too, and reported as errors.
+            yield path
+
+
+def describe_query(query: Query) -> dict[str, Any]:
+    """Return the arguments of a query, without the unset ones."""
+    kind = {ByRole: "role", ByText: "text", ByLabelText: "label"}
+    description = {"type": kind[type(query)]}
+    description.update(
+        (field, value)
+        for field, value in query._asdict().items()
+        if value is not None and (field != "exact" or not value)
+    )
+    return description
+
+
+def describe_batch(batch: Batch) -> dict[str, Any]:
+    return {
+        "queries": [describe_query(query) for query in batch.queries],
+        "lint": batch.lint,
+        "timeout": batch.timeout,
+        "max_nodes": batch.max_nodes,
+    }
+
+
+def get_elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def run_query(dom: HTMLDocument, query: Query) -> dict[str, Any]:
+    """
+    Run a query, reporting the number of matches, the locator of the
+    matched element and the time taken.
+
+    ``matches`` is 0 or 1 when the query resolves, or the number of
+    matches reported by ``MultipleElementsFoundError``. Any other error
+    is reported in ``error``, and the next queries still run.
+    """
+    record: dict[str, Any] = {"matches": 0, "locator": None}
+    start = time.perf_counter()
+    try:
+        result = query.query(dom)
+        if result is not None:
+            record["matches"] = 1
+            record["locator"] = get_css_path(result.element)
+    except MultipleElementsFoundError as e:
+        record["matches"] = int(e.message.split()[1])
+    except QueryBudgetExceededError as e:
+        record["error"] = e.message
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["elapsed_ms"] = get_elapsed_ms(start)
+    return record
+
+
+def run_lint(dom: HTMLDocument) -> dict[str, Any]:
+    """Check a document against the default lint rules."""
+    start = time.perf_counter()
+    findings = lint(dom, memo=MEMO)
+    return {
+        "lint": [finding._asdict() for finding in findings],
+        "elapsed_ms": get_elapsed_ms(start),
+    }
+
+
+def run_queries(
+    path: str, dom: HTMLDocument, batch: Batch, parse_ms: float
+) -> list[dict[str, Any]]:
+    """Run the queries and lint of the batch on a parsed file."""
+    limits = dict(DEFAULT_LIMITS)
+    set_budget(timeout=batch.timeout, max_nodes=batch.max_nodes)
+    try:
+        records = [
+            {
+                "file": path,
+                "query": describe_query(query),
+                **run_query(dom, query),
+                "parse_ms": parse_ms,
+            }
+            for query in batch.queries
+        ]
+    finally:
+        set_budget(**limits)
+    if batch.lint:
+        records.append({"file": path, **run_lint(dom), "parse_ms": parse_ms})
+    return records
+
+
+def process_file(
+    path: str, batch: Batch, previous: Optional[Signature] = None
+) -> FileResult:
+    """
+    Run the queries and lint of the batch on a file.
+
+    When the file still matches the ``previous`` signature, nothing is run
+    and the result has no records. A file whose size and modification time
+    are unchanged is not even read. A file that cannot be read, parsed or
+    linted gets a single error record, so that the batch goes on.
+    """
+    try:
+        status = os.stat(path)
+        stamp = (status.st_size, status.st_mtime_ns)
+        if previous is not None and stamp == previous[:2]:
+            return FileResult(path, previous, None)
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError as e:
+        return FileResult(path, None, [{"file": path, "error": str(e)}])
+
+    signature = Signature(
+        status.st_size, status.st_mtime_ns, hashlib.sha256(data).hexdigest()
+    )
+    if previous is not None and signature.digest == previous.digest:
+        return FileResult(path, signature, None)
+
+    start = time.perf_counter()
+    try:
+        dom = parse_html_bytes(data, tracked=True)
+        records = run_queries(path, dom, batch, get_elapsed_ms(start))
+    except (UnicodeError, LookupError) as e:
+        return FileResult(path, None, [{"file": path, "error": str(e)}])
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        return FileResult(path, None, [{"file": path, "error": error}])
+    return FileResult(path, signature, records)
+
+
+class Manifest:
+    """
+    The results of a previous run, by file, for incremental runs.
+
+    The manifest is discarded when the batch, unbrowsed or selectolax
+    changed since it was written.
+    """
+
+    def __init__(self, path: str, batch: Batch):
+        self.path = path
+        self.key = {
+            "unbrowsed": version("unbrowsed"),
+            "selectolax": version("selectolax"),
+            "batch": describe_batch(batch),
+        }
+        self.previous: dict[str, dict[str, Any]] = {}
+        self.files: dict[str, dict[str, Any]] = {}
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("key") == self.key:
+            self.previous = data["files"]
+
+    def get_signature(self, path: str) -> Optional[Signature]:
+        entry = self.previous.get(path)
+        if entry is None:
+            return None
+        return Signature(entry["size"], entry["mtime_ns"], entry["digest"])
+
+    def merge(self, result: FileResult) -> list[dict[str, Any]]:
+        """
+        Record the result of a file, returning its records. Unchanged files
+        get their previous records, marked as ``cached``.
+        """
+        if result.records is None:
+            stored = self.previous[result.path]["records"]
+            records = [{**record, "cached": True} for record in stored]
+        else:
+            stored = records = result.records
+        # Errors, like budget overruns, are retried on the next run.
+        if result.signature is not None and not any(
+            "error" in record for record in stored
+        ):
+            self.files[result.path] = {
+                **result.signature._asdict(),
+                "records": stored,
+            }
+        return records
+
+    def save(self) -> None:
+        """Write the manifest, replacing the previous one atomically."""
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"key": self.key, "files": self.files}, file)
+        os.replace(temporary, self.path)
+
+
+def run_batch(
+    files: Iterable[str],
+    batch: Batch,
+    executor: Optional[Executor] = None,
+    window: int = 1,
+    manifest: Optional[Manifest] = None,
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Process the files, yielding the records of each file as soon as it is
+    done. At most ``window`` files are in flight at once. With a manifest,
+    unchanged files yield their previous records.
+    """
+
+    def get_signature(path: str) -> Optional[Signature]:
+        return manifest.get_signature(path) if manifest else None
+
+    def get_records(result: FileResult) -> list[dict[str, Any]]:
+        if manifest is None:
+            return result.records or []
+        return manifest.merge(result)
+
+    if executor is None:
+        for path in files:
+            yield get_records(process_file(path, batch, get_signature(path)))
+        return
+
+    pending: set[Future] = set()
+    for path in files:
+        pending.add(
+            executor.submit(process_file, path, batch, get_signature(path))
+        )
+        if len(pending) >= window:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield get_records(future.result())
+    for future in pending:
+        yield get_records(future.result())
+
+
+class QueryAction(argparse.Action):
+    """Append a query to the ordered list of queries."""
+
+    def __call__(self, parser, namespace, value, option_string=None):
+        queries = list(getattr(namespace, self.dest))
+        if self.const == "name":
+            if not queries or not isinstance(queries[-1], ByRole):
+                parser.error("--name must follow a --role query.")
+            queries[-1] = queries[-1]._replace(name=value)
+        elif self.const == "role":
+            queries.append(ByRole(value))
+        elif self.const == "text":
+            queries.append(ByText(value))
+        else:
+            queries.append(ByLabelText(value))
+        setattr(namespace, self.dest, queries)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m unbrowsed",
+        description="Query HTML files and write one JSON line per file "
+        "and query.",
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="HTML files, directories or glob patterns"
+    )
+    for kind, help_text in [
+        ("role", "query elements by ARIA role"),
+        ("name", "accessible name of the preceding --role query"),
+        ("text", "query elements by text"),
+        ("label", "query form controls by label text"),
+    ]:
+        parser.add_argument(
+            f"--{kind}",
+            dest="queries",
+            default=[],
+            action=QueryAction,
+            const=kind,
+            metavar=kind.upper(),
+            help=help_text,
+        )
+    parser.add_argument(
+        "--lint",
+        action="store_true",
+        help="check the files against the default accessibility rules",
+    )
+    parser.add_argument(
+        "--inexact",
+        action="store_true",
+        help="match --text and --label substrings, ignoring case",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="worker processes (default: one per CPU, 1 runs inline)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, help="seconds each query may take"
+    )
+    parser.add_argument(
+        "--max-nodes", type=int, help="elements each query may visit"
+    )
+    parser.add_argument(
+        "--manifest",
+        help="a file keeping the results between runs: unchanged files are "
+        "not processed again, and their previous results are written",
+    )
+    parser.add_argument(
+        "--output",
+        type=argparse.FileType("w"),
+        default=sys.stdout,
+        help="where to write the JSON lines (default: stdout)",
+    )
+    return parser
+
+
+def write_records(
+    output: TextIO, batches: Iterable[list[dict[str, Any]]]
+) -> int:
+    """Write the records as JSON lines, returning the number of errors."""
+    errors = 0
+    for records in batches:
+        for record in records:
+            errors += "error" in record
+            output.write(json.dumps(record, ensure_ascii=False))
+            output.write("\n")
+    output.flush()
+    return errors
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Run the command line tool.
+
+    Returns 0 when every file was read and every query ran, 1 otherwise,
+    including when the output is closed before every record is written.
+
+    .. versionadded:: 0.1.0a24
+    """
+    parser = get_parser()
+    arguments = parser.parse_args(argv)
+    if not arguments.queries and not arguments.lint:
+        parser.error(
+            "at least one of --role, --text, --label or --lint is required."
+        )
+
+    queries = [
+        (
+            query._replace(exact=False)
+            if arguments.inexact and not isinstance(query, ByRole)
+            else query
+        )
+        for query in arguments.queries
+    ]
+    batch = Batch(
+        queries, arguments.lint, arguments.timeout, arguments.max_nodes
+    )
+    files = iter_files(arguments.paths)
+
+    manifest = None
+    if arguments.manifest:
+        manifest = Manifest(arguments.manifest, batch)
+
+    try:
+        if arguments.workers <= 1:
+            errors = write_records(
+                arguments.output, run_batch(files, batch, manifest=manifest)
+            )
+        else:
+            with ProcessPoolExecutor(
+                max_workers=arguments.workers
+            ) as executor:
+                window = arguments.workers * FILES_PER_WORKER
+                errors = write_records(
+                    arguments.output,
+                    run_batch(files, batch, executor, window, manifest),
+                )
+    except BrokenPipeError:
+        # The reader went away, as with ``| head``. Python flushes stdout
+        # again on exit, so point it at devnull to exit quietly.
+        if arguments.output is sys.stdout:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    if manifest is not None:
+        manifest.save()
+    return 1 if errors else 0
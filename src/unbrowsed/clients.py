@@ -0,0 +1,347 @@
+"""
+unbrowsed in-process clients.
+
+Call a WSGI or ASGI application without a server and query its response.
+The body chunks the application produces are collected as they are and
+joined once, straight into the bytes the parser reads. Each response
+parses its document at most once, so every query of a test shares one
+tree and one index.
+"""
+
+import asyncio
+import io
+from collections.abc import Iterable
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from unbrowsed.document import Document
+
+Headers = list[tuple[str, str]]
+
+
+def get_charset(content_type: Optional[str]) -> Optional[str]:
+    """Return the charset parameter of a ``Content-Type`` header."""
+    if not content_type:
+        return None
+    for parameter in content_type.split(";")[1:]:
+        name, _, value = parameter.partition("=")
+        if name.strip().lower() == "charset":
+            return value.strip().strip("\"'") or None
+    return None
+
+
+def get_encoding(charset: Optional[str]) -> Optional[str]:
+    """
+    Return the given charset if it names a text encoding Python can
+    decode, or else ``None``, so that the encoding is sniffed instead.
+    """
+    if charset is None:
+        return None
+    try:
+        b"<".decode(charset, errors="replace")
+    except (LookupError, UnicodeError):
+        return None
+    return charset
+
+
+def get_document(response: Any) -> Document:
+    """
+    Return the document of a response, creating it on first use.
+
+    Works with any response exposing its body as ``content`` bytes, like
+    the ones of the Django test client. The document is stored on the
+    response, so later calls return the same, already parsed, document.
+    An unknown ``charset`` of the response is ignored, and the encoding
+    sniffed from the content as if it had none.
+
+    Args:
+        response: The response to read.
+
+    Returns:
+        Document: The document of the response.
+
+    .. versionadded:: 0.1.0a24
+    """
+    document = getattr(response, "unbrowsed_document", None)
+    if document is None:
+        charset = getattr(response, "charset", None)
+        document = Document(response.content, encoding=get_encoding(charset))
+        try:
+            response.unbrowsed_document = document
+        except AttributeError:
+            pass
+    return document
+
+
+class Response:
+    """
+    A response of an application called in-process.
+
+    Attributes:
+        status_code: The HTTP status code.
+        headers: The response headers, as ``(name, value)`` pairs.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(self, status_code: int, headers: Headers, chunks: list):
+        self.status_code = status_code
+        self.headers = headers
+        self.chunks: Optional[list[bytes]] = chunks
+        self.body: Optional[bytes] = None
+        self.unbrowsed_document: Optional[Document] = None
+
+    def get_header(self, name: str) -> Optional[str]:
+        """Return the first header with the given name, if any."""
+        name = name.lower()
+        for header, value in self.headers:
+            if header.lower() == name:
+                return value
+        return None
+
+    @property
+    def charset(self) -> Optional[str]:
+        return get_charset(self.get_header("Content-Type"))
+
+    @property
+    def content(self) -> bytes:
+        """The response body, joined from its chunks on first use."""
+        if self.body is None:
+            self.body = b"".join(self.chunks or [])
+            self.chunks = None
+        return self.body
+
+    @property
+    def document(self) -> Document:
+        """The document of the response, parsed on first use."""
+        return get_document(self)
+
+
+def check_chunk(chunk: Any) -> bytes:
+    if not isinstance(chunk, bytes):
+        raise TypeError(
+            f"Response body chunks must be bytes, not {type(chunk).__name__}."
+        )
+    return chunk
+
+
+class WSGIClient:
+    """
+    Calls a WSGI application, such as Django's ``get_wsgi_application()``,
+    in-process.
+
+    Example::
+
+        client = WSGIClient(application)
+        response = client.get("/books/")
+        get_by_role(response.document, "heading", name="Books")
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(self, app: Any, server_name: str = "testserver"):
+        self.app = app
+        self.server_name = server_name
+
+    def get_environ(
+        self, method: str, path: str, body: bytes, headers: Headers
+    ) -> dict[str, Any]:
+        url = urlsplit(path)
+        environ = {
+            "REQUEST_METHOD": method.upper(),
+            "SCRIPT_NAME": "",
+            "PATH_INFO": url.path or "/",
+            "QUERY_STRING": url.query,
+            "SERVER_NAME": self.server_name,
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": io.StringIO(),
+            "wsgi.multithread": False,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in headers:
+            key = name.upper().replace("-", "_")
+            if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                key = f"HTTP_{key}"
+            environ[key] = value
+        return environ
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        headers: Optional[Headers] = None,
+    ) -> Response:
+        """
+        Call the application and collect its response.
+
+        Args:
+            method: The HTTP method.
+            path: The path, with an optional query string.
+            body: The request body.
+            headers: Extra request headers, as ``(name, value)`` pairs.
+
+        Returns:
+            Response: The response of the application.
+        """
+        environ = self.get_environ(method, path, body, headers or [])
+        chunks: list[bytes] = []
+        started: dict[str, Any] = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            # Nothing is sent before the whole body is collected, so an
+            # error page may always replace the response written so far.
+            if started and exc_info is None:
+                raise RuntimeError("start_response was already called.")
+            chunks.clear()
+            started["status"] = status
+            started["headers"] = response_headers
+            return lambda chunk: chunks.append(check_chunk(chunk))
+
+        result: Iterable[bytes] = self.app(environ, start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    chunks.append(check_chunk(chunk))
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
+
+        if not started:
+            raise RuntimeError("The application did not call start_response.")
+        status_code = int(started["status"].split(" ", 1)[0])
+        return Response(status_code, list(started["headers"]), chunks)
+
+    def get(self, path: str, headers: Optional[Headers] = None) -> Response:
+        return self.request("GET", path, headers=headers)
+
+    def post(
+        self,
+        path: str,
+        body: bytes = b"",
+        headers: Optional[Headers] = None,
+    ) -> Response:
+        return self.request("POST", path, body=body, headers=headers)
+
+
+class ASGIClient:
+    """
+    Calls an ASGI application, such as a Starlette app, in-process.
+
+    ``request``, ``get`` and ``post`` run the application in a new event
+    loop; from async code, await ``arequest`` instead.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(self, app: Any, server_name: str = "testserver"):
+        self.app = app
+        self.server_name = server_name
+
+    def get_scope(
+        self, method: str, path: str, headers: Headers
+    ) -> dict[str, Any]:
+        url = urlsplit(path)
+        raw_headers = [(b"host", self.server_name.encode())]
+        raw_headers.extend(
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers
+        )
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method.upper(),
+            "scheme": "http",
+            "path": url.path or "/",
+            "raw_path": (url.path or "/").encode(),
+            "query_string": url.query.encode(),
+            "root_path": "",
+            "headers": raw_headers,
+            "client": ("testclient", 50000),
+            "server": (self.server_name, 80),
+        }
+
+    async def arequest(
+        self,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        headers: Optional[Headers] = None,
+    ) -> Response:
+        """
+        Call the application and collect its response.
+
+        Args:
+            method: The HTTP method.
+            path: The path, with an optional query string.
+            body: The request body.
+            headers: Extra request headers, as ``(name, value)`` pairs.
+
+        Returns:
+            Response: The response of the application.
+        """
+        scope = self.get_scope(method, path, headers or [])
+        chunks: list[bytes] = []
+        started: dict[str, Any] = {}
+        request_sent = False
+        response_complete = asyncio.Event()
+
+        async def receive() -> dict[str, Any]:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body}
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                started["status"] = message["status"]
+                started["headers"] = [
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                chunk = check_chunk(message.get("body", b""))
+                if chunk:
+                    chunks.append(chunk)
+                if not message.get("more_body", False):
+                    response_complete.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            response_complete.set()
+
+        if not started:
+            raise RuntimeError("The application did not start a response.")
+        return Response(started["status"], started["headers"], chunks)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        headers: Optional[Headers] = None,
+    ) -> Response:
+        """Call the application from synchronous code."""
+        return asyncio.run(self.arequest(method, path, body, headers))
+
+    def get(self, path: str, headers: Optional[Headers] = None) -> Response:
+        return self.request("GET", path, headers=headers)
+
+    def post(
+        self,
+        path: str,
+        body: bytes = b"",
+        headers: Optional[Headers] = None,
+    ) -> Response:
+        return self.request("POST", path, body=body, headers=headers)
@@ -0,0 +1,212 @@
+"""
+unbrowsed lazy documents.
+
+A ``Document`` keeps the raw source of a page and parses it on first use.
+Text queries first check whether the searched text can occur in the source
+at all, and answer without parsing when it cannot.
+
+The check relies on how element text is built: the stripped text nodes of
+the element, joined in document order. Any element's text is therefore a
+substring of the text of the whole document, and text that is missing
+from the source can only have been split there by markup (``<``), a
+character reference (``&``), or a newline or NUL the parser rewrites.
+"""
+
+import codecs
+import functools
+import re
+from html.entities import html5
+from typing import Optional, Pattern, Union
+
+from unbrowsed.parser import (
+    HTMLDocument,
+    parse_html,
+    parse_html_bytes,
+    sniff_encoding,
+)
+
+# The characters str.strip() removes, which is how text nodes are stripped.
+WHITESPACE = (
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680"
+    "\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    "\u2028\u2029\u202f\u205f\u3000"
+)
+
+# Characters that can end a run of literal text in the source, including
+# the "]]>" closing a CDATA section in foreign content.
+BREAKS = "<&\r\x00]"
+
+# Non-ASCII characters whose lowercase form contains an ASCII letter.
+SPECIAL_LOWERCASE = {"i": "\u0130", "k": "\u212a"}
+
+# Split points are only looked for within this many leading characters.
+MAX_PREFIX = 64
+
+
+def get_variants(char: str, exact: bool) -> set[str]:
+    """Return the characters that match ``char`` in a text query."""
+    if exact:
+        return {char}
+    variants = {char.lower(), char.upper()}
+    if char.lower() in SPECIAL_LOWERCASE:
+        variants.add(SPECIAL_LOWERCASE[char.lower()])
+    return variants
+
+
+def get_reference_pattern(variants: set[str]) -> str:
+    """
+    Return a pattern matching the character references that can decode to
+    one of the given characters. A few named references decode to two
+    characters, so the text may start in the middle of one.
+    """
+    codes = {ord(variant) for variant in variants}
+    for code in range(0x80, 0xA0):
+        # References to C1 controls decode as windows-1252.
+        if bytes([code]).decode("cp1252", errors="ignore") in variants:
+            codes.add(code)
+
+    names = sorted(
+        {
+            name.rstrip(";")
+            for name, value in html5.items()
+            if not variants.isdisjoint(value)
+        }
+    )
+    alternatives = [
+        "#0*(?:%s)(?![0-9])" % "|".join(str(code) for code in sorted(codes)),
+        "#[xX]0*(?:%s)(?![0-9a-fA-F])"
+        % "|".join(f"{code:x}" for code in sorted(codes)),
+    ]
+    alternatives.extend(re.escape(name) for name in names)
+    return "&(?:%s)" % "|".join(alternatives)
+
+
+@functools.lru_cache(maxsize=256)
+def get_text_pattern(needle: str, exact: bool, binary: bool) -> Pattern:
+    """
+    Build the pattern matching every place of a source where the given
+    text could start: the text itself, a prefix of it cut short by a
+    break, or a character reference decoding to its first character.
+    """
+    end = min(len(needle) - 1, MAX_PREFIX)
+    nested = ""
+    for char in reversed(needle[1:end]):
+        nested = f"(?:{re.escape(char)}{nested})?"
+    # A split past MAX_PREFIX leaves this much of the text in one piece.
+    head = needle[: MAX_PREFIX + 1]
+    whitespace = "|".join(re.escape(char) for char in WHITESPACE)
+    breaks = "".join(re.escape(char) for char in BREAKS)
+
+    alternatives = [
+        re.escape(head),
+        f"{re.escape(needle[0])}{nested}(?:{whitespace})*[{breaks}]",
+        get_reference_pattern(get_variants(needle[0], exact)),
+    ]
+    pattern = "|".join(alternatives)
+    flags = 0 if exact else re.IGNORECASE
+    if binary:
+        return re.compile(pattern.encode(), flags)
+    return re.compile(pattern, flags)
+
+
+def could_contain_text(
+    source: Union[str, bytes], text: str, exact: bool = True
+) -> bool:
+    """
+    Check whether an element of the given source could match a text query.
+
+    Never returns ``False`` for a source ``query_by_text`` would find the
+    text in. Bytes must be UTF-8.
+
+    Args:
+        source: The raw HTML.
+        text: The text to search for.
+        exact: Whether the query is case-sensitive and matches full
+               strings.
+
+    Returns:
+        bool: ``False`` when no element can match.
+
+    .. versionadded:: 0.1.0a24
+    """
+    needle = text.strip()
+    if not needle or "\ufffd" in needle:
+        return True
+    if not exact and not needle.isascii():
+        return True
+
+    binary = isinstance(source, bytes)
+    if exact:
+        literal = needle.encode() if binary else needle
+        if source.find(literal) != -1:  # type: ignore
+            return True
+    else:
+        for char in set(needle.lower()) & set(SPECIAL_LOWERCASE):
+            special = SPECIAL_LOWERCASE[char]
+            literal = special.encode() if binary else special
+            if source.find(literal) != -1:  # type: ignore
+                return True
+
+    pattern = get_text_pattern(needle, exact, binary)
+    return pattern.search(source) is not None  # type: ignore
+
+
+class Document:
+    """
+    An HTML document parsed on first use.
+
+    Accepted by every query function in place of a parsed document. Text
+    and label queries check the raw source first, and find nothing
+    without parsing when the text cannot occur in it.
+
+    Example::
+
+        page = Document(response.content)
+        assert query_by_text(page, "Error") is None
+
+    Args:
+        source: The raw HTML, as ``str`` or ``bytes``.
+        encoding: The encoding of ``bytes`` sources. Defaults to the one
+                  found by ``sniff_encoding``.
+        tracked: Whether the parsed document is tracked. See
+                 ``HTMLDocument``.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(
+        self,
+        source: Union[str, bytes],
+        encoding: Optional[str] = None,
+        tracked: bool = False,
+    ):
+        self.source = source
+        self.encoding = encoding
+        self.tracked = tracked
+        self.parsed: Optional[HTMLDocument] = None
+        if isinstance(source, str):
+            self.searchable = True
+        else:
+            encoding = encoding or sniff_encoding(source)
+            self.searchable = codecs.lookup(encoding).name == "utf-8"
+
+    def parse(self) -> HTMLDocument:
+        """Return the parsed document, parsing the source once."""
+        if self.parsed is None:
+            if isinstance(self.source, str):
+                self.parsed = parse_html(self.source, tracked=self.tracked)
+            else:
+                self.parsed = parse_html_bytes(
+                    self.source, encoding=self.encoding, tracked=self.tracked
+                )
+        return self.parsed
+
+    def may_contain_text(self, text: str, exact: bool = True) -> bool:
+        """
+        Check whether an element of the document could match a text query.
+
+        Sources in encodings other than UTF-8 are never ruled out.
+        """
+        if not self.searchable:
+            return True
+        return could_contain_text(self.source, text, exact=exact)
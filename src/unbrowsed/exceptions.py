@@ -23,3 +23,27 @@ class NoElementsFoundError(Exception):
             NoElementsFoundError,
             (self.message,),
         )
+
+
+class QueryBudgetExceededError(Exception):
+    """
+    Raised when a query runs past its deadline or node budget.
+
+    Attributes:
+        message: The error message.
+        stats: The partial statistics of the query: the query function,
+               the limits, the elements visited and the elapsed seconds.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(self, message, stats=None):
+        self.message = message
+        self.stats = stats or {}
+        super().__init__(message)
+
+    def __reduce__(self):
+        return (
+            QueryBudgetExceededError,
+            (self.message, self.stats),
+        )
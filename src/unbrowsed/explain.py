@@ -0,0 +1,402 @@
+"""unbrowsed query plans."""
+
+import time
+from collections.abc import Callable
+from typing import Any, NamedTuple, Union
+
+from selectolax.lexbor import LexborHTMLParser as Parser
+from selectolax.lexbor import LexborNode
+
+from unbrowsed.document import Document
+from unbrowsed.index import get_index
+from unbrowsed.instrumentation import COUNTERS, stats
+from unbrowsed.matchers import TextMatch
+from unbrowsed.queries import (
+    ByLabelText,
+    ByRole,
+    ByText,
+    get_role_selector,
+    plan_label_query,
+    plan_role_query,
+    plan_text_query,
+)
+from unbrowsed.resolvers import (
+    AccessibleDescriptionResolver,
+    AccessibleNameResolver,
+    RoleResolver,
+    get_text,
+    select_first,
+)
+from unbrowsed.utils import get_selector, get_state_filters, is_parent_of
+
+Query = Union[ByRole, ByText, ByLabelText]
+
+
+class Stage(NamedTuple):
+    """
+    A filtering stage of a query plan.
+
+    Attributes:
+        name: What the stage filters on.
+        candidates: Elements entering the stage.
+        rejected: Elements the stage filtered out.
+        elapsed: Time spent in the stage, in seconds.
+        counters: The ``unbrowsed.stats()`` counters of the stage.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    name: str
+    candidates: int
+    rejected: int
+    elapsed: float
+    counters: dict[str, int]
+
+
+class QueryPlan(NamedTuple):
+    """
+    What the query engine did to answer a query.
+
+    Attributes:
+        query: The explained query.
+        strategy: The plan the query planner chooses: ``"index"`` when
+                  the document index already holds the candidates,
+                  ``"index build"`` when it has to be built, ``"scan"``,
+                  or ``"skip"`` when the document text cannot match.
+        selector: The CSS selector the candidates are drawn from, or an
+                  empty string when they come from the index or the query
+                  is skipped.
+        nodes_scanned: Elements matching the selector.
+        stages: The filtering stages, in the order the engine runs them.
+        comparisons: Ancestry checks made to break ties between nested
+                     matches.
+        matches: Elements left after all the filtering stages.
+        outcome: ``"none"``, ``"single"``, ``"nested"`` when nested matches
+                 resolve to a single element, or ``"multiple"`` when the
+                 query raises ``MultipleElementsFoundError``.
+        elapsed: Total time, in seconds.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    query: Query
+    strategy: str
+    selector: str
+    nodes_scanned: int
+    stages: list[Stage]
+    comparisons: int
+    matches: int
+    outcome: str
+    elapsed: float
+
+    def format(self) -> str:
+        """Render the plan as a human readable table."""
+        lines = [
+            repr(self.query),
+            f"strategy: {self.strategy}  selector: {self.selector}  "
+            f"scanned: {self.nodes_scanned}",
+            f"{'stage':<12}{'in':>8}{'rejected':>10}{'ms':>10}",
+        ]
+        for stage in self.stages:
+            lines.append(
+                f"{stage.name:<12}{stage.candidates:>8}{stage.rejected:>10}"
+                f"{stage.elapsed * 1000:>10.3f}"
+            )
+        lines.append(
+            f"outcome: {self.outcome} ({self.matches} matches, "
+            f"{self.comparisons} comparisons) "
+            f"in {self.elapsed * 1000:.3f} ms"
+        )
+        return "\n".join(lines)
+
+
+def run_stage(
+    stages: list[Stage],
+    name: str,
+    candidates: list[Any],
+    function: Callable[[list[Any]], list[Any]],
+) -> list[Any]:
+    """Run a filtering stage, recording its counts and timing."""
+    with stats() as counters:
+        start = time.perf_counter()
+        kept = function(candidates)
+        elapsed = time.perf_counter() - start
+    stages.append(
+        Stage(
+            name=name,
+            candidates=len(candidates),
+            rejected=len(candidates) - len(kept),
+            elapsed=elapsed,
+            counters={
+                counter: getattr(counters, counter) for counter in COUNTERS
+            },
+        )
+    )
+    return kept
+
+
+def break_ties(matches: list[LexborNode], limit: int) -> tuple[str, int]:
+    """
+    Replay the nesting tie-break of the queries on the first ``limit``
+    matches, returning the outcome and the number of comparisons.
+    """
+    if not matches:
+        return "none", 0
+    if len(matches) == 1:
+        return "single", 0
+
+    comparisons = 0
+    matches = matches[:limit]
+    for i, parent in enumerate(matches):
+        for j, child in enumerate(matches):
+            if i != j:
+                comparisons += 1
+                if is_parent_of(parent, child):
+                    return "nested", comparisons
+    return "multiple", comparisons
+
+
+def explain(dom: Union[Parser, Document], query: Query) -> QueryPlan:
+    """
+    Explain how the query engine answers the given query.
+
+    The query is run stage by stage, counting the candidates each stage
+    rejects. Unlike the query functions, every stage sees all the
+    candidates, so the counts show the full selectivity of each filter.
+
+    Example::
+
+        plan = explain(dom, ByRole("button", name="Save"))
+        print(plan.format())
+
+    .. versionadded:: 0.1.0a24
+    """
+    start = time.perf_counter()
+    if isinstance(dom, Document):
+        dom = dom.parse()
+    if isinstance(query, ByRole):
+        plan = explain_role(dom, query)
+    elif isinstance(query, ByText):
+        plan = explain_text(dom, query)
+    elif isinstance(query, ByLabelText):
+        plan = explain_label_text(dom, query)
+    else:
+        raise TypeError(f"Cannot explain {query!r}.")
+    return plan._replace(elapsed=time.perf_counter() - start)
+
+
+def explain_role(dom: Parser, query: ByRole) -> QueryPlan:
+    """
+    Replay the plan the query planner chooses for a role query, without
+    building any part of the document index.
+
+    An ``"index"`` plan starts from the elements the index holds, an
+    ``"index build"`` plan from every element of the document, which the
+    index would classify, and a ``"scan"`` from the elements the role
+    selector matches.
+    """
+    role = query.role.lower()
+    stages: list[Stage] = []
+    index = get_index(dom)
+    strategy, _ = plan_role_query(index, role, query.name)
+
+    if strategy == "index":
+        selector = ""
+        scanned = []
+        role_elements = index.get_role_elements(role)
+    else:
+        selector = (
+            "*" if strategy == "index build" else get_role_selector(role)
+        )
+        scanned = dom.css(selector)
+        role_elements = scanned
+
+    def filter_roles(elements: list[LexborNode]) -> list[LexborNode]:
+        return [
+            element
+            for element in elements
+            if (role == "document" or element.tag not in ["html", "body"])
+            and (
+                strategy == "index"
+                or role
+                in RoleResolver(element=element, target_role="").get_roles()
+            )
+        ]
+
+    candidates = run_stage(stages, "role", role_elements, filter_roles)
+
+    if query.name is not None:
+
+        def filter_names(elements: list[LexborNode]) -> list[LexborNode]:
+            if not index.has_named_elements(role):
+                return [
+                    element
+                    for element in elements
+                    if AccessibleNameResolver(element).resolve() == query.name
+                ]
+            named = {
+                element.mem_id
+                for element in index.get_named_elements(role, query.name)
+            }
+            return [element for element in elements if element.mem_id in named]
+
+        candidates = run_stage(stages, "name", candidates, filter_names)
+
+    state_filters = get_state_filters(
+        checked=query.checked,
+        selected=query.selected,
+        pressed=query.pressed,
+        expanded=query.expanded,
+        disabled=query.disabled,
+        level=query.level,
+    )
+    if state_filters:
+        candidates = run_stage(
+            stages,
+            "state",
+            candidates,
+            lambda elements: [
+                element
+                for element in elements
+                if index.matches_states(element, state_filters, build=False)
+            ],
+        )
+
+    if query.description is not None:
+        candidates = run_stage(
+            stages,
+            "description",
+            candidates,
+            lambda elements: [
+                element
+                for element in elements
+                if AccessibleDescriptionResolver(element).resolve()
+                == query.description
+            ],
+        )
+
+    if query.current is not None:
+        expected = str(query.current).lower() == "true"
+        candidates = run_stage(
+            stages,
+            "current",
+            candidates,
+            lambda elements: [
+                element
+                for element in elements
+                if (element.attributes.get("aria-current", "") == "true")
+                == expected
+            ],
+        )
+
+    outcome, comparisons = break_ties(candidates, limit=2)
+    return QueryPlan(
+        query=query,
+        strategy=strategy,
+        selector=selector,
+        nodes_scanned=len(scanned),
+        stages=stages,
+        comparisons=comparisons,
+        matches=len(candidates),
+        outcome=outcome,
+        elapsed=0.0,
+    )
+
+
+def explain_text(dom: Parser, query: ByText) -> QueryPlan:
+    """
+    Replay the plan the query planner chooses for a text query: nothing is
+    scanned when it is skipped, an ``"index"`` plan looks the text up in
+    the elements the index holds, and the other plans scan every element,
+    like building the index would.
+    """
+    search_text = TextMatch(query.text, exact=query.exact)
+    stages: list[Stage] = []
+    index = get_index(dom)
+    strategy, _ = plan_text_query(index, search_text)
+
+    if strategy == "index":
+        selector = ""
+        scanned = []
+        candidates = run_stage(
+            stages,
+            "text",
+            index.text_elements,
+            lambda _: index.get_text_elements(search_text),
+        )
+    else:
+        selector = "" if strategy == "skip" else get_selector()
+        scanned = dom.css(selector) if selector else []
+        candidates = run_stage(
+            stages,
+            "text",
+            scanned,
+            lambda elements: [
+                element
+                for element in elements
+                if search_text.matches(get_text(element))
+            ],
+        )
+
+    outcome, comparisons = break_ties(candidates, limit=len(candidates))
+    return QueryPlan(
+        query=query,
+        strategy=strategy,
+        selector=selector,
+        nodes_scanned=len(scanned),
+        stages=stages,
+        comparisons=comparisons,
+        matches=len(candidates),
+        outcome=outcome,
+        elapsed=0.0,
+    )
+
+
+def explain_label_text(dom: Parser, query: ByLabelText) -> QueryPlan:
+    selector = "label"
+    search_text = TextMatch(query.text, exact=query.exact)
+    stages: list[Stage] = []
+    strategy, _ = plan_label_query(get_index(dom), search_text)
+    if strategy == "skip":
+        selector = ""
+
+    def find_targets(labels: list[LexborNode]) -> list[LexborNode]:
+        targets = []
+        for label in labels:
+            if target_id := label.attributes.get("for"):
+                target = select_first(dom, f"#{target_id}")  # type: ignore
+            else:
+                target = select_first(label, "input, select, textarea")
+            if target is not None:
+                targets.append(target)
+        return targets
+
+    scanned = dom.css(selector) if selector else []
+    labels = run_stage(
+        stages,
+        "label",
+        scanned,
+        lambda elements: [
+            element
+            for element in elements
+            if search_text.matches(get_text(element))
+        ],
+    )
+    candidates = run_stage(stages, "control", labels, find_targets)
+
+    outcome = "none"
+    if len(candidates) > 1:
+        outcome = "multiple"
+    elif candidates:
+        outcome = "single"
+    return QueryPlan(
+        query=query,
+        strategy=strategy,
+        selector=selector,
+        nodes_scanned=len(scanned),
+        stages=stages,
+        comparisons=0,
+        matches=len(candidates),
+        outcome=outcome,
+        elapsed=0.0,
+    )
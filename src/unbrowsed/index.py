@@ -0,0 +1,521 @@
+"""unbrowsed document indexes."""
+
+from collections import Counter
+from functools import cached_property
+from collections.abc import Hashable
+from typing import Any, Optional
+
+from selectolax.lexbor import LexborHTMLParser as Parser
+from selectolax.lexbor import LexborNode
+
+from unbrowsed.budgets import BUDGETS, spend
+from unbrowsed.instrumentation import ACTIVE, record
+from unbrowsed.matchers import TextMatch
+from unbrowsed.resolvers import (
+    AccessibleNameResolver,
+    RoleResolver,
+    StateResolver,
+)
+from unbrowsed.types import ElementState
+from unbrowsed.utils import get_path, get_selector
+
+try:
+    from unbrowsed.nodetable import NodeTable
+except ImportError:  # pragma: no cover
+    NodeTable = None  # type: ignore
+
+DEFAULT_STATE = ElementState()
+
+# The form controls a disabled <fieldset> disables.
+FIELDSET_CONTROLS = ("button", "fieldset", "input", "select", "textarea")
+
+# The implicit roles of the tags whose role depends on their attributes or
+# their context.
+CONTEXT_ROLES = {
+    "a": ("link", "generic"),
+    "footer": ("contentinfo", "generic"),
+    "img": ("img", "presentation"),
+    "select": ("combobox", "listbox"),
+    "td": ("cell", "gridcell"),
+}
+
+
+def is_disabled_by_fieldset(element: LexborNode) -> bool:
+    """
+    Check whether an element inherits ``disabled`` from a disabled
+    ``<fieldset>``, like ``DocumentIndex.build_state_table`` does.
+    """
+    if element.tag not in FIELDSET_CONTROLS:
+        return False
+    child = element
+    parent = element.parent
+    while parent is not None:
+        if parent.tag == "fieldset" and "disabled" in parent.attributes:
+            legend = child.tag == "legend"
+            sibling = child.prev
+            while legend and sibling is not None:
+                legend = sibling.tag != "legend"
+                sibling = sibling.prev
+            if not legend:
+                return True
+        child, parent = parent, parent.parent
+    return False
+
+
+def is_disabled_by_optgroup(element: LexborNode) -> bool:
+    """Check whether an ``<option>`` is in a disabled ``<optgroup>``."""
+    parent = element.parent
+    return (
+        element.tag == "option"
+        and parent is not None
+        and parent.tag == "optgroup"
+        and "disabled" in parent.attributes
+    )
+
+
+def resolve_state(element: LexborNode) -> ElementState:
+    """Resolve the ARIA states of a single element."""
+    state = StateResolver(element).resolve()
+    if not state.disabled and (
+        is_disabled_by_fieldset(element) or is_disabled_by_optgroup(element)
+    ):
+        state = state._replace(disabled=True)
+    return state
+
+
+def get_possible_roles(element: LexborNode) -> set[str]:
+    """
+    Return the roles of an element, and the other roles its context may
+    give it, so that it is found in the role tables either way.
+    """
+    roles = set(RoleResolver(element=element, target_role="").get_roles())
+    roles.update(CONTEXT_ROLES.get(element.tag, ()))  # type: ignore
+    return roles
+
+
+def insert_ordered(elements: list[LexborNode], element: LexborNode) -> None:
+    """Insert an element into a list of elements in document order."""
+    path = get_path(element)
+    low, high = 0, len(elements)
+    if high and get_path(elements[-1]) < path:
+        low = high
+    while low < high:
+        middle = (low + high) // 2
+        if get_path(elements[middle]) < path:
+            low = middle + 1
+        else:
+            high = middle
+    elements.insert(low, element)
+
+
+class DocumentStats:
+    """
+    Cheap statistics of a document, computed on first use, from which the
+    query planner estimates the cost of its plans.
+
+    Attributes:
+        elements: The number of elements.
+        tags: The number of elements of each tag.
+        roles: The number of elements of each explicit role.
+        text: The deep, stripped text of the document, which contains the
+              text of each of its elements.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(self, dom: Parser):
+        self.dom = dom
+
+    @cached_property
+    def elements(self) -> int:
+        return len(self.dom.css("*"))
+
+    @cached_property
+    def tags(self) -> Counter[str]:
+        elements = self.dom.css("*")
+        if ACTIVE.get():
+            record("selector_calls")
+            record("nodes_visited", len(elements))
+        return Counter(element.tag for element in elements)
+
+    @cached_property
+    def roles(self) -> Counter[str]:
+        elements = self.dom.css("[role]")
+        if ACTIVE.get():
+            record("selector_calls")
+        return Counter(
+            (element.attributes.get("role") or "").lower()
+            for element in elements
+        )
+
+    @cached_property
+    def text(self) -> str:
+        root = self.dom.root
+        return root.text(deep=True, strip=True) if root is not None else ""
+
+    @property
+    def text_length(self) -> int:
+        return len(self.text)
+
+    def count(self, elements: list[LexborNode], sign: int = 1) -> None:
+        """
+        Count elements added to the document, or with a negative ``sign``,
+        removed from it, in the statistics computed so far.
+        """
+        known = self.__dict__
+        if "elements" in known:
+            self.elements += sign * len(elements)
+        for element in elements:
+            if "tags" in known:
+                self.tags[element.tag] += sign  # type: ignore
+            role = element.attributes.get("role")
+            if role is not None and "roles" in known:
+                self.roles[role.lower()] += sign
+        known.pop("text", None)
+
+
+class DocumentIndex:
+    """
+    Lookup tables for a single document, built lazily on first use.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(self, dom: Parser):
+        self.dom = dom
+        self.kept = False
+        self.states: Optional[dict[LexborNode, ElementState]] = None
+        self.roles: Optional[dict[str, list[LexborNode]]] = None
+        self.table: Optional["NodeTable"] = None
+        # Edits made since the table was built: the elements it holds that
+        # were removed or classified again, and the roles of the elements
+        # added, by ``mem_id``.
+        self.table_removed: set[int] = set()
+        self.table_added: dict[int, tuple[LexborNode, list[str]]] = {}
+        self.names: dict[str, dict[Optional[str], list[LexborNode]]] = {}
+        self.texts: Optional[dict[str, list[int]]] = None
+        self.text_elements: list[LexborNode] = []
+        self.stats = DocumentStats(dom)
+        # The estimated cost of the scans run instead of building an
+        # index, by kind of query.
+        self.costs: dict[str, int] = {}
+        # The generation of the document the index was built for, and the
+        # outcomes of the queries answered since.
+        self.generation = 0
+        self.results: dict[Hashable, Any] = {}
+        # The hash of the markup of the document, see ``get_digest``.
+        self.digest: Optional[bytes] = None
+
+    def is_kept(self) -> bool:
+        """Check whether the index is kept between queries."""
+        return self.kept
+
+    def get_role_elements(self, role: str) -> list[LexborNode]:
+        """
+        Return the elements matching the given role, in document order.
+
+        Matches the same elements as ``RoleResolver.matches``. When NumPy
+        is installed, roles are classified with a ``NodeTable`` and each
+        role is materialized on first use.
+        """
+        role = role.lower()
+        if NodeTable is None:
+            if self.roles is None:
+                self.roles = self.build_role_table()
+            return self.roles.get(role, [])
+
+        if self.roles is None:
+            self.roles = {}
+        if role not in self.roles:
+            if self.table is None:
+                self.table = NodeTable(self.dom)
+                if ACTIVE.get():
+                    record("nodes_visited", len(self.table))
+            self.roles[role] = self.get_table_elements(role)
+        return self.roles[role]
+
+    def get_table_elements(self, role: str) -> list[LexborNode]:
+        """
+        Return the elements the ``NodeTable`` classifies with a role,
+        patched with the edits made since it was built.
+        """
+        elements = self.table.get_role_elements(role)  # type: ignore
+        if self.table_removed:
+            elements = [
+                element
+                for element in elements
+                if element.mem_id not in self.table_removed
+            ]
+        for element, roles in self.table_added.values():
+            if role in roles:
+                insert_ordered(elements, element)
+        return elements
+
+    def uses_table(self) -> bool:
+        """Check whether roles are classified with a ``NodeTable``."""
+        return NodeTable is not None
+
+    def has_role_elements(self, role: str) -> bool:
+        """Check whether the elements of the given role are already known."""
+        return self.roles is not None and (
+            NodeTable is None or role.lower() in self.roles
+        )
+
+    def has_named_elements(self, role: str) -> bool:
+        """Check whether the names of the given role are already known."""
+        return role.lower() in self.names
+
+    def get_named_elements(
+        self, role: str, name: Optional[str]
+    ) -> list[LexborNode]:
+        """
+        Return the elements matching the given role and accessible name,
+        in document order.
+        """
+        role = role.lower()
+        names = self.names.get(role)
+        if names is None:
+            # Stored once complete, so that a query interrupted by its
+            # budget leaves no partial table behind.
+            names = {}
+            for element in self.get_role_elements(role):
+                if BUDGETS.get():
+                    spend()
+                element_name = AccessibleNameResolver(element).resolve()
+                names.setdefault(element_name, []).append(element)
+            self.names[role] = names
+        return names.get(name, [])
+
+    def build_role_table(self) -> dict[str, list[LexborNode]]:
+        """Resolve the roles of every element in a single pass."""
+        roles: dict[str, list[LexborNode]] = {}
+        elements = self.dom.css("*")
+        for element in elements:
+            if BUDGETS.get():
+                spend()
+            resolver = RoleResolver(element=element, target_role="")
+            for role in resolver.get_roles():
+                roles.setdefault(role, []).append(element)
+
+        if ACTIVE.get():
+            record("selector_calls")
+            record("nodes_visited", len(elements))
+        return roles
+
+    def has_text_table(self) -> bool:
+        """Check whether the texts of the elements are already known."""
+        return self.texts is not None
+
+    def get_text_elements(self, search_text: TextMatch) -> list[LexborNode]:
+        """
+        Return the elements whose text matches, in document order.
+
+        Exact matches are looked up by text; other matches check each
+        distinct text once.
+        """
+        if self.texts is None:
+            self.texts = self.build_text_table()
+        if search_text.exact:
+            positions = self.texts.get(search_text.text, [])
+        else:
+            positions = []
+            for text, text_positions in self.texts.items():
+                if BUDGETS.get():
+                    spend()
+                if search_text.matches(text):
+                    positions.extend(text_positions)
+            positions.sort()
+        return [self.text_elements[position] for position in positions]
+
+    def build_text_table(self) -> dict[str, list[int]]:
+        """Map the text of every element to its positions."""
+        texts: dict[str, list[int]] = {}
+        elements = self.dom.css(get_selector())
+        for position, element in enumerate(elements):
+            if BUDGETS.get():
+                spend()
+            text = element.text(deep=True, strip=True)
+            texts.setdefault(text, []).append(position)
+        self.text_elements = elements
+
+        if ACTIVE.get():
+            record("selector_calls")
+            record("nodes_visited", len(elements))
+            record("text_extractions", len(elements))
+        return texts
+
+    def get_state(
+        self, element: LexborNode, build: bool = True
+    ) -> ElementState:
+        """
+        Return the ARIA states of the given element.
+
+        Unless ``build`` is true, the states of a single element are
+        resolved when the state table is not built yet.
+        """
+        if self.states is None:
+            if not build:
+                return resolve_state(element)
+            self.states = self.build_state_table()
+        return self.states.get(element, DEFAULT_STATE)
+
+    def matches_states(
+        self,
+        element: LexborNode,
+        state_filters: dict[str, Any],
+        build: bool = True,
+    ) -> bool:
+        """Check the element's states against the given state filters."""
+        state = self.get_state(element, build)
+        for name, expected in state_filters.items():
+            if getattr(state, name) != expected:
+                return False
+        return True
+
+    def build_state_table(self) -> dict[LexborNode, ElementState]:
+        """
+        Resolve the states of every element in a single depth-first pass.
+
+        Only elements whose states differ from the defaults are stored.
+        Form controls inherit ``disabled`` from a disabled ``<fieldset>``,
+        except for the contents of its first ``<legend>``, and options from
+        a disabled ``<optgroup>``.
+        """
+        states = {}
+        root = self.dom.root
+        stack = [(root, False)] if root is not None else []
+        visited = 0
+
+        while stack:
+            node, inherited_disabled = stack.pop()
+            visited += 1
+            if BUDGETS.get():
+                spend()
+            state = StateResolver(node).resolve()
+            if not state.disabled and (
+                (inherited_disabled and node.tag in FIELDSET_CONTROLS)
+                or is_disabled_by_optgroup(node)
+            ):
+                state = state._replace(disabled=True)
+            if state != DEFAULT_STATE:
+                states[node] = state
+
+            children_disabled = inherited_disabled
+            exempt_legend = False
+            if node.tag == "fieldset" and "disabled" in node.attributes:
+                children_disabled = exempt_legend = True
+
+            child = node.child
+            while child is not None:
+                if child.is_element_node:
+                    if exempt_legend and child.tag == "legend":
+                        exempt_legend = False
+                        stack.append((child, inherited_disabled))
+                    else:
+                        stack.append((child, children_disabled))
+                child = child.next
+
+        if ACTIVE.get():
+            record("nodes_visited", visited)
+        return states
+
+    def remove_elements(self, elements: list[LexborNode]) -> None:
+        """
+        Drop elements from the role, name and state tables, before they
+        are removed from the document or their roles and names change.
+        """
+        removed = {element.mem_id for element in elements}
+        if self.table is not None:
+            self.table_removed.update(removed)
+            for mem_id in removed:
+                self.table_added.pop(mem_id, None)
+        roles: set[str] = set()
+        for element in elements:
+            roles.update(get_possible_roles(element))
+            if self.states is not None:
+                self.states.pop(element, None)
+
+        for role in roles:
+            if self.roles is not None and role in self.roles:
+                self.roles[role] = [
+                    element
+                    for element in self.roles[role]
+                    if element.mem_id not in removed
+                ]
+            names = self.names.get(role, {})
+            for name in list(names):
+                names[name] = [
+                    element
+                    for element in names[name]
+                    if element.mem_id not in removed
+                ]
+                if not names[name]:
+                    del names[name]
+
+    def add_elements(self, elements: list[LexborNode]) -> None:
+        """
+        Add elements to the role, name and state tables built so far,
+        after they are inserted into the document or their roles and names
+        change.
+
+        Elements keep their document order. The ``NodeTable`` is kept, and
+        the roles of the elements are added to the ones it classifies.
+        """
+        for element in elements:
+            roles = RoleResolver(element=element, target_role="").get_roles()
+            if self.table is not None:
+                self.table_added[element.mem_id] = (element, roles)
+            for role in roles:
+                if self.roles is not None and (
+                    NodeTable is None or role in self.roles
+                ):
+                    insert_ordered(self.roles.setdefault(role, []), element)
+                names = self.names.get(role)
+                if names is not None:
+                    name = AccessibleNameResolver(element).resolve()
+                    insert_ordered(names.setdefault(name, []), element)
+            if self.states is not None:
+                state = resolve_state(element)
+                if state != DEFAULT_STATE:
+                    self.states[element] = state
+
+    def mark_updated(self) -> None:
+        """
+        Record that the document was edited and the index patched to
+        match: the text table is rebuilt on demand, remembered results and
+        the digest are dropped, and the document starts a new generation.
+        """
+        self.texts = None
+        self.text_elements = []
+        self.results.clear()
+        self.digest = None
+        self.generation = getattr(self.dom, "generation", 0) + 1
+        self.dom.generation = self.generation  # type: ignore
+
+
+def get_index(dom: Parser) -> DocumentIndex:
+    """
+    Return the index of the given document.
+
+    Tracked documents, parsed with ``parse_html(html, tracked=True)``, keep
+    their index between queries, and it is rebuilt when their generation
+    changes: when they are edited through ``unbrowsed.mutations``, or
+    ``invalidate()`` is called after editing them with selectolax. The
+    document is never serialized to check it. Other documents get a fresh
+    index every time, so that edits made with selectolax are always seen.
+
+    .. versionadded:: 0.1.0a24
+    """
+    if not getattr(dom, "tracked", False):
+        return DocumentIndex(dom)
+
+    generation = getattr(dom, "generation", 0)
+    index = getattr(dom, "_unbrowsed_index", None)
+    if index is not None and index.generation == generation:
+        return index
+
+    index = DocumentIndex(dom)
+    dom._unbrowsed_index = index  # type: ignore
+    index.kept = True
+    index.generation = generation
+    return index
@@ -0,0 +1,212 @@
+"""unbrowsed instrumentation."""
+
+import functools
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, NamedTuple, TypeVar
+
+COUNTERS = (
+    "nodes_visited",
+    "role_candidates",
+    "name_resolutions",
+    "description_resolutions",
+    "text_extractions",
+    "selector_calls",
+)
+
+# Collectors of the active ``stats()`` blocks, and the names of the query
+# functions currently running, in the current thread or task. Hot code
+# paths check ``ACTIVE.get()`` before recording anything, so
+# instrumentation costs next to nothing when disabled.
+ACTIVE: ContextVar[tuple["QueryStats", ...]] = ContextVar("ACTIVE", default=())
+CALLS: ContextVar[tuple[str, ...]] = ContextVar("CALLS", default=())
+
+# Guards the collectors, which queries run in several threads at once, as
+# by the asyncio API, update together.
+COLLECTORS_LOCK = threading.Lock()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class QueryCounters:
+    """
+    Counters for a single query function.
+
+    Attributes:
+        calls: Number of calls.
+        elapsed: Total wall time spent in the function, in seconds.
+        nodes_visited: Elements iterated while scanning the document or
+                       building an index.
+        role_candidates: Elements left after role filtering.
+        name_resolutions: Accessible names computed.
+        description_resolutions: Accessible descriptions computed.
+        text_extractions: Calls to ``text()`` on elements.
+        selector_calls: CSS selector calls, including IDREF lookups.
+        plans: Number of queries run with each plan of the query planner,
+               such as ``"scan"`` or ``"index"``.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.elapsed = 0.0
+        self.nodes_visited = 0
+        self.role_candidates = 0
+        self.name_resolutions = 0
+        self.description_resolutions = 0
+        self.text_extractions = 0
+        self.selector_calls = 0
+        self.plans: dict[str, int] = {}
+
+    def as_dict(self) -> dict[str, Any]:
+        counters = {
+            counter: getattr(self, counter)
+            for counter in ("calls", "elapsed") + COUNTERS
+        }
+        counters["plans"] = dict(self.plans)
+        return counters
+
+
+class QueryCall(NamedTuple):
+    """
+    A top-level call to a query function.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    name: str
+    args: tuple
+    kwargs: dict[str, Any]
+    elapsed: float
+    nodes_visited: int
+
+    def describe(self) -> str:
+        """Render the call without the document argument."""
+        arguments = [repr(arg) for arg in self.args[1:]]
+        arguments += [f"{key}={value!r}" for key, value in self.kwargs.items()]
+        return f"{self.name}({', '.join(arguments)})"
+
+
+class QueryStats(QueryCounters):
+    """
+    Counters collected inside a ``stats()`` block.
+
+    The attributes hold the totals; ``queries`` breaks them down by query
+    function. Counters are inclusive: work done by ``query_by_role`` while
+    called from ``get_by_role`` is counted for both functions, but only
+    once in the totals. ``history`` lists the top-level calls.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.queries: dict[str, QueryCounters] = {}
+        self.history: list[QueryCall] = []
+
+    def get_query(self, name: str) -> QueryCounters:
+        if name not in self.queries:
+            self.queries[name] = QueryCounters()
+        return self.queries[name]
+
+    def as_dict(self) -> dict[str, Any]:
+        totals = super().as_dict()
+        totals["queries"] = {
+            name: counters.as_dict() for name, counters in self.queries.items()
+        }
+        return totals
+
+
+@contextmanager
+def stats() -> Iterator[QueryStats]:
+    """
+    Collect query statistics for the duration of the block.
+
+    Example::
+
+        with unbrowsed.stats() as s:
+            get_by_role(dom, "button", name="Save")
+
+        print(s.nodes_visited, s.queries["get_by_role"].elapsed)
+
+    Blocks can be nested; each one sees everything run inside it.
+
+    .. versionadded:: 0.1.0a24
+    """
+    collector = QueryStats()
+    token = ACTIVE.set(ACTIVE.get() + (collector,))
+    try:
+        yield collector
+    finally:
+        ACTIVE.reset(token)
+
+
+def record(counter: str, amount: int = 1) -> None:
+    """
+    Add to a counter of every active collector.
+
+    Callers check ``ACTIVE.get()`` first, so that nothing is computed when
+    instrumentation is disabled.
+    """
+    running = set(CALLS.get())
+    with COLLECTORS_LOCK:
+        for collector in ACTIVE.get():
+            setattr(collector, counter, getattr(collector, counter) + amount)
+            for name in running:
+                counters = collector.get_query(name)
+                setattr(counters, counter, getattr(counters, counter) + amount)
+
+
+def record_plan(plan: str) -> None:
+    """Count a query plan for every active collector."""
+    running = set(CALLS.get())
+    with COLLECTORS_LOCK:
+        for collector in ACTIVE.get():
+            collector.plans[plan] = collector.plans.get(plan, 0) + 1
+            for name in running:
+                counters = collector.get_query(name)
+                counters.plans[plan] = counters.plans.get(plan, 0) + 1
+
+
+def instrumented(function: F) -> F:
+    """Record the calls and elapsed time of a query function."""
+    name = function.__name__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not ACTIVE.get():
+            return function(*args, **kwargs)
+
+        collectors = ACTIVE.get()
+        visited = [collector.nodes_visited for collector in collectors]
+        calls = CALLS.get()
+        token = CALLS.set(calls + (name,))
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            CALLS.reset(token)
+            with COLLECTORS_LOCK:
+                for collector, before in zip(collectors, visited):
+                    counters = collector.get_query(name)
+                    counters.calls += 1
+                    counters.elapsed += elapsed
+                    if not calls:
+                        collector.calls += 1
+                        collector.elapsed += elapsed
+                        collector.history.append(
+                            QueryCall(
+                                name=name,
+                                args=args,
+                                kwargs=kwargs,
+                                elapsed=elapsed,
+                                nodes_visited=collector.nodes_visited - before,
+                            )
+                        )
+
+    return wrapper  # type: ignore
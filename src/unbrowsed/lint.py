@@ -0,0 +1,313 @@
+"""
+unbrowsed accessibility lint.
+
+Rules declare the roles, tags and attributes of the elements they check.
+``lint`` walks the document once, resolves each element's roles once, and
+hands the element only to the rules interested in it. Accessible names are
+resolved on first use and shared by every rule, so adding a rule costs the
+checks it makes, not another pass over the document.
+"""
+
+from collections.abc import Iterable, Iterator, Sequence
+from functools import cached_property
+from typing import NamedTuple, Optional, Union
+
+from selectolax.lexbor import LexborHTMLParser as Parser
+from selectolax.lexbor import LexborNode
+
+from unbrowsed.document import Document
+from unbrowsed.instrumentation import ACTIVE, record
+from unbrowsed.memo import SubtreeMemo
+from unbrowsed.resolvers import AccessibleNameResolver, RoleResolver
+from unbrowsed.utils import get_css_path
+
+LANDMARK_ROLES = frozenset(
+    {
+        "banner",
+        "complementary",
+        "contentinfo",
+        "form",
+        "main",
+        "navigation",
+        "region",
+        "search",
+    }
+)
+
+# Landmark roles that only make landmarks of named elements.
+NAMED_LANDMARK_ROLES = frozenset({"form", "region"})
+
+FORM_CONTROL_ROLES = frozenset(
+    {
+        "checkbox",
+        "combobox",
+        "listbox",
+        "radio",
+        "searchbox",
+        "textbox",
+    }
+)
+
+
+class Finding(NamedTuple):
+    """
+    A problem found by a lint rule.
+
+    Attributes:
+        rule: The id of the rule.
+        message: What is wrong.
+        locator: A CSS selector locating the element.
+        role: The role of the element, if it has one.
+        name: The accessible name of the element, if it has one.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    rule: str
+    message: str
+    locator: str
+    role: Optional[str]
+    name: Optional[str]
+
+
+class LintNode:
+    """
+    An element being linted, with its roles and accessible name resolved
+    at most once for all the rules.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(self, element: LexborNode, roles: list[str]):
+        self.element = element
+        self.roles = roles
+
+    @property
+    def tag(self) -> str:
+        return self.element.tag
+
+    @property
+    def role(self) -> Optional[str]:
+        """The role of the element, explicit role first."""
+        return self.roles[0] if self.roles else None
+
+    @cached_property
+    def name(self) -> Optional[str]:
+        """The accessible name of the element."""
+        return AccessibleNameResolver(self.element).resolve()
+
+    def has_ancestor(self, tag: str) -> bool:
+        parent = self.element.parent
+        while parent is not None:
+            if parent.tag == tag:
+                return True
+            parent = parent.parent
+        return False
+
+    def finding(self, rule: "Rule", message: str) -> Finding:
+        return Finding(
+            rule=rule.id,
+            message=message,
+            locator=get_css_path(self.element),
+            role=self.role,
+            name=self.__dict__.get("name"),
+        )
+
+
+class Rule:
+    """
+    Base class of lint rules.
+
+    A rule checks the elements having one of its ``roles``, ``tags`` or
+    ``attributes``; a rule declaring none of them checks every element.
+    Rules comparing elements with each other set ``collect`` and report
+    from ``finish``, which receives every element the rule was given.
+
+    Example::
+
+        class NoPositiveTabindex(Rule):
+            id = "tabindex"
+            attributes = frozenset({"tabindex"})
+
+            def check(self, node):
+                if node.element.attributes["tabindex"].strip() not in (
+                    "0",
+                    "-1",
+                ):
+                    return "Avoid a positive tabindex."
+                return None
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    id = ""
+    roles: frozenset[str] = frozenset()
+    tags: frozenset[str] = frozenset()
+    attributes: frozenset[str] = frozenset()
+    collect = False
+
+    def check(self, node: LintNode) -> Optional[str]:
+        """Return what is wrong with the element, or ``None``."""
+        return None
+
+    def finish(self, nodes: list[LintNode]) -> Iterable[tuple[LintNode, str]]:
+        """Report problems spanning several elements."""
+        return ()
+
+
+class LinkName(Rule):
+    id = "link-name"
+    roles = frozenset({"link"})
+
+    def check(self, node: LintNode) -> Optional[str]:
+        if not node.name:
+            return "Link has no accessible name."
+        return None
+
+
+class ButtonName(Rule):
+    id = "button-name"
+    roles = frozenset({"button"})
+
+    def check(self, node: LintNode) -> Optional[str]:
+        if not node.name:
+            return "Button has no accessible name."
+        return None
+
+
+class ImageAlt(Rule):
+    id = "image-alt"
+    tags = frozenset({"img"})
+
+    def check(self, node: LintNode) -> Optional[str]:
+        if "alt" not in node.element.attributes and not node.name:
+            return "Image has no alt text."
+        return None
+
+
+class ControlLabel(Rule):
+    id = "control-label"
+    roles = FORM_CONTROL_ROLES
+
+    def check(self, node: LintNode) -> Optional[str]:
+        if not node.name and not node.has_ancestor("label"):
+            return "Form control has no label."
+        return None
+
+
+class LandmarkUnique(Rule):
+    id = "landmark-unique"
+    roles = LANDMARK_ROLES
+    collect = True
+
+    def finish(self, nodes: list[LintNode]) -> Iterator[tuple[LintNode, str]]:
+        seen = set()
+        for node in nodes:
+            if node.role not in self.roles:
+                continue
+            if node.role in NAMED_LANDMARK_ROLES and not node.name:
+                continue
+            key = (node.role, node.name)
+            if key in seen:
+                yield node, "Landmark has the same role and name as another."
+            seen.add(key)
+
+
+DEFAULT_RULES: tuple[Rule, ...] = (
+    LinkName(),
+    ButtonName(),
+    ImageAlt(),
+    ControlLabel(),
+    LandmarkUnique(),
+)
+
+
+class RuleIndex:
+    """The rules of a lint run, by what they check."""
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.every: list[int] = []
+        self.by_tag: dict[str, list[int]] = {}
+        self.by_attribute: dict[str, list[int]] = {}
+        self.by_role: dict[str, list[int]] = {}
+        for position, rule in enumerate(rules):
+            if not (rule.tags or rule.attributes or rule.roles):
+                self.every.append(position)
+            for tag in rule.tags:
+                self.by_tag.setdefault(tag, []).append(position)
+            for attribute in rule.attributes:
+                self.by_attribute.setdefault(attribute, []).append(position)
+            for role in rule.roles:
+                self.by_role.setdefault(role, []).append(position)
+
+    def get_rules(self, node: LintNode) -> list[int]:
+        """Return the positions of the rules checking the element."""
+        interested = set(self.every)
+        interested.update(self.by_tag.get(node.tag, ()))
+        for attribute in node.element.attributes:
+            interested.update(self.by_attribute.get(attribute, ()))
+        for role in node.roles:
+            interested.update(self.by_role.get(role, ()))
+        return sorted(interested)
+
+
+def lint(
+    dom: Union[Parser, Document],
+    rules: Optional[Sequence[Rule]] = None,
+    memo: Optional[SubtreeMemo] = None,
+) -> list[Finding]:
+    """
+    Check a document against accessibility rules in a single pass.
+
+    Args:
+        dom: The document to check.
+        rules: The rules to check. Defaults to ``DEFAULT_RULES``: links,
+               buttons and form controls have names, images have alt
+               text, and landmarks of the same role have distinct names.
+        memo: A memo of the roles and names of subtrees shared between
+              documents, such as the header and footer of a site.
+
+    Returns:
+        list[Finding]: The problems found, in document order, followed by
+        the ones of rules comparing several elements.
+
+    .. versionadded:: 0.1.0a24
+    """
+    if isinstance(dom, Document):
+        dom = dom.parse()
+    if rules is None:
+        rules = DEFAULT_RULES
+
+    index = RuleIndex(rules)
+    findings: list[Finding] = []
+    collected: dict[int, list[LintNode]] = {
+        position: [] for position, rule in enumerate(rules) if rule.collect
+    }
+    known = memo.resolve(dom) if memo is not None else {}
+    elements = dom.css("*")
+    for element in elements:
+        resolution = known.get(element)
+        if resolution is None:
+            roles = RoleResolver(element=element, target_role="").get_roles()
+            node = LintNode(element, roles)
+        else:
+            node = LintNode(element, list(resolution[0]))
+            node.name = resolution[1]
+        interested = index.get_rules(node)
+        for position in interested:
+            rule = rules[position]
+            message = rule.check(node)
+            if message is not None:
+                findings.append(node.finding(rule, message))
+            if rule.collect:
+                collected[position].append(node)
+
+    for position, nodes in collected.items():
+        rule = rules[position]
+        for node, message in rule.finish(nodes):
+            findings.append(node.finding(rule, message))
+
+    if ACTIVE.get():
+        record("selector_calls")
+        record("nodes_visited", len(elements))
+    return findings
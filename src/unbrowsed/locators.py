@@ -0,0 +1,125 @@
+"""
+unbrowsed locators.
+
+A ``Locator`` points at an element of a document without holding on to
+it: it stores the position of the element among its siblings at each
+level of the document, and a hash of the document's markup. Locators can
+be pickled, sent to other processes or stored, and resolved against the
+same document parsed again.
+"""
+
+import hashlib
+from typing import NamedTuple, Optional, Union
+
+from selectolax.lexbor import LexborHTMLParser as Parser
+from selectolax.lexbor import LexborNode
+
+from unbrowsed.document import Document
+from unbrowsed.index import get_index
+from unbrowsed.utils import get_path
+
+DIGEST_SIZE = 16
+
+
+def get_digest(dom: Parser) -> bytes:
+    """
+    Hash the markup of a document.
+
+    The hash of a tracked document is kept in its index, and computed
+    again in each generation. Other documents are serialized every time,
+    so that the hash follows any edit, including the ones made with
+    selectolax directly.
+    """
+    if not getattr(dom, "tracked", False):
+        return hash_html(dom.html)
+    index = get_index(dom)
+    if index.digest is None:
+        index.digest = hash_html(dom.html)
+    return index.digest
+
+
+def hash_html(html: Optional[str]) -> bytes:
+    return hashlib.blake2b(
+        (html or "").encode("utf-8", "surrogatepass"),
+        digest_size=DIGEST_SIZE,
+    ).digest()
+
+
+class Locator(NamedTuple):
+    """
+    The position of an element in a document.
+
+    Example::
+
+        locator = get_by_role(dom, "button", name="Save").locator
+        data = pickle.dumps(locator)
+        ...
+        element = pickle.loads(data).resolve(parse_html(html))
+
+    Attributes:
+        path: The position of the element among the elements of its
+              parent, and the same for each of its ancestors, from the
+              root element down.
+        digest: A hash of the markup of the document.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    path: tuple[int, ...]
+    digest: bytes
+
+    def resolve(self, dom: Union[Parser, Document]) -> LexborNode:
+        """
+        Return the element in the given document.
+
+        The document is hashed to check it, once per generation when it
+        is tracked, then the path is followed from the root element,
+        walking the children of each ancestor: the cost is that of
+        hashing the document, plus the number of siblings preceding the
+        element and each of its ancestors.
+
+        Args:
+            dom: The document the locator was made for, parsed again.
+
+        Returns:
+            LexborNode: The element.
+
+        Raises:
+            ValueError: If the markup of the document is not the same.
+        """
+        if isinstance(dom, Document):
+            dom = dom.parse()
+        if get_digest(dom) != self.digest:
+            raise ValueError("The locator was made for another document.")
+
+        node = dom.root.parent if dom.root is not None else None
+        for position in self.path:
+            child = node.child if node is not None else None
+            while child is not None:
+                if not child.tag.startswith("-"):
+                    if position == 0:
+                        break
+                    position -= 1
+                child = child.next
+            if child is None:
+                raise ValueError(f"No element at {self.path}.")
+            node = child
+        return node  # type: ignore
+
+
+def get_locator(element: LexborNode) -> Locator:
+    """
+    Return the locator of an element.
+
+    The document is serialized and hashed for each locator made, or once
+    per generation when it is tracked.
+
+    Args:
+        element: The element.
+
+    Returns:
+        Locator: Its position, and the hash of its document.
+
+    .. versionadded:: 0.1.0a24
+    """
+    return Locator(get_path(element), get_digest(element.parser))
@@ -0,0 +1,192 @@
+"""
+unbrowsed subtree memo.
+
+Pages of a site repeat the same header, navigation and footer. A
+``SubtreeMemo`` keeps the roles and accessible names of those subtrees,
+keyed by a hash of their markup, and hands them to the next page with the
+same markup, so that only the content unique to each page is resolved.
+
+A subtree is only memoized when its roles and names depend on nothing
+outside of it: every ``aria-labelledby``, ``aria-describedby`` and
+``<label for>`` reference it relies on resolves inside the subtree, and
+every table cell has its table inside the subtree. The role of the subtree
+root itself depends on its parent, so it is always resolved.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Union
+
+from selectolax.lexbor import LexborHTMLParser as Parser
+from selectolax.lexbor import LexborNode
+
+from unbrowsed.document import Document
+from unbrowsed.instrumentation import ACTIVE, record
+from unbrowsed.resolvers import (
+    AccessibleNameResolver,
+    RoleResolver,
+    select_first,
+)
+from unbrowsed.utils import is_parent_of
+
+DEFAULT_MAXSIZE = 256
+
+# The elements whose subtrees are looked up in the memo.
+TEMPLATE_SELECTOR = (
+    "header, nav, footer, aside, [role='banner'], [role='navigation'], "
+    "[role='contentinfo'], [role='complementary']"
+)
+
+LABELABLE_TAGS = ("input", "textarea", "select")
+
+DIGEST_SIZE = 16
+
+Resolution = tuple[tuple[str, ...], Optional[str]]
+
+
+def resolve_element(element: LexborNode) -> Resolution:
+    """Return the roles and accessible name of an element."""
+    roles = RoleResolver(element=element, target_role="").get_roles()
+    name = AccessibleNameResolver(element).resolve() if roles else None
+    return tuple(roles), name
+
+
+def is_inside(root: LexborNode, element: Optional[LexborNode]) -> bool:
+    return element is not None and (
+        element == root or is_parent_of(root, element)
+    )
+
+
+def is_self_contained(root: LexborNode, html: str) -> bool:
+    """
+    Check whether the roles and names of a subtree depend only on the
+    subtree. The markup is searched first, so that most subtrees are
+    cleared without looking at their elements.
+    """
+    document_root = root
+    while document_root.parent is not None:
+        document_root = document_root.parent
+
+    if "aria-labelledby" in html or "aria-describedby" in html:
+        for element in root.css("[aria-labelledby], [aria-describedby]"):
+            references = " ".join(
+                element.attributes.get(name) or ""
+                for name in ("aria-labelledby", "aria-describedby")
+            )
+            for id_ref in references.split():
+                target = select_first(document_root, f"#{id_ref}")
+                if not is_inside(root, target):
+                    return False
+
+    if any(f"<{tag}" in html for tag in LABELABLE_TAGS):
+        for element in root.css(", ".join(LABELABLE_TAGS)):
+            element_id = element.attributes.get("id")
+            if element_id:
+                label = select_first(
+                    document_root, f"label[for='{element_id}']"
+                )
+                if not is_inside(root, label):
+                    return False
+
+    if "<td" in html:
+        for cell in root.css("td"):
+            ancestor = cell.parent
+            while ancestor is not None and ancestor.tag != "table":
+                if ancestor == root:
+                    return False
+                ancestor = ancestor.parent
+            if not is_inside(root, ancestor):
+                return False
+    return True
+
+
+class SubtreeMemo:
+    """
+    Roles and accessible names of subtrees shared between documents, such
+    as the header, navigation and footer of a site.
+
+    Keeps the ``maxsize`` most recently used subtrees.
+
+    Example::
+
+        memo = SubtreeMemo()
+        for page in pages:
+            findings = lint(parse_html(page), memo=memo)
+
+    Args:
+        maxsize: The number of subtrees to keep.
+
+    Attributes:
+        hits: Subtrees found in the memo.
+        misses: Subtrees resolved and added to the memo.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self.entries: OrderedDict[bytes, list[Resolution]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_key(self, root: LexborNode) -> Optional[bytes]:
+        """Hash the markup of a subtree, if it can be memoized."""
+        html = root.html or ""
+        if not is_self_contained(root, html):
+            return None
+        return hashlib.blake2b(
+            html.encode("utf-8", "surrogatepass"), digest_size=DIGEST_SIZE
+        ).digest()
+
+    def resolve_subtree(
+        self, root: LexborNode
+    ) -> dict[LexborNode, Resolution]:
+        """Return the roles and names of every element of a subtree."""
+        elements = root.css("*")
+        key = self.get_key(root)
+        resolutions = None if key is None else self.entries.get(key)
+        if resolutions is not None:
+            self.entries.move_to_end(key)  # type: ignore
+            self.hits += 1
+        else:
+            resolutions = [resolve_element(element) for element in elements]
+            if key is not None:
+                self.misses += 1
+                self.entries[key] = resolutions
+                if len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+            if ACTIVE.get():
+                record("nodes_visited", len(elements))
+
+        known = dict(zip(elements, resolutions))
+        # The role of the root depends on its parent.
+        known[root] = resolve_element(root)
+        return known
+
+    def resolve(
+        self, dom: Union[Parser, Document]
+    ) -> dict[LexborNode, Resolution]:
+        """
+        Return the roles and names of the elements of the template
+        subtrees of a document, from the memo when possible.
+        """
+        if isinstance(dom, Document):
+            dom = dom.parse()
+        known: dict[LexborNode, Resolution] = {}
+        current: Optional[LexborNode] = None
+        for root in dom.css(TEMPLATE_SELECTOR):
+            if current is not None and is_parent_of(current, root):
+                continue
+            current = root
+            known.update(self.resolve_subtree(root))
+        return known
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,344 @@
+"""
+unbrowsed mutations.
+
+Edit a parsed document like selectolax does, while patching the index
+unbrowsed keeps for it, so that the next query does not rebuild it from
+scratch.
+
+Only the elements an edit can affect are classified again: the elements
+removed and inserted, their ancestors, whose names may include their
+text, the elements referring to any of them by ``id`` through
+``aria-labelledby``, ``aria-describedby`` or ``<label for>``, and the
+``<footer>`` children of the ancestors, whose role depends on the
+elements around them.
+
+Edits made through selectolax directly are not noticed: call
+``invalidate()`` on the document after making them.
+"""
+
+from collections.abc import Callable
+from typing import Optional, Union
+
+from selectolax.lexbor import LexborHTMLParser as Parser
+from selectolax.lexbor import LexborNode
+
+from unbrowsed.document import Document
+from unbrowsed.index import DocumentIndex
+from unbrowsed.resolvers import select_first
+
+Value = Union[str, bytes, LexborNode]
+
+# An element, the name of one of its attributes, and its new value, or
+# ``None`` to remove it.
+AttributeChange = tuple[LexborNode, str, Optional[str]]
+
+LABELABLE_TAGS = ("input", "textarea", "select")
+
+# The attributes of an element that the roles or states of all of its
+# descendants depend on.
+INHERITED_ATTRIBUTES = {
+    "fieldset": ("disabled",),
+    "optgroup": ("disabled",),
+    "table": ("role",),
+}
+
+
+def get_kept_index(dom: Parser) -> Optional[DocumentIndex]:
+    """Return the index kept for the document, if it is up to date."""
+    index = getattr(dom, "_unbrowsed_index", None)
+    if index is None or index.generation != getattr(dom, "generation", 0):
+        return None
+    return index
+
+
+def get_subtree(nodes: list[LexborNode]) -> list[LexborNode]:
+    """Return the elements of the given subtrees, in document order."""
+    return [
+        element
+        for node in nodes
+        if node.is_element_node
+        for element in node.css("*")
+    ]
+
+
+def get_ancestors(node: Optional[LexborNode]) -> list[LexborNode]:
+    """Return the node and its ancestors, up to the root element."""
+    ancestors = []
+    while node is not None and not node.tag.startswith("-"):
+        ancestors.append(node)
+        node = node.parent
+    return ancestors
+
+
+def get_references(elements: list[LexborNode]) -> tuple[set[str], set[str]]:
+    """
+    Return the ``id`` of the elements, and the controls their ``<label>``
+    elements are for.
+    """
+    ids = set()
+    labelled = set()
+    for element in elements:
+        attributes = element.attributes
+        if attributes.get("id"):
+            ids.add(attributes["id"])
+        if element.tag == "label" and attributes.get("for"):
+            labelled.add(attributes["for"])
+    return ids, labelled
+
+
+def get_affected_elements(
+    dom: Parser,
+    ancestors: list[LexborNode],
+    ids: set[str],
+    labelled: set[str],
+    legends: bool,
+) -> list[LexborNode]:
+    """
+    Return the elements left in the document whose roles, names or states
+    may have changed with an edit.
+    """
+    affected = list(ancestors)
+    if ids:
+        for element in dom.css("[aria-labelledby], [aria-describedby]"):
+            references = " ".join(
+                element.attributes.get(name) or ""
+                for name in ("aria-labelledby", "aria-describedby")
+            )
+            if ids.intersection(references.split()):
+                affected.append(element)
+    for control_id in labelled:
+        element = select_first(dom, f"#{control_id}")
+        if element is not None and element.tag in LABELABLE_TAGS:
+            affected.append(element)
+    for ancestor in ancestors:
+        child = ancestor.child
+        while child is not None:
+            if child.tag == "footer":
+                affected.append(child)
+            child = child.next
+    if legends:
+        # The first <legend> of a disabled <fieldset> is not disabled.
+        for ancestor in ancestors:
+            if ancestor.tag == "fieldset":
+                affected.extend(ancestor.css("*"))
+    return affected
+
+
+def edit(
+    dom: Union[Parser, Document],
+    parents: list[Optional[LexborNode]],
+    removed: list[LexborNode],
+    apply: Callable[[], list[LexborNode]],
+    refreshed: Optional[list[LexborNode]] = None,
+) -> None:
+    """
+    Apply an edit to the document and patch its index.
+
+    Args:
+        dom: The document.
+        parents: The nodes the edit happens in, or whose attributes it
+                 changes.
+        removed: The nodes the edit removes from the document.
+        apply: Makes the edit, and returns the nodes it inserted.
+        refreshed: Other elements the edit may affect.
+    """
+    if isinstance(dom, Document):
+        dom = dom.parse()
+    index = get_kept_index(dom)
+    if index is None:
+        apply()
+        if hasattr(dom, "invalidate"):
+            dom.invalidate()
+        return
+
+    ancestors: dict[int, LexborNode] = {}
+    for parent in parents:
+        for ancestor in get_ancestors(parent):
+            ancestors.setdefault(ancestor.mem_id, ancestor)
+    old = get_subtree(removed)
+    ids, labelled = get_references(old + list(ancestors.values()))
+    legends = any(element.tag == "legend" for element in old)
+    # Dropped while the removed elements can still be resolved.
+    index.remove_elements(old)
+    index.stats.count(old, -1)
+
+    new = get_subtree(apply())
+    new_ids, new_labelled = get_references(new + list(ancestors.values()))
+    ids.update(new_ids)
+    labelled.update(new_labelled)
+    legends = legends or any(element.tag == "legend" for element in new)
+
+    inserted = {element.mem_id for element in new}
+    affected: dict[int, LexborNode] = {}
+    for element in get_affected_elements(
+        dom, list(ancestors.values()), ids, labelled, legends
+    ) + (refreshed or []):
+        if element.mem_id not in inserted:
+            affected.setdefault(element.mem_id, element)
+
+    index.remove_elements(list(affected.values()))
+    index.add_elements(new + list(affected.values()))
+    index.stats.count(new)
+    index.mark_updated()
+
+
+def decompose(dom: Union[Parser, Document], node: LexborNode) -> None:
+    """
+    Remove a node and its subtree from the document, like
+    ``LexborNode.decompose``.
+
+    Args:
+        dom: The document the node belongs to.
+        node: The node to remove.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def apply() -> list[LexborNode]:
+        node.decompose()
+        return []
+
+    edit(dom, [node.parent], [node], apply)
+
+
+def unwrap(dom: Union[Parser, Document], node: LexborNode) -> None:
+    """
+    Replace an element with its children, like ``LexborNode.unwrap``.
+
+    Args:
+        dom: The document the element belongs to.
+        node: The element to unwrap.
+
+    .. versionadded:: 0.1.0a24
+    """
+    children = []
+    child = node.child
+    while child is not None:
+        children.append(child)
+        child = child.next
+    if not children:
+        # selectolax leaves empty elements in place.
+        return
+
+    def apply() -> list[LexborNode]:
+        node.unwrap()
+        return children
+
+    edit(dom, [node.parent], [node], apply)
+
+
+def replace_with(
+    dom: Union[Parser, Document], node: LexborNode, value: Value
+) -> None:
+    """
+    Replace a node with text or with a copy of another node, like
+    ``LexborNode.replace_with``.
+
+    Args:
+        dom: The document the node belongs to.
+        node: The node to replace.
+        value: The text, or the node to insert a copy of.
+
+    .. versionadded:: 0.1.0a24
+    """
+    parent = node.parent
+    previous = node.prev
+
+    def apply() -> list[LexborNode]:
+        node.replace_with(value)  # type: ignore
+        if not isinstance(value, LexborNode):
+            return []
+        if previous is not None:
+            return [previous.next]  # type: ignore
+        return [parent.child]  # type: ignore
+
+    edit(dom, [parent], [node], apply)
+
+
+def insert_child(
+    dom: Union[Parser, Document], node: LexborNode, value: Value
+) -> None:
+    """
+    Append text or a copy of another node to the children of an element,
+    like ``LexborNode.insert_child``.
+
+    Args:
+        dom: The document the element belongs to.
+        node: The element to append to.
+        value: The text, or the node to insert a copy of.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def apply() -> list[LexborNode]:
+        node.insert_child(value)  # type: ignore
+        if not isinstance(value, LexborNode):
+            return []
+        return [node.last_child]  # type: ignore
+
+    edit(dom, [node], [], apply)
+
+
+def edit_attributes(
+    dom: Union[Parser, Document], changes: list[AttributeChange]
+) -> None:
+    """
+    Set or remove attributes of one or more elements in a single edit.
+
+    Args:
+        dom: The document the elements belong to.
+        changes: The elements, attribute names and new values. A value of
+                 ``None`` removes the attribute, and an empty string sets
+                 a boolean attribute.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def apply() -> list[LexborNode]:
+        for node, name, value in changes:
+            if value is not None:
+                node.attrs[name] = value
+            elif name in node.attributes:
+                del node.attrs[name]
+        return []
+
+    refreshed = [
+        element
+        for node, name, _ in changes
+        if name in INHERITED_ATTRIBUTES.get(node.tag, ())  # type: ignore
+        for element in node.css("*")
+    ]
+    edit(dom, [node for node, _, _ in changes], [], apply, refreshed)
+
+
+def set_attribute(
+    dom: Union[Parser, Document], node: LexborNode, name: str, value: str
+) -> None:
+    """
+    Set an attribute of an element.
+
+    Args:
+        dom: The document the element belongs to.
+        node: The element.
+        name: The name of the attribute.
+        value: Its value, or an empty string for a boolean attribute.
+
+    .. versionadded:: 0.1.0a24
+    """
+    edit_attributes(dom, [(node, name, value)])
+
+
+def remove_attribute(
+    dom: Union[Parser, Document], node: LexborNode, name: str
+) -> None:
+    """
+    Remove an attribute of an element, if it has it.
+
+    Args:
+        dom: The document the element belongs to.
+        node: The element.
+        name: The name of the attribute.
+
+    .. versionadded:: 0.1.0a24
+    """
+    edit_attributes(dom, [(node, name, None)])
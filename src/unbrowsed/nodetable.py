@@ -0,0 +1,271 @@
+"""
+unbrowsed node tables.
+
+Exports a parsed document into flat NumPy arrays, one entry per element
+in document order, and classifies implicit roles with vectorized lookups.
+Requires the ``numpy`` extra.
+"""
+
+from typing import Optional
+
+import numpy as np
+from selectolax.lexbor import LexborHTMLParser as Parser
+from selectolax.lexbor import LexborNode
+
+from unbrowsed.budgets import BUDGETS, spend
+from unbrowsed.resolvers import RoleResolver
+
+ATTRIBUTE_BITS = {
+    "role": 1 << 0,
+    "href": 1 << 1,
+    "alt": 1 << 2,
+    "type": 1 << 3,
+    "multiple": 1 << 4,
+    "size": 1 << 5,
+    "hidden": 1 << 6,
+    "title": 1 << 7,
+}
+ARIA_BIT = 1 << 8
+
+LANDMARK_ROLES = ["article", "complementary", "main", "navigation", "region"]
+SECTIONING_TAGS = ["article", "aside", "main", "nav", "section"]
+VECTORIZED_TAGS = ["a", "footer", "img", "input", "select", "td"]
+
+
+class NodeTable:
+    """
+    Struct-of-arrays view of the elements of a document.
+
+    Strings (tags, roles, input types) are interned into ``strings`` and
+    stored as integer ids; id 0 is the empty string.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(self, dom: Parser):
+        self.dom = dom
+        self.strings: dict[str, int] = {"": 0}
+        self.nodes: list[LexborNode] = []
+
+        tags, parents, depths, masks = [], [], [], []
+        roles, types, sizes, empty_alts, table_roles = [], [], [], [], []
+
+        intern = self.intern
+        root = dom.root
+        stack = [(root, -1, 0, -1)] if root is not None else []
+        while stack:
+            node, parent, depth, table_role = stack.pop()
+            if BUDGETS.get():
+                spend()
+            attributes = node.attributes
+            mask = 0
+            for attribute in attributes:
+                if attribute in ATTRIBUTE_BITS:
+                    mask |= ATTRIBUTE_BITS[attribute]
+                elif attribute.startswith("aria-"):
+                    mask |= ARIA_BIT
+
+            role = intern(attributes.get("role") or "")
+            tag = node.tag
+            position = len(self.nodes)
+            self.nodes.append(node)
+            tags.append(intern(tag))
+            parents.append(parent)
+            depths.append(depth)
+            masks.append(mask)
+            roles.append(role)
+            types.append(intern(attributes.get("type") or ""))
+            sizes.append(self.get_size(attributes.get("size")))
+            empty_alts.append(attributes.get("alt", None) == "")
+            table_roles.append(table_role)
+
+            if tag == "table":
+                table_role = role
+
+            children = []
+            child = node.child
+            while child is not None:
+                if child.is_element_node:
+                    children.append(child)
+                child = child.next
+            for child in reversed(children):
+                stack.append((child, position, depth + 1, table_role))
+
+        self.tag = np.array(tags, dtype=np.int32)
+        self.parent = np.array(parents, dtype=np.int32)
+        self.depth = np.array(depths, dtype=np.int32)
+        self.attributes = np.array(masks, dtype=np.uint16)
+        self.role = np.array(roles, dtype=np.int32)
+        self.type = np.array(types, dtype=np.int32)
+        self.size = np.array(sizes, dtype=np.int32)
+        self.empty_alt = np.array(empty_alts, dtype=bool)
+        self.table_role = np.array(table_roles, dtype=np.int32)
+
+        self.explicit_role = self.lowercase(self.role)
+        self.implicit_role = self.classify_implicit_roles()
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def intern(self, value: str) -> int:
+        """Return the id of the given string, adding it if needed."""
+        string_id = self.strings.get(value)
+        if string_id is None:
+            string_id = self.strings[value] = len(self.strings)
+        return string_id
+
+    @staticmethod
+    def get_size(value: Optional[str]) -> int:
+        if value is None or not value.strip().isdecimal():
+            return 0
+        return int(value)
+
+    def has_attribute(self, name: str) -> np.ndarray:
+        """Return a mask of the elements carrying the given attribute."""
+        bit = ARIA_BIT if name.startswith("aria-") else ATTRIBUTE_BITS[name]
+        return (self.attributes & bit) != 0
+
+    def lowercase(self, ids: np.ndarray) -> np.ndarray:
+        """Map string ids to the ids of their lowercased strings."""
+        lookup = np.array(
+            [self.intern(value.lower()) for value in list(self.strings)],
+            dtype=np.int32,
+        )
+        return lookup[ids]
+
+    def is_tag(self, tag: str) -> np.ndarray:
+        return self.tag == self.strings.get(tag, -1)
+
+    def classify_implicit_roles(self) -> np.ndarray:
+        """
+        Classify the implicit role of every element.
+
+        Tags mapped to a fixed role in ``RoleResolver`` are resolved with a
+        single lookup table; tags whose role depends on attributes or
+        ancestors are resolved with masks. The few elements that need an
+        accessible name, like ``<img>`` without ``alt`` but with ARIA
+        attributes, are resolved by ``RoleResolver`` itself.
+        """
+        intern = self.intern
+        mapping = RoleResolver(
+            element=None, target_role=""  # type: ignore
+        ).get_implicit_role_mapping()
+
+        fixed = {
+            tag: intern(role)
+            for tag, role in mapping.items()
+            if isinstance(role, str)
+        }
+        input_types = {
+            intern(input_type): intern(role)
+            for input_type, role in mapping["input"].items()  # type: ignore
+        }
+        fallback_tags = [
+            tag
+            for tag, handler in mapping.items()
+            if callable(handler) and tag not in VECTORIZED_TAGS
+        ]
+
+        lookup = np.zeros(len(self.strings), dtype=np.int32)
+        for tag, role in fixed.items():
+            if tag in self.strings:
+                lookup[self.strings[tag]] = role
+        implicit = lookup[self.tag]
+
+        type_lookup = np.zeros(len(self.strings), dtype=np.int32)
+        for input_type, role in input_types.items():
+            type_lookup[input_type] = role
+        is_input = self.is_tag("input")
+        implicit[is_input] = type_lookup[self.type[is_input]]
+
+        is_a = self.is_tag("a")
+        implicit[is_a] = np.where(
+            self.has_attribute("href")[is_a],
+            intern("link"),
+            intern("generic"),
+        )
+
+        is_select = self.is_tag("select")
+        is_listbox = self.has_attribute("multiple") | (self.size > 1)
+        implicit[is_select] = np.where(
+            is_listbox[is_select], intern("listbox"), intern("combobox")
+        )
+
+        needs_resolver = np.zeros(len(self), dtype=bool)
+        for tag in fallback_tags:
+            needs_resolver |= self.is_tag(tag)
+
+        is_img = self.is_tag("img")
+        has_alt = self.has_attribute("alt")
+        implicit[is_img] = intern("presentation")
+        implicit[is_img & has_alt & ~self.empty_alt] = intern("img")
+        needs_resolver |= (
+            is_img
+            & ~has_alt
+            & (self.has_attribute("aria-") | self.has_attribute("title"))
+        )
+
+        is_td = self.is_tag("td")
+        table_role = self.lowercase(np.maximum(self.table_role, 0))
+        implicit[is_td] = 0
+        implicit[is_td & np.isin(table_role, [0, intern("table")])] = intern(
+            "cell"
+        )
+        implicit[
+            is_td & np.isin(table_role, [intern("grid"), intern("treegrid")])
+        ] = intern("gridcell")
+        needs_resolver |= is_td & (self.table_role < 0)
+
+        is_footer = self.is_tag("footer")
+        if is_footer.any():
+            implicit[is_footer] = intern("contentinfo")
+            parent = self.parent[is_footer]
+            has_parent = parent >= 0
+            parent = np.maximum(parent, 0)
+            sectioning = np.zeros(len(self), dtype=bool)
+            for tag in SECTIONING_TAGS:
+                sectioning |= self.is_tag(tag)
+            is_generic = has_parent & (
+                sectioning[parent] | self.get_landmark_subtrees()[parent]
+            )
+            implicit[np.flatnonzero(is_footer)[is_generic]] = intern("generic")
+
+        for position in np.flatnonzero(needs_resolver):
+            resolver = RoleResolver(
+                element=self.nodes[position], target_role=""
+            )
+            implicit[position] = intern(
+                (resolver.get_implicit_role_handler() or "").lower()
+            )
+
+        return implicit
+
+    def get_landmark_subtrees(self) -> np.ndarray:
+        """
+        Return a mask of the elements that carry an explicit landmark role
+        or contain an element that does, like the selector used by
+        ``RoleResolver.get_footer_role``. Roles are propagated to the
+        parents one depth level at a time.
+        """
+        landmark_ids = [self.strings.get(role, -1) for role in LANDMARK_ROLES]
+        subtrees = np.isin(self.role, landmark_ids)
+        for depth in range(int(self.depth.max(initial=0)), 0, -1):
+            at_depth = np.flatnonzero(self.depth == depth)
+            np.logical_or.at(
+                subtrees, self.parent[at_depth], subtrees[at_depth]
+            )
+        return subtrees
+
+    def get_role_mask(self, role: str) -> np.ndarray:
+        """Return a mask of the elements matching the given role."""
+        role_id = self.strings.get(role.lower())
+        if not role_id:
+            return np.zeros(len(self), dtype=bool)
+        return (self.explicit_role == role_id) | (
+            self.implicit_role == role_id
+        )
+
+    def get_role_elements(self, role: str) -> list[LexborNode]:
+        """Return the elements matching the given role, in document order."""
+        nodes = self.nodes
+        return [nodes[i] for i in np.flatnonzero(self.get_role_mask(role))]
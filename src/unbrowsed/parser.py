@@ -1,7 +1,204 @@
 """unbrowsed parser."""
 
+import codecs
+import mmap
+import os
+import re
+from typing import Optional, Union
+
 from selectolax.lexbor import LexborHTMLParser
 
+# How far the HTML Standard prescan looks for a <meta> charset declaration.
+PRESCAN_SIZE = 1024
+
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+]
+
+# Matches both <meta charset="..."> and the charset parameter of
+# <meta http-equiv="Content-Type" content="text/html; charset=...">.
+META_CHARSET = re.compile(
+    rb"<meta[^>]*?charset\s*=\s*[\"']?\s*([a-zA-Z0-9_:.+-]+)", re.IGNORECASE
+)
+
+# The HTML Standard reads these labels as windows-1252, and a declared
+# UTF-16 as UTF-8, since a document whose <meta> is readable as ASCII
+# cannot be UTF-16.
+ENCODING_OVERRIDES = {
+    "ascii": "cp1252",
+    "iso8859-1": "cp1252",
+    "utf-16": "utf-8",
+    "utf-16-le": "utf-8",
+    "utf-16-be": "utf-8",
+}
+
+
+class HTMLDocument(LexborHTMLParser):
+    """
+    A parsed HTML document.
+
+    Behaves exactly like ``LexborHTMLParser``, but can carry the
+    per-document indexes unbrowsed builds while answering queries.
+
+    Attributes:
+        generation: Bumped whenever the document changes, which drops its
+                    indexes and the query results remembered for it.
+        tracked: Whether the document is only edited through
+                 ``unbrowsed.mutations`` and ``unbrowsed.user``, or has
+                 ``invalidate()`` called after other edits. Only then are
+                 its indexes and query results kept between queries;
+                 other documents are indexed again by every query, so
+                 that edits made with selectolax are always seen.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    generation = 0
+    tracked = False
+
+    def invalidate(self) -> None:
+        """
+        Start a new generation of the document, after editing it with
+        selectolax.
+
+        The document is not serialized to notice edits, so queries keep
+        using the indexes of a tracked document until this is called.
+        Edits made through ``unbrowsed.mutations`` and ``unbrowsed.user``
+        call it for you.
+        """
+        self.generation += 1
+
+
+def parse_html(html: str, tracked: bool = False) -> HTMLDocument:
+    """
+    Parse an HTML document.
+
+    Args:
+        html: The document.
+        tracked: Whether the document is only edited through unbrowsed, so
+                 that its indexes are kept between queries. See
+                 ``HTMLDocument``.
+
+    Returns:
+        HTMLDocument: The parsed document.
+
+    .. versionadded:: 0.1.0a24
+       The *tracked* parameter.
+    """
+    document = HTMLDocument(html)
+    document.tracked = tracked
+    return document
+
+
+def sniff_encoding(data: bytes) -> str:
+    """
+    Detect the character encoding of an HTML document.
+
+    A byte order mark wins, then a ``<meta>`` charset declaration in the
+    first 1024 bytes. Documents declaring nothing are read as UTF-8.
+
+    Args:
+        data: The raw document.
+
+    Returns:
+        str: The name of the Python codec to decode the document with.
+
+    .. versionadded:: 0.1.0a24
+    """
+    for bom, encoding in BOMS:
+        if data[: len(bom)] == bom:
+            return encoding
+
+    match = META_CHARSET.search(data, 0, PRESCAN_SIZE)
+    if match is not None:
+        try:
+            encoding = codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            return "utf-8"
+        return ENCODING_OVERRIDES.get(encoding, encoding)
+    return "utf-8"
+
+
+def parse_html_bytes(
+    data: bytes, encoding: Optional[str] = None, tracked: bool = False
+) -> HTMLDocument:
+    """
+    Parse an HTML document from bytes, such as an HTTP response body.
+
+    UTF-8 documents are handed to lexbor as they are, without decoding
+    them to ``str`` first. Documents in other encodings are decoded once,
+    replacing invalid bytes with U+FFFD.
+
+    Args:
+        data: The raw document, as ``bytes`` or another buffer, like the
+              ``mmap`` of a file.
+        encoding: The encoding of the document, for example the charset
+                  of the ``Content-Type`` header. Defaults to the one
+                  found by ``sniff_encoding``.
+        tracked: Whether the document is only edited through unbrowsed, so
+                 that its indexes are kept between queries.
+
+    Returns:
+        HTMLDocument: The parsed document.
+
+    .. versionadded:: 0.1.0a24
+    """
+    if encoding is None:
+        encoding = sniff_encoding(data)
+    else:
+        encoding = codecs.lookup(encoding).name
+
+    start = 0
+    for bom, bom_encoding in BOMS:
+        if encoding == bom_encoding and data[: len(bom)] == bom:
+            start = len(bom)
+
+    if encoding == "utf-8":
+        # Lexbor only takes bytes: this copies other buffers once, and
+        # bytes only when they start with a byte order mark.
+        document = HTMLDocument(data[start:])
+    else:
+        with memoryview(data) as view:
+            text = str(view[start:], encoding, errors="replace")
+        document = HTMLDocument(text)
+    document.tracked = tracked
+    return document
+
+
+def parse_html_file(
+    path: Union[str, os.PathLike],
+    encoding: Optional[str] = None,
+    tracked: bool = False,
+) -> HTMLDocument:
+    """
+    Parse an HTML document from a file, reading it as bytes.
+
+    The file is mapped into memory rather than read: a UTF-8 file is
+    copied once, into the bytes lexbor parses, and a file in another
+    encoding is decoded straight from the mapping. Files that cannot be
+    mapped, like empty files and pipes, are read.
+
+    Args:
+        path: The path of the file.
+        encoding: The encoding of the file. Defaults to the one found by
+                  ``sniff_encoding``.
+        tracked: Whether the document is only edited through unbrowsed, so
+                 that its indexes are kept between queries.
+
+    Returns:
+        HTMLDocument: The parsed document.
 
-def parse_html(html: str) -> LexborHTMLParser:
-    return LexborHTMLParser(html)
+    .. versionadded:: 0.1.0a24
+    """
+    with open(path, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            data = file.read()
+            return parse_html_bytes(data, encoding=encoding, tracked=tracked)
+        with mapped:
+            return parse_html_bytes(
+                mapped, encoding=encoding, tracked=tracked  # type: ignore
+            )
@@ -0,0 +1,233 @@
+"""
+unbrowsed pytest plugin.
+
+Registered through the ``pytest11`` entry point. Provides the ``dom``
+fixture, which parses each distinct HTML payload once per session, and
+reports the slowest unbrowsed queries in the terminal summary when asked
+to with ``--unbrowsed-slowest``.
+"""
+
+import hashlib
+import heapq
+import itertools
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from typing import Any, NamedTuple, Union
+
+import pytest
+
+from unbrowsed.instrumentation import QueryStats, stats
+from unbrowsed.parser import HTMLDocument, parse_html, parse_html_bytes
+
+PLUGIN_NAME = "unbrowsed-plugin"
+
+
+class QueriedTest(NamedTuple):
+    """The unbrowsed queries run by a single test."""
+
+    nodeid: str
+    calls: int
+    elapsed: float
+    nodes_visited: int
+
+
+class SlowQuery(NamedTuple):
+    """A top-level query call, as reported in the terminal summary."""
+
+    elapsed: float
+    nodes_visited: int
+    call: str
+    nodeid: str
+
+
+class ParseCache:
+    """
+    LRU cache of parsed documents, keyed by the SHA-256 of their markup.
+
+    Documents are shared between the tests that parse the same markup.
+    They are tracked, and a document whose generation changed since it
+    was parsed, because a test edited it through unbrowsed or invalidated
+    it, is parsed again. Documents are never serialized to check them:
+    tests editing them with selectolax must call ``invalidate()``.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries: OrderedDict[str, tuple[HTMLDocument, int]] = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, html: Union[str, bytes, Any]) -> HTMLDocument:
+        """
+        Return the parsed document of the given markup.
+
+        Args:
+            html: The markup as ``str`` or ``bytes``, or a response
+                  object with a ``content`` attribute, like the ones
+                  returned by the Django test client.
+
+        Returns:
+            HTMLDocument: The parsed document.
+        """
+        if not isinstance(html, (str, bytes)):
+            html = html.content
+        content = html.encode() if isinstance(html, str) else html
+        key = hashlib.sha256(content).hexdigest()
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            document, generation = entry
+            if document.generation == generation:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return document
+
+        self.misses += 1
+        if isinstance(html, str):
+            document = parse_html(html, tracked=True)
+        else:
+            document = parse_html_bytes(html, tracked=True)
+        if self.maxsize > 0:
+            self.entries[key] = (document, document.generation)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return document
+
+
+class UnbrowsedPlugin:
+    """Collects the query statistics of every test in the session."""
+
+    def __init__(self, config: pytest.Config):
+        self.slowest = config.getoption("unbrowsed_slowest")
+        self.cache = ParseCache(config.getoption("unbrowsed_cache_size"))
+        self.tests: list[QueriedTest] = []
+        self.queries: list[tuple[float, int, SlowQuery]] = []
+        self.sequence = itertools.count()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item) -> Iterator[None]:
+        if not self.slowest:
+            yield
+            return
+        with stats() as collector:
+            yield
+        if collector.calls:
+            self.add_test(item, collector)
+
+    def add_test(self, item: pytest.Item, collector: QueryStats) -> None:
+        self.tests.append(
+            QueriedTest(
+                nodeid=item.nodeid,
+                calls=collector.calls,
+                elapsed=collector.elapsed,
+                nodes_visited=collector.nodes_visited,
+            )
+        )
+        item.user_properties.append(
+            ("unbrowsed_query_seconds", collector.elapsed)
+        )
+        item.user_properties.append(
+            ("unbrowsed_nodes_visited", collector.nodes_visited)
+        )
+
+        # Keep only the slowest calls, so long sessions stay small.
+        for call in collector.history:
+            if len(self.queries) >= self.slowest:
+                if not self.queries or call.elapsed <= self.queries[0][0]:
+                    continue
+                heapq.heappop(self.queries)
+            slow_query = SlowQuery(
+                elapsed=call.elapsed,
+                nodes_visited=call.nodes_visited,
+                call=call.describe(),
+                nodeid=item.nodeid,
+            )
+            heapq.heappush(
+                self.queries, (call.elapsed, next(self.sequence), slow_query)
+            )
+
+    def get_slowest_queries(self) -> list[SlowQuery]:
+        """Return the slowest query calls of the session, slowest first."""
+        return [
+            slow_query
+            for _, _, slow_query in sorted(self.queries, reverse=True)
+        ]
+
+    def get_slowest_tests(self) -> list[QueriedTest]:
+        """Return the tests that spent the most time in queries."""
+        return heapq.nlargest(
+            self.slowest, self.tests, key=lambda test: test.elapsed
+        )
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        if not self.tests:
+            return
+
+        terminalreporter.write_sep("=", "unbrowsed slowest queries")
+        for slow_query in self.get_slowest_queries():
+            terminalreporter.write_line(
+                f"{slow_query.elapsed * 1000:10.3f}ms "
+                f"{slow_query.nodes_visited:8} nodes  "
+                f"{slow_query.call}  {slow_query.nodeid}"
+            )
+        terminalreporter.write_line("")
+        terminalreporter.write_line("slowest tests by query time:")
+        for test in self.get_slowest_tests():
+            terminalreporter.write_line(
+                f"{test.elapsed * 1000:10.3f}ms "
+                f"{test.nodes_visited:8} nodes  "
+                f"{test.calls:4} queries  {test.nodeid}"
+            )
+        terminalreporter.write_line(
+            f"parse cache: {self.cache.hits} hits, "
+            f"{self.cache.misses} misses"
+        )
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("unbrowsed")
+    group.addoption(
+        "--unbrowsed-slowest",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Show the N slowest unbrowsed queries (default: 0, nothing "
+        "is recorded).",
+    )
+    group.addoption(
+        "--unbrowsed-cache-size",
+        type=int,
+        default=128,
+        metavar="N",
+        help="Keep up to N parsed documents for the dom fixture.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.pluginmanager.register(UnbrowsedPlugin(config), PLUGIN_NAME)
+
+
+@pytest.fixture
+def dom(
+    request: pytest.FixtureRequest,
+) -> Callable[[Union[str, bytes, Any]], HTMLDocument]:
+    """
+    Parse HTML, reusing the documents already parsed in the session.
+
+    The documents are tracked: tests editing them with selectolax rather
+    than ``unbrowsed.mutations`` must call ``invalidate()``, or the next
+    tests get the edited document.
+
+    Example::
+
+        def test_save_button(dom, client):
+            document = dom(client.get("/"))
+            get_by_role(document, "button", name="Save")
+
+    .. versionadded:: 0.1.0a24
+    """
+    plugin = request.config.pluginmanager.get_plugin(PLUGIN_NAME)
+    return plugin.cache.parse
@@ -1,26 +1,170 @@
 """unbrowsed queries."""
 
-from typing import Any, Optional
+import functools
+import inspect
+from collections.abc import Callable, Hashable
+from typing import Any, NamedTuple, Optional, TypeVar, Union
 
 from selectolax.lexbor import LexborHTMLParser as Parser
 from selectolax.lexbor import LexborNode
 
+from unbrowsed.budgets import BUDGETS, budgeted, spend
+from unbrowsed.document import Document
 from unbrowsed.exceptions import (
     MultipleElementsFoundError,
     NoElementsFoundError,
 )
+from unbrowsed.index import (
+    CONTEXT_ROLES,
+    DocumentIndex,
+    get_index,
+)
+from unbrowsed.instrumentation import (
+    ACTIVE,
+    instrumented,
+    record,
+    record_plan,
+)
+from unbrowsed.locators import Locator, get_locator
 from unbrowsed.matchers import TextMatch
 from unbrowsed.utils import is_parent_of
 from unbrowsed.types import AriaRoles
-from unbrowsed.resolvers import RoleResolver
-from unbrowsed.utils import get_selector
+from unbrowsed.resolvers import (
+    AccessibleDescriptionResolver,
+    AccessibleNameResolver,
+    RoleResolver,
+)
+from unbrowsed.utils import (
+    TRISTATES,
+    get_selector,
+    get_state_filters,
+    get_tristate,
+)
+
+# Estimated costs of the query plans, relative to classifying the role of
+# one element.
+NAME_COST = 4
+TABLE_COST = 40
+
+# Query results remembered per document, beyond which new ones are not.
+MAX_RESULTS = 1024
+
+# Arguments that do not change the result of a query.
+UNKEYED_ARGUMENTS = ("dom", "timeout", "max_nodes")
+
+MISSING = object()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def get_generation(element: LexborNode) -> int:
+    return getattr(element.parser, "generation", 0)
 
 
 class Result:
-    """Wrapper class for query result."""
+    """
+    Wrapper class for query result.
+
+    Keeps the role, accessible name and description of the element when
+    the query already knows them, and computes the others on first use.
+    They are computed again once the generation of the document changes.
+    The text of the element is always read from the element.
+
+    Args:
+        element: The matched element.
+        role: The role the element was matched by.
+        name: Its accessible name.
+        description: Its accessible description.
+
+    .. versionadded:: 0.1.0a24
+           The *role*, *name* and *description* parameters.
+    """
 
-    def __init__(self, element: LexborNode):
+    __slots__ = (
+        "element",
+        "generation",
+        "_role",
+        "_name",
+        "_description",
+    )
+
+    def __init__(
+        self,
+        element: LexborNode,
+        role: Any = MISSING,
+        name: Any = MISSING,
+        description: Any = MISSING,
+    ):
         self.element = element
+        self.generation = get_generation(element)
+        self._role = role
+        self._name = name
+        self._description = description
+
+    def check_generation(self) -> None:
+        """Forget the known values if the document was edited since."""
+        generation = get_generation(self.element)
+        if generation != self.generation:
+            self.generation = generation
+            self._role = self._name = self._description = MISSING
+
+    @property
+    def role(self) -> Optional[str]:
+        """
+        The role of the element: the one it was matched by, or else its
+        first role.
+
+        .. versionadded:: 0.1.0a24
+        """
+        self.check_generation()
+        if self._role is MISSING:
+            roles = RoleResolver(element=self.element, target_role="")
+            self._role = next(iter(roles.get_roles()), None)
+        return self._role
+
+    @property
+    def name(self) -> Optional[str]:
+        """
+        The accessible name of the element.
+
+        .. versionadded:: 0.1.0a24
+        """
+        self.check_generation()
+        if self._name is MISSING:
+            self._name = AccessibleNameResolver(self.element).resolve()
+        return self._name
+
+    @property
+    def description(self) -> Optional[str]:
+        """
+        The accessible description of the element.
+
+        .. versionadded:: 0.1.0a24
+        """
+        self.check_generation()
+        if self._description is MISSING:
+            resolver = AccessibleDescriptionResolver(self.element)
+            self._description = resolver.resolve()
+        return self._description
+
+    @property
+    def text(self) -> str:
+        """
+        The deep, stripped text of the element, as it is now.
+
+        .. versionadded:: 0.1.0a24
+        """
+        return self.element.text(deep=True, strip=True)
+
+    @property
+    def locator(self) -> Locator:
+        """
+        The position of the element in its document, which can be pickled
+        and resolved against the document parsed again.
+
+        .. versionadded:: 0.1.0a24
+        """
+        return get_locator(self.element)
 
     def to_have_attribute(self, name: str, value: Any = None) -> bool:
         """
@@ -52,7 +196,7 @@ class Result:
 
         .. versionadded:: 0.1.0a11
         """
-        element_text = self.element.text(strip=True)
+        element_text = self.text
 
         if exact:
             return element_text == text
@@ -60,8 +204,257 @@ class Result:
             return text.lower() in element_text.lower()
 
 
+def get_query_key(
+    signature: inspect.Signature, name: str, args: tuple, kwargs: dict
+) -> Hashable:
+    """
+    Normalize the arguments of a query call, so that calls passing the
+    same query differently share a key.
+    """
+    bound = signature.bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = bound.arguments
+    for argument in UNKEYED_ARGUMENTS:
+        arguments.pop(argument, None)
+    if "role" in arguments:
+        arguments["role"] = arguments["role"].lower()
+    if "text" in arguments:
+        arguments["text"] = arguments["text"].strip()
+    if "exact" in arguments:
+        arguments["exact"] = bool(arguments["exact"])
+    if arguments.get("current") is not None:
+        arguments["current"] = str(arguments["current"]).lower() == "true"
+    for state in TRISTATES:
+        if state in arguments:
+            arguments[state] = get_tristate(arguments[state])
+    return name, tuple(arguments.items())
+
+
+def memoized(function: F) -> F:
+    """
+    Remember the outcomes of a query function per document, keyed by its
+    normalized arguments.
+
+    The outcomes are kept in the index of tracked documents, and dropped
+    with it when the document changes. Other documents, which may be
+    edited with selectolax at any time, plain ``LexborHTMLParser``
+    instances and unparsed ``Document`` sources are queried every time.
+    """
+    name = function.__name__
+    signature = inspect.signature(function)
+
+    @functools.wraps(function)
+    def wrapper(dom, *args, **kwargs):
+        parsed = dom.parsed if isinstance(dom, Document) else dom
+        if parsed is None or not getattr(parsed, "tracked", False):
+            return function(dom, *args, **kwargs)
+        index = get_index(parsed)
+        try:
+            key = get_query_key(signature, name, args, kwargs)
+            outcome = index.results.get(key, MISSING)
+        except TypeError:
+            # Unhashable or invalid arguments: called outside of the except
+            # block, so that its errors are not chained to this one.
+            key = MISSING
+        if key is MISSING:
+            return function(dom, *args, **kwargs)
+
+        if outcome is not MISSING:
+            if ACTIVE.get():
+                record_plan("memo")
+            if isinstance(outcome, MultipleElementsFoundError):
+                raise MultipleElementsFoundError(outcome.message)
+            if isinstance(outcome, list):
+                return list(outcome)
+            return outcome
+
+        try:
+            outcome = function(dom, *args, **kwargs)
+        except MultipleElementsFoundError as e:
+            if len(index.results) < MAX_RESULTS:
+                index.results[key] = e
+            raise
+        if len(index.results) < MAX_RESULTS:
+            index.results[key] = (
+                list(outcome) if isinstance(outcome, list) else outcome
+            )
+        return outcome
+
+    return wrapper  # type: ignore
+
+
+@functools.cache
+def get_role_tags(role: str) -> tuple[str, ...]:
+    """Return the tags whose implicit role may be the given role."""
+    resolver = RoleResolver(element=None, target_role="")  # type: ignore
+    tags = []
+    for tag, handler in resolver.get_implicit_role_mapping().items():
+        if callable(handler):
+            roles = CONTEXT_ROLES.get(tag, (role,))
+        elif isinstance(handler, dict):
+            roles = tuple(handler.values())
+        else:
+            roles = (handler,)
+        if role in roles:
+            tags.append(tag)
+    return tuple(tags)
+
+
+def get_role_selector(role: str) -> str:
+    """Return a CSS selector for the elements that may have the role."""
+    # A selector list matches an element once per selector; :is() once.
+    return f":is({', '.join(get_role_tags(role.lower()) + ('[role]',))})"
+
+
+def may_match_text(index: DocumentIndex, search_text: TextMatch) -> bool:
+    """Check the text of the whole document for the searched text."""
+    if search_text.exact:
+        return search_text.text in index.stats.text
+    return search_text.text.lower() in index.stats.text.lower()
+
+
+def plan_role_query(
+    index: DocumentIndex, role: str, name: Optional[str] = None
+) -> tuple[str, int]:
+    """
+    Choose how a role query finds its candidates.
+
+    The plans are ``"index"`` when the document index already holds the
+    candidates, ``"index build"`` when it is built for the query, and
+    ``"scan"`` when the elements that may have the role are classified
+    one by one. A scan visits the tags mapping to the role and the
+    elements with an explicit role, counted from the document statistics,
+    while the index classifies every element once. Scans are chosen until
+    their total cost on the document exceeds the cost of the index, so
+    small documents queried a few times are never indexed.
+
+    Returns:
+        The plan and the estimated cost of a scan.
+
+    .. versionadded:: 0.1.0a24
+    """
+    role = role.lower()
+    if index.has_role_elements(role):
+        if name is None or index.has_named_elements(role):
+            return "index", 0
+        return "index build", 0
+    if index.table is not None:
+        return "index build", 0
+
+    stats = index.stats
+    tagged = sum(stats.tags[tag] for tag in get_role_tags(role))
+    cost = tagged + sum(stats.roles.values())
+    if index.uses_table():
+        build_cost = stats.elements // 2 + TABLE_COST
+    else:
+        build_cost = stats.elements
+    if name is not None:
+        names_cost = NAME_COST * (tagged + stats.roles[role])
+        cost += names_cost
+        build_cost += names_cost
+
+    if not index.is_kept() or index.costs.get("role", 0) + cost < build_cost:
+        return "scan", cost
+    return "index build", cost
+
+
+def plan_text_query(
+    index: DocumentIndex, search_text: TextMatch
+) -> tuple[str, int]:
+    """
+    Choose how a text query finds its matches.
+
+    The plans are ``"skip"`` when the text of the document does not contain
+    the searched text, ``"index"`` when the texts of the elements are
+    already known, ``"index build"`` when they are indexed for the query,
+    and ``"scan"``. Indexing costs about two scans, so the index is built
+    by the second text query on a document.
+
+    Returns:
+        The plan and the estimated cost of a scan.
+
+    .. versionadded:: 0.1.0a24
+    """
+    if not may_match_text(index, search_text):
+        return "skip", 0
+    if index.has_text_table():
+        return "index", 0
+
+    cost = index.stats.elements
+    if not index.is_kept() or index.costs.get("text", 0) + cost < 2 * cost:
+        return "scan", cost
+    return "index build", cost
+
+
+def plan_label_query(
+    index: DocumentIndex, search_text: TextMatch
+) -> tuple[str, int]:
+    """
+    Choose how a label query finds its matches: ``"skip"`` when the text of
+    the document does not contain the label text, or ``"scan"``.
+
+    .. versionadded:: 0.1.0a24
+    """
+    if not may_match_text(index, search_text):
+        return "skip", 0
+    return "scan", index.stats.tags["label"]
+
+
+def scan_role_elements(dom: Parser, role: str) -> list[LexborNode]:
+    """Return the elements matching the given role, in document order."""
+    role = role.lower()
+    elements = dom.css(get_role_selector(role))
+    matches = []
+    for element in elements:
+        if BUDGETS.get():
+            spend()
+        if role in RoleResolver(element=element, target_role="").get_roles():
+            matches.append(element)
+
+    if ACTIVE.get():
+        record("selector_calls")
+        record("nodes_visited", len(elements))
+    return matches
+
+
+def make_role_result(
+    element: LexborNode,
+    role: str,
+    name: Optional[str],
+    description: Optional[str],
+) -> Result:
+    """Return a result keeping what a role query matched it by."""
+    return Result(
+        element,
+        role=role.lower(),
+        name=MISSING if name is None else name,
+        description=MISSING if description is None else description,
+    )
+
+
+def filter_names(
+    elements: list[LexborNode], name: Optional[str]
+) -> list[LexborNode]:
+    """Keep the elements with the given accessible name."""
+    matches = []
+    for element in elements:
+        if BUDGETS.get():
+            spend()
+        if AccessibleNameResolver(element).resolve() == name:
+            matches.append(element)
+    return matches
+
+
+@instrumented
+@budgeted
+@memoized
 def query_by_label_text(
-    dom: Parser, text: str, exact=True
+    dom: Union[Parser, Document],
+    text: str,
+    exact=True,
+    *,
+    timeout: Optional[float] = None,
+    max_nodes: Optional[int] = None,
 ) -> Optional[Result]:
     """
     Queries the DOM for an element associated with a label
@@ -72,6 +465,12 @@ def query_by_label_text(
         text: The label text to search for.
         exact: Defaults to `True`; matches full strings, case-sensitive.
                When `False`, matches substrings and is not case-sensitive.
+        timeout: Seconds the query may run before raising
+                 ``QueryBudgetExceededError``. Defaults to the limit set
+                 with ``set_budget``.
+        max_nodes: Elements the query may visit before raising
+                   ``QueryBudgetExceededError``. Defaults to the limit set
+                   with ``set_budget``.
 
     Returns:
         A Result containing the matched element.
@@ -79,16 +478,36 @@ def query_by_label_text(
     Raises:
         MultipleElementsFoundError:
         If multiple elements with matching label text are found.
+        QueryBudgetExceededError:
+            If the query exceeds its timeout or node budget.
 
     .. versionadded:: 0.1.0a9
            The *exact* parameter.
+    .. versionadded:: 0.1.0a24
+           The *timeout* and *max_nodes* parameters.
     """
     search_text = TextMatch(text, exact=exact)
     matches = []
 
-    for label in dom.css("label"):
+    if isinstance(dom, Document):
+        if not dom.may_contain_text(text, exact=exact):
+            return None
+        dom = dom.parse()
+
+    plan, _ = plan_label_query(get_index(dom), search_text)
+    if ACTIVE.get():
+        record_plan(plan)
+    if plan == "skip":
+        return None
+
+    labels = dom.css("label")
+    for label in labels:
+        if BUDGETS.get():
+            spend()
         label_text = label.text(deep=True, strip=True)
         if search_text.matches(label_text):
+            if ACTIVE.get():
+                record("selector_calls")
             if target_id := label.attributes.get("for"):
                 if target := dom.css_first(f"#{target_id}"):
                     matches.append(target)
@@ -96,6 +515,11 @@ def query_by_label_text(
                 if control := label.css_first("input, select, textarea"):
                     matches.append(control)
 
+    if ACTIVE.get():
+        record("selector_calls")
+        record("nodes_visited", len(labels))
+        record("text_extractions", len(labels))
+
     if len(matches) > 1:
         raise MultipleElementsFoundError(
             f"Found {len(matches)} elements with label '{text}'. "
@@ -107,7 +531,16 @@ def query_by_label_text(
     return Result(matches[0])
 
 
-def get_by_label_text(dom: Parser, text: str, exact=True) -> Result:
+@instrumented
+@budgeted
+def get_by_label_text(
+    dom: Union[Parser, Document],
+    text: str,
+    exact=True,
+    *,
+    timeout: Optional[float] = None,
+    max_nodes: Optional[int] = None,
+) -> Result:
     """
     Retrieves an element from the DOM by its label text.
 
@@ -119,6 +552,12 @@ def get_by_label_text(dom: Parser, text: str, exact=True) -> Result:
         text: The label text to search for.
         exact: Defaults to `True`; matches full strings, case-sensitive.
                When `False`, matches substrings and is not case-sensitive.
+        timeout: Seconds the query may run before raising
+                 ``QueryBudgetExceededError``. Defaults to the limit set
+                 with ``set_budget``.
+        max_nodes: Elements the query may visit before raising
+                   ``QueryBudgetExceededError``. Defaults to the limit set
+                   with ``set_budget``.
 
     Returns:
         A Result containing the matched element.
@@ -128,9 +567,13 @@ def get_by_label_text(dom: Parser, text: str, exact=True) -> Result:
             If no elements with the specified label text are found.
         MultipleElementsFoundError:
             If multiple elements with matching label text are found.
+        QueryBudgetExceededError:
+            If the query exceeds its timeout or node budget.
 
     .. versionadded:: 0.1.0a9
            The *exact* parameter.
+    .. versionadded:: 0.1.0a24
+           The *timeout* and *max_nodes* parameters.
     """
     try:
         result = query_by_label_text(dom, text, exact)
@@ -148,7 +591,17 @@ def get_by_label_text(dom: Parser, text: str, exact=True) -> Result:
         )
 
 
-def query_by_text(dom: Parser, text: str, exact=True) -> Optional[Result]:
+@instrumented
+@budgeted
+@memoized
+def query_by_text(
+    dom: Union[Parser, Document],
+    text: str,
+    exact=True,
+    *,
+    timeout: Optional[float] = None,
+    max_nodes: Optional[int] = None,
+) -> Optional[Result]:
     """
     Queries the DOM for an element containing the specified text.
 
@@ -157,6 +610,12 @@ def query_by_text(dom: Parser, text: str, exact=True) -> Optional[Result]:
         text: The text content to search for.
         exact: Defaults to `True`; matches full strings, case-sensitive.
                When `False`, matches substrings and is not case-sensitive.
+        timeout: Seconds the query may run before raising
+                 ``QueryBudgetExceededError``. Defaults to the limit set
+                 with ``set_budget``.
+        max_nodes: Elements the query may visit before raising
+                   ``QueryBudgetExceededError``. Defaults to the limit set
+                   with ``set_budget``.
 
     Returns:
         A Result containing the matched element.
@@ -164,18 +623,46 @@ def query_by_text(dom: Parser, text: str, exact=True) -> Optional[Result]:
     Raises:
         MultipleElementsFoundError:
             If multiple elements with matching text are found.
+        QueryBudgetExceededError:
+            If the query exceeds its timeout or node budget.
 
     .. versionadded:: 0.1.0a9
            The *exact* parameter.
+    .. versionadded:: 0.1.0a24
+           The *timeout* and *max_nodes* parameters.
     """
     search_text = TextMatch(text, exact=exact)
     matches = []
 
-    for element in dom.css(get_selector()):
-        element_text = element.text(deep=True, strip=True)
+    if isinstance(dom, Document):
+        if not dom.may_contain_text(text, exact=exact):
+            return None
+        dom = dom.parse()
 
-        if search_text.matches(element_text):
-            matches.append(element)
+    index = get_index(dom)
+    plan, cost = plan_text_query(index, search_text)
+    if ACTIVE.get():
+        record_plan(plan)
+
+    if plan == "skip":
+        return None
+    elif plan == "scan":
+        index.costs["text"] = index.costs.get("text", 0) + cost
+        elements = dom.css(get_selector())
+        for element in elements:
+            if BUDGETS.get():
+                spend()
+            element_text = element.text(deep=True, strip=True)
+
+            if search_text.matches(element_text):
+                matches.append(element)
+
+        if ACTIVE.get():
+            record("selector_calls")
+            record("nodes_visited", len(elements))
+            record("text_extractions", len(elements))
+    else:
+        matches = index.get_text_elements(search_text)
 
     if len(matches) > 1:
         for i, parent in enumerate(matches):
@@ -193,7 +680,16 @@ def query_by_text(dom: Parser, text: str, exact=True) -> Optional[Result]:
     return Result(matches[0])
 
 
-def get_by_text(dom: Parser, text: str, exact=True) -> Result:
+@instrumented
+@budgeted
+def get_by_text(
+    dom: Union[Parser, Document],
+    text: str,
+    exact=True,
+    *,
+    timeout: Optional[float] = None,
+    max_nodes: Optional[int] = None,
+) -> Result:
     """
     Retrieves an element from the DOM by its text content.
 
@@ -205,6 +701,12 @@ def get_by_text(dom: Parser, text: str, exact=True) -> Result:
         text: The text content to search for.
         exact: Defaults to `True`; matches full strings, case-sensitive.
                When `False`, matches substrings and is not case-sensitive.
+        timeout: Seconds the query may run before raising
+                 ``QueryBudgetExceededError``. Defaults to the limit set
+                 with ``set_budget``.
+        max_nodes: Elements the query may visit before raising
+                   ``QueryBudgetExceededError``. Defaults to the limit set
+                   with ``set_budget``.
 
     Returns:
         A Result containing the matched element.
@@ -214,9 +716,13 @@ def get_by_text(dom: Parser, text: str, exact=True) -> Result:
             If no elements with the specified text are found.
         MultipleElementsFoundError:
             If multiple elements with matching text are found.
+        QueryBudgetExceededError:
+            If the query exceeds its timeout or node budget.
 
     .. versionadded:: 0.1.0a9
            The *exact* parameter.
+    .. versionadded:: 0.1.0a24
+           The *timeout* and *max_nodes* parameters.
     """
     try:
         result = query_by_text(dom, text, exact=exact)
@@ -234,12 +740,24 @@ def get_by_text(dom: Parser, text: str, exact=True) -> Result:
         )
 
 
+@instrumented
+@budgeted
+@memoized
 def query_by_role(
-    dom: Parser,
+    dom: Union[Parser, Document],
     role: AriaRoles,
     current: Optional[bool | str] = None,
     name: Optional[str] = None,
     description: Optional[str] = None,
+    checked: Optional[bool | str] = None,
+    selected: Optional[bool] = None,
+    pressed: Optional[bool | str] = None,
+    expanded: Optional[bool] = None,
+    disabled: Optional[bool] = None,
+    level: Optional[int] = None,
+    *,
+    timeout: Optional[float] = None,
+    max_nodes: Optional[int] = None,
 ) -> Optional[Result]:
     """
     Queries the DOM for an element with the specified ARIA role.
@@ -251,6 +769,19 @@ def query_by_role(
                  Can be a boolean or string "true".
         name: The accessible name of the element.
         description: The accessible description of the element.
+        checked: The checked state, ``True``, ``False`` or ``"mixed"``.
+        selected: The selected state.
+        pressed: The pressed state, ``True``, ``False`` or ``"mixed"``.
+        expanded: The expanded state.
+        disabled: The disabled state, including the one inherited
+                  from a disabled ``<fieldset>``.
+        level: The heading level.
+        timeout: Seconds the query may run before raising
+                 ``QueryBudgetExceededError``. Defaults to the limit set
+                 with ``set_budget``.
+        max_nodes: Elements the query may visit before raising
+                   ``QueryBudgetExceededError``. Defaults to the limit set
+                   with ``set_budget``.
 
     Returns:
         A Result containing the matched element.
@@ -258,26 +789,67 @@ def query_by_role(
     Raises:
         MultipleElementsFoundError:
             If multiple elements with matching role are found.
+        QueryBudgetExceededError:
+            If the query exceeds its timeout or node budget.
 
     .. versionadded:: 0.1.0a10
     .. versionadded:: 0.1.0a15
            The *name* parameter.
     .. versionadded:: 0.1.0a16
            The *description* parameter.
+    .. versionadded:: 0.1.0a24
+           The *checked*, *selected*, *pressed*, *expanded*, *disabled*,
+           *level*, *timeout* and *max_nodes* parameters.
     """
 
     matches = []
+    state_filters = get_state_filters(
+        checked=checked,
+        selected=selected,
+        pressed=pressed,
+        expanded=expanded,
+        disabled=disabled,
+        level=level,
+    )
+    if isinstance(dom, Document):
+        dom = dom.parse()
+    index = get_index(dom)
+    plan, cost = plan_role_query(index, role, name)
+    if ACTIVE.get():
+        record_plan(plan)
+
+    if plan == "scan":
+        index.costs["role"] = index.costs.get("role", 0) + cost
+        role_elements = scan_role_elements(dom, role)
+        candidates = role_elements
+        if name is not None:
+            candidates = filter_names(role_elements, name)
+    else:
+        role_elements = index.get_role_elements(role)
+        candidates = role_elements
+        if name is not None:
+            candidates = index.get_named_elements(role, name)
+
+    if ACTIVE.get():
+        record("role_candidates", len(role_elements))
+
+    for element in candidates:
+        if BUDGETS.get():
+            spend()
+
+        if role != "document" and element.tag in ["html", "body"]:
+            continue
 
-    for element in dom.css(get_selector(role)):
-        role_matcher = RoleResolver(
-            element=element,
-            target_role=role,
-            name=name,
-            description=description,
-        )
-        if not role_matcher.matches():
+        if state_filters and not index.matches_states(
+            element, state_filters, build=plan != "scan"
+        ):
             continue
 
+        if description is not None:
+            resolver = AccessibleDescriptionResolver(element)
+            if resolver.resolve() != description:
+                continue
+
         if current is not None:
             expected = str(current).lower() == "true"
             actual = element.attributes.get("aria-current", "") == "true"
@@ -290,7 +862,7 @@ def query_by_role(
             for i, parent in enumerate(matches):
                 for j, child in enumerate(matches):
                     if i != j and is_parent_of(parent, child):
-                        return Result(child)
+                        return make_role_result(child, role, name, description)
 
             raise MultipleElementsFoundError(
                 f"Found {len(matches)} elements with role '{role}'. "
@@ -300,15 +872,26 @@ def query_by_role(
     if not matches:
         return None
 
-    return Result(matches[0])
+    return make_role_result(matches[0], role, name, description)
 
 
+@instrumented
+@budgeted
 def get_by_role(
-    dom: Parser,
+    dom: Union[Parser, Document],
     role: AriaRoles,
     current: Optional[bool | str] = None,
     name: Optional[str] = None,
     description: Optional[str] = None,
+    checked: Optional[bool | str] = None,
+    selected: Optional[bool] = None,
+    pressed: Optional[bool | str] = None,
+    expanded: Optional[bool] = None,
+    disabled: Optional[bool] = None,
+    level: Optional[int] = None,
+    *,
+    timeout: Optional[float] = None,
+    max_nodes: Optional[int] = None,
 ) -> Result:
     """
     Retrieves an element from the DOM by its ARIA role.
@@ -323,6 +906,19 @@ def get_by_role(
                  Can be a boolean or string "true".
         name: The accessible name of the element.
         description: The accessible description of the element.
+        checked: The checked state, ``True``, ``False`` or ``"mixed"``.
+        selected: The selected state.
+        pressed: The pressed state, ``True``, ``False`` or ``"mixed"``.
+        expanded: The expanded state.
+        disabled: The disabled state, including the one inherited
+                  from a disabled ``<fieldset>``.
+        level: The heading level.
+        timeout: Seconds the query may run before raising
+                 ``QueryBudgetExceededError``. Defaults to the limit set
+                 with ``set_budget``.
+        max_nodes: Elements the query may visit before raising
+                   ``QueryBudgetExceededError``. Defaults to the limit set
+                   with ``set_budget``.
 
     Returns:
         A Result containing the matched element and context description.
@@ -332,16 +928,31 @@ def get_by_role(
             If no elements with the specified role are found.
         MultipleElementsFoundError:
             If multiple elements with matching role are found.
+        QueryBudgetExceededError:
+            If the query exceeds its timeout or node budget.
 
     .. versionadded:: 0.1.0a10
     .. versionadded:: 0.1.0a15
            The *name* parameter.
     .. versionadded:: 0.1.0a16
            The *description* parameter.
+    .. versionadded:: 0.1.0a24
+           The *checked*, *selected*, *pressed*, *expanded*, *disabled*,
+           *level*, *timeout* and *max_nodes* parameters.
     """
     try:
         result = query_by_role(
-            dom, role, current=current, name=name, description=description
+            dom,
+            role,
+            current=current,
+            name=name,
+            description=description,
+            checked=checked,
+            selected=selected,
+            pressed=pressed,
+            expanded=expanded,
+            disabled=disabled,
+            level=level,
         )
         if not result:
             raise NoElementsFoundError(
@@ -357,8 +968,22 @@ def get_by_role(
         )
 
 
+@instrumented
+@budgeted
+@memoized
 def query_all_by_role(
-    dom: Parser, role: AriaRoles, current: Optional[bool | str] = None
+    dom: Union[Parser, Document],
+    role: AriaRoles,
+    current: Optional[bool | str] = None,
+    checked: Optional[bool | str] = None,
+    selected: Optional[bool] = None,
+    pressed: Optional[bool | str] = None,
+    expanded: Optional[bool] = None,
+    disabled: Optional[bool] = None,
+    level: Optional[int] = None,
+    *,
+    timeout: Optional[float] = None,
+    max_nodes: Optional[int] = None,
 ) -> list[Result]:
     """
     Queries the DOM for all elements with the specified ARIA role.
@@ -368,18 +993,65 @@ def query_all_by_role(
         role: The ARIA role to search for.
         current: The value to check for aria-current attribute.
                  Can be a boolean or string "true".
+        checked: The checked state, ``True``, ``False`` or ``"mixed"``.
+        selected: The selected state.
+        pressed: The pressed state, ``True``, ``False`` or ``"mixed"``.
+        expanded: The expanded state.
+        disabled: The disabled state, including the one inherited
+                  from a disabled ``<fieldset>``.
+        level: The heading level.
+        timeout: Seconds the query may run before raising
+                 ``QueryBudgetExceededError``. Defaults to the limit set
+                 with ``set_budget``.
+        max_nodes: Elements the query may visit before raising
+                   ``QueryBudgetExceededError``. Defaults to the limit set
+                   with ``set_budget``.
 
     Returns:
         A list of Result objects containing the matched elements.
 
+    Raises:
+        QueryBudgetExceededError:
+            If the query exceeds its timeout or node budget.
+
     .. versionadded:: 0.1.0a13
+    .. versionadded:: 0.1.0a24
+           The *checked*, *selected*, *pressed*, *expanded*, *disabled*,
+           *level*, *timeout* and *max_nodes* parameters.
     """
 
     matches = []
-
-    for element in dom.css("*"):
-        role_matcher = RoleResolver(element=element, target_role=role)
-        if not role_matcher.matches():
+    state_filters = get_state_filters(
+        checked=checked,
+        selected=selected,
+        pressed=pressed,
+        expanded=expanded,
+        disabled=disabled,
+        level=level,
+    )
+    if isinstance(dom, Document):
+        dom = dom.parse()
+    index = get_index(dom)
+    plan, cost = plan_role_query(index, role)
+    if ACTIVE.get():
+        record_plan(plan)
+
+    if plan == "scan":
+        index.costs["role"] = index.costs.get("role", 0) + cost
+        candidates = scan_role_elements(dom, role)
+    else:
+        candidates = index.get_role_elements(role)
+
+    if ACTIVE.get():
+        record("role_candidates", len(candidates))
+
+    for element in candidates:
+        if BUDGETS.get():
+            spend()
+
+        if state_filters and not index.matches_states(
+            element, state_filters, build=plan != "scan"
+        ):
             continue
 
         if current is not None:
@@ -388,13 +1060,26 @@ def query_all_by_role(
             if actual != expected:
                 continue
 
-        matches.append(Result(element))
+        matches.append(Result(element, role=role.lower()))
 
     return matches
 
 
+@instrumented
+@budgeted
 def get_all_by_role(
-    dom: Parser, role: AriaRoles, current: Optional[bool | str] = None
+    dom: Union[Parser, Document],
+    role: AriaRoles,
+    current: Optional[bool | str] = None,
+    checked: Optional[bool | str] = None,
+    selected: Optional[bool] = None,
+    pressed: Optional[bool | str] = None,
+    expanded: Optional[bool] = None,
+    disabled: Optional[bool] = None,
+    level: Optional[int] = None,
+    *,
+    timeout: Optional[float] = None,
+    max_nodes: Optional[int] = None,
 ) -> list[Result]:
     """
     Retrieves all elements from the DOM by their ARIA role.
@@ -406,6 +1091,19 @@ def get_all_by_role(
         role: The ARIA role to search for.
         current: Optional value to check for aria-current attribute.
                  Can be a boolean or string "true".
+        checked: The checked state, ``True``, ``False`` or ``"mixed"``.
+        selected: The selected state.
+        pressed: The pressed state, ``True``, ``False`` or ``"mixed"``.
+        expanded: The expanded state.
+        disabled: The disabled state, including the one inherited
+                  from a disabled ``<fieldset>``.
+        level: The heading level.
+        timeout: Seconds the query may run before raising
+                 ``QueryBudgetExceededError``. Defaults to the limit set
+                 with ``set_budget``.
+        max_nodes: Elements the query may visit before raising
+                   ``QueryBudgetExceededError``. Defaults to the limit set
+                   with ``set_budget``.
 
     Returns:
         A list of Result objects containing the matched elements.
@@ -413,13 +1111,95 @@ def get_all_by_role(
     Raises:
         NoElementsFoundError:
             If no elements with the specified role are found.
+        QueryBudgetExceededError:
+            If the query exceeds its timeout or node budget.
 
     .. versionadded:: 0.1.0a13
+    .. versionadded:: 0.1.0a24
+           The *checked*, *selected*, *pressed*, *expanded*, *disabled*,
+           *level*, *timeout* and *max_nodes* parameters.
     """
-    results = query_all_by_role(dom, role, current=current)
+    results = query_all_by_role(
+        dom,
+        role,
+        current=current,
+        checked=checked,
+        selected=selected,
+        pressed=pressed,
+        expanded=expanded,
+        disabled=disabled,
+        level=level,
+    )
     if not results:
         raise NoElementsFoundError(
             f"No elements found with role '{role}'. "
             f"Use query_all_by_role if expecting no matches."
         )
     return results
+
+
+class ByRole(NamedTuple):
+    """
+    A role query, with the arguments of ``query_by_role``.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    role: AriaRoles
+    current: Optional[bool | str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    checked: Optional[bool | str] = None
+    selected: Optional[bool] = None
+    pressed: Optional[bool | str] = None
+    expanded: Optional[bool] = None
+    disabled: Optional[bool] = None
+    level: Optional[int] = None
+
+    def query(self, dom: Union[Parser, Document]) -> Optional[Result]:
+        return query_by_role(dom, *self)
+
+    def query_all(self, dom: Union[Parser, Document]) -> list[Result]:
+        if self.name is not None or self.description is not None:
+            raise ValueError(
+                "query_all_by_role does not filter by name or description."
+            )
+        return query_all_by_role(
+            dom,
+            self.role,
+            current=self.current,
+            checked=self.checked,
+            selected=self.selected,
+            pressed=self.pressed,
+            expanded=self.expanded,
+            disabled=self.disabled,
+            level=self.level,
+        )
+
+
+class ByText(NamedTuple):
+    """
+    A text query, with the arguments of ``query_by_text``.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    text: str
+    exact: bool = True
+
+    def query(self, dom: Union[Parser, Document]) -> Optional[Result]:
+        return query_by_text(dom, self.text, exact=self.exact)
+
+
+class ByLabelText(NamedTuple):
+    """
+    A label query, with the arguments of ``query_by_label_text``.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    text: str
+    exact: bool = True
+
+    def query(self, dom: Union[Parser, Document]) -> Optional[Result]:
+        return query_by_label_text(dom, self.text, exact=self.exact)
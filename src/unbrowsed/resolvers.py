@@ -2,7 +2,32 @@
 
 from typing import Optional
 from selectolax.lexbor import LexborNode
-from unbrowsed.types import ImplicitRoleMapping
+from unbrowsed.instrumentation import ACTIVE, record
+from unbrowsed.types import ElementState, ImplicitRoleMapping
+
+DISABLEABLE_TAGS = (
+    "button",
+    "fieldset",
+    "input",
+    "optgroup",
+    "option",
+    "select",
+    "textarea",
+)
+
+
+def select_first(node: LexborNode, selector: str) -> Optional[LexborNode]:
+    """``css_first`` that is counted by ``unbrowsed.stats()``."""
+    if ACTIVE.get():
+        record("selector_calls")
+    return node.css_first(selector)
+
+
+def get_text(node: LexborNode) -> str:
+    """Deep, stripped text that is counted by ``unbrowsed.stats()``."""
+    if ACTIVE.get():
+        record("text_extractions")
+    return node.text(deep=True, strip=True)
 
 
 class AccessibleNameResolver:
@@ -11,6 +36,8 @@ class AccessibleNameResolver:
         self.element = element
 
     def resolve(self) -> Optional[str]:
+        if ACTIVE.get():
+            record("name_resolutions")
         node = self.element
         labelledby = node.attributes.get("aria-labelledby")
         if labelledby:
@@ -20,8 +47,8 @@ class AccessibleNameResolver:
 
             name_texts = []
             for id_ref in labelledby.split():
-                if element := root.css_first(f"#{id_ref}"):
-                    text = element.text(deep=True, strip=True)
+                if element := select_first(root, f"#{id_ref}"):
+                    text = get_text(element)
                     if text:
                         name_texts.append(text)
             return " ".join(name_texts)
@@ -32,8 +59,8 @@ class AccessibleNameResolver:
                 return aria_label
 
         if node.tag == "fieldset":
-            if legend := node.css_first("legend"):
-                return legend.text(deep=True, strip=True)
+            if legend := select_first(node, "legend"):
+                return get_text(legend)
 
         if node.tag in ["input", "textarea", "select"] and node.attributes.get(
             "id"
@@ -43,8 +70,8 @@ class AccessibleNameResolver:
             while root.parent:
                 root = root.parent
 
-            if label := root.css_first(f"label[for='{element_id}']"):
-                return label.text(deep=True, strip=True)
+            if label := select_first(root, f"label[for='{element_id}']"):
+                return get_text(label)
 
         if node.tag == "img" and node.attributes.get("alt"):
             return node.attributes.get("alt", "").strip()  # type: ignore
@@ -53,18 +80,18 @@ class AccessibleNameResolver:
 
             if (
                 node.tag == "a"
-                and (img := node.css_first("img"))
+                and (img := select_first(node, "img"))
                 and img.attributes.get("alt")
             ):
                 alt_text = img.attributes.get(
                     "alt", ""
                 ).strip()  # type: ignore
-                node_text = node.text(deep=True, strip=True)
+                node_text = get_text(node)
                 if node_text:
                     return f"{alt_text} {node_text}"
                 return alt_text
 
-            return node.text(deep=True, strip=True)
+            return get_text(node)
 
         if title := node.attributes.get("title"):
             if title.strip():
@@ -78,6 +105,8 @@ class AccessibleDescriptionResolver:
         self.element = element
 
     def resolve(self) -> Optional[str]:
+        if ACTIVE.get():
+            record("description_resolutions")
         node = self.element
         describedby = node.attributes.get("aria-describedby")
         if not describedby:
@@ -89,8 +118,8 @@ class AccessibleDescriptionResolver:
 
         description_texts = []
         for id_ref in describedby.split():
-            if element := root.css_first(f"#{id_ref}"):
-                text = element.text(deep=True, strip=True)
+            if element := select_first(root, f"#{id_ref}"):
+                text = get_text(element)
                 if text:
                     description_texts.append(text)
 
@@ -100,6 +129,70 @@ class AccessibleDescriptionResolver:
         return None
 
 
+class StateResolver:
+    """
+    Resolves the ARIA states of an element from its own attributes.
+
+    Inherited states, like ``disabled`` from an enclosing ``<fieldset>``,
+    need the element's ancestors and are handled by the document index.
+    """
+
+    def __init__(self, element: LexborNode):
+        self.element = element
+
+    def resolve(self) -> ElementState:
+        attributes = self.element.attributes
+        tag = self.element.tag
+
+        checked = self.get_tristate(attributes.get("aria-checked"))
+        if tag == "input" and attributes.get("type") in ["checkbox", "radio"]:
+            checked = "checked" in attributes
+
+        selected = self.get_boolean(attributes.get("aria-selected"))
+        if tag == "option":
+            selected = "selected" in attributes
+
+        disabled = attributes.get("aria-disabled") == "true" or (
+            tag in DISABLEABLE_TAGS and "disabled" in attributes
+        )
+
+        return ElementState(
+            checked=checked,
+            selected=selected,
+            pressed=self.get_tristate(attributes.get("aria-pressed")),
+            expanded=self.get_boolean(attributes.get("aria-expanded")),
+            disabled=disabled,
+            level=self.get_level(),
+        )
+
+    def get_level(self) -> Optional[int]:
+        """
+        Determine the heading level from aria-level or the tag name.
+        """
+        aria_level = self.element.attributes.get("aria-level")
+        if aria_level and aria_level.strip().isdecimal():
+            return int(aria_level)
+        tag = self.element.tag
+        if tag in ["h1", "h2", "h3", "h4", "h5", "h6"]:
+            return int(tag[1])
+        return None
+
+    @staticmethod
+    def get_boolean(value: Optional[str]) -> Optional[bool]:
+        if value is None:
+            return None
+        return value.strip().lower() == "true"
+
+    @staticmethod
+    def get_tristate(value: Optional[str]) -> Optional[bool | str]:
+        if value is None:
+            return None
+        value = value.strip().lower()
+        if value == "mixed":
+            return "mixed"
+        return value == "true"
+
+
 class RoleResolver:
 
     def __init__(
@@ -156,16 +249,7 @@ class RoleResolver:
 
     def matches(self) -> bool:
 
-        explicit_role = self.element.attributes.get("role")
-        implicit_role = self.get_implicit_role_handler()
-
-        role_matches = False
-        if (explicit_role and explicit_role.lower() == self.target_role) or (
-            implicit_role and implicit_role.lower() == self.target_role
-        ):
-            role_matches = True
-
-        if not role_matches:
+        if self.target_role not in self.get_roles():
             return False
 
         if self.name is not None:
@@ -182,6 +266,20 @@ class RoleResolver:
 
         return True
 
+    def get_roles(self) -> list[str]:
+        """
+        Return the roles the element matches, explicit role first.
+
+        .. versionadded:: 0.1.0a24
+        """
+        roles = []
+        if explicit_role := self.element.attributes.get("role"):
+            roles.append(explicit_role.lower())
+        implicit_role = self.get_implicit_role_handler()
+        if implicit_role and implicit_role.lower() not in roles:
+            roles.append(implicit_role.lower())
+        return roles
+
     def get_implicit_role_handler(self):
         tag = self.element.tag
         handler = self.get_implicit_role_mapping().get(tag)  # type: ignore
@@ -202,7 +300,8 @@ class RoleResolver:
         while ancestor and ancestor.tag != "table":
             ancestor = ancestor.parent
 
-        table_role = ancestor.attributes.get("role")  # type: ignore
+        # A <td> can be left outside of any table by editing the document.
+        table_role = ancestor.attributes.get("role") if ancestor else None
 
         if not table_role:
             return "cell"
@@ -239,12 +338,10 @@ class RoleResolver:
         """
         if "multiple" in self.element.attributes:
             return "listbox"
-        if (
-            "size" in self.element.attributes
-            and self.element.attributes.get("size", None) is not None
-        ):
-            if int(self.element.attributes.get("size")) > 1:  # type: ignore
-                return "listbox"
+        size = self.element.attributes.get("size")
+        # Like NodeTable.get_size, an invalid size counts as none.
+        if size is not None and size.strip().isdecimal() and int(size) > 1:
+            return "listbox"
         return "combobox"
 
     def get_a_role(self) -> str:
@@ -270,12 +367,13 @@ class RoleResolver:
                 "main",
                 "nav",
                 "section",
-            ] or parent.css_first(
+            ] or select_first(
+                parent,
                 ":is([role='article'],"
                 "[role='complementary'],"
                 "[role='main'],"
                 "[role='navigation'],"
-                "[role='region'])"
+                "[role='region'])",
             ):
                 return "generic"
 
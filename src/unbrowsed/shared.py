@@ -0,0 +1,380 @@
+"""
+unbrowsed shared documents.
+
+Publishes the role, name and text tables of a parsed document into a
+``multiprocessing.shared_memory`` block, so that worker processes can run
+read-only queries against one copy of a large document without parsing it
+again.
+
+The block holds a JSON header followed by native int32 columns, one entry per
+element in document order, and two UTF-8 arenas. The text arena stores
+the stripped text nodes of the document in order, so the text of any
+element is the contiguous slice spanning its subtree.
+"""
+
+import json
+from array import array
+import struct
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+
+from selectolax.lexbor import LexborHTMLParser as Parser
+
+from unbrowsed.exceptions import MultipleElementsFoundError
+from unbrowsed.matchers import TextMatch
+from unbrowsed.resolvers import (
+    AccessibleDescriptionResolver,
+    AccessibleNameResolver,
+    RoleResolver,
+)
+
+COLUMNS = [
+    "parent",
+    "tag",
+    "explicit_role",
+    "implicit_role",
+    "current",
+    "text_start",
+    "text_end",
+    "name_start",
+    "name_end",
+    "description_start",
+    "description_end",
+]
+
+HEADER_SIZE = struct.calcsize("<I")
+
+
+class SharedDocument:
+    """
+    Read-only tables of a document stored in shared memory.
+
+    Create one in the parent process with ``SharedDocument.publish`` and
+    pass its ``name`` to the workers, which open it with
+    ``SharedDocument.attach``. Queries return the position of the matched
+    element in document order, the same order as ``dom.css("*")``.
+
+    .. versionadded:: 0.1.0a24
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+
+        (header_length,) = struct.unpack_from("<I", shm.buf, 0)
+        header_end = HEADER_SIZE + header_length
+        header = json.loads(bytes(shm.buf[HEADER_SIZE:header_end]))
+        self.length = header["length"]
+        self.strings = header["strings"]
+        self.string_ids = {value: i for i, value in enumerate(self.strings)}
+
+        offset = header_end
+        column_size = 4 * self.length
+        self.views = []
+        for column in COLUMNS:
+            end = offset + column_size
+            view = shm.buf[offset:end].cast("i")
+            setattr(self, column, view)
+            self.views.append(view)
+            offset = end
+
+        end = offset + header["text_size"]
+        self.text = shm.buf[offset:end]
+        offset, end = end, end + header["names_size"]
+        self.names = shm.buf[offset:end]
+        self.views.extend([self.text, self.names])
+
+    @property
+    def name(self) -> str:
+        """The name workers use to attach to the shared memory block."""
+        return self.shm.name
+
+    @classmethod
+    def publish(
+        cls, dom: Parser, name: Optional[str] = None
+    ) -> "SharedDocument":
+        """
+        Build the tables of the given document into a new shared memory
+        block.
+
+        The publishing process owns the block and must call ``unlink``
+        once all workers are done with it.
+        """
+        strings = {"": 0}
+        columns: dict[str, list[int]] = {column: [] for column in COLUMNS}
+        text = bytearray()
+        names = bytearray()
+
+        def intern(value: str) -> int:
+            return strings.setdefault(value, len(strings))
+
+        def add_name(value: Optional[str]) -> tuple[int, int]:
+            if value is None:
+                return -1, -1
+            start = len(names)
+            names.extend(value.encode())
+            return start, len(names)
+
+        root = dom.root
+        stack = [(root, -1)] if root is not None else []
+        while stack:
+            node, parent = stack.pop()
+            if node is None:
+                columns["text_end"][parent] = len(text)
+                continue
+            if node.is_text_node:
+                text.extend(node.text(strip=True).encode())
+                continue
+            if not node.is_element_node:
+                continue
+
+            position = len(columns["parent"])
+            attributes = node.attributes
+            roles = RoleResolver(element=node, target_role="").get_roles()
+            explicit_role = roles[0] if attributes.get("role") else ""
+            implicit_role = ""
+            if roles and roles[-1] != explicit_role:
+                implicit_role = roles[-1]
+
+            name_start, name_end = -1, -1
+            if roles:
+                name_start, name_end = add_name(
+                    AccessibleNameResolver(node).resolve()
+                )
+            description_start, description_end = add_name(
+                AccessibleDescriptionResolver(node).resolve()
+            )
+
+            columns["parent"].append(parent)
+            columns["tag"].append(intern(node.tag))
+            columns["explicit_role"].append(intern(explicit_role))
+            columns["implicit_role"].append(intern(implicit_role))
+            columns["current"].append(
+                int(attributes.get("aria-current", "") == "true")
+            )
+            columns["text_start"].append(len(text))
+            columns["text_end"].append(0)
+            columns["name_start"].append(name_start)
+            columns["name_end"].append(name_end)
+            columns["description_start"].append(description_start)
+            columns["description_end"].append(description_end)
+
+            stack.append((None, position))
+            children = []
+            child = node.child
+            while child is not None:
+                children.append(child)
+                child = child.next
+            for child in reversed(children):
+                stack.append((child, position))
+
+        length = len(columns["parent"])
+        header = json.dumps(
+            {
+                "length": length,
+                "strings": list(strings),
+                "text_size": len(text),
+                "names_size": len(names),
+            }
+        ).encode()
+        size = (
+            HEADER_SIZE
+            + len(header)
+            + 4 * length * len(COLUMNS)
+            + len(text)
+            + len(names)
+        )
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        struct.pack_into("<I", shm.buf, 0, len(header))
+        offset = HEADER_SIZE
+        chunks = [header]
+        for column in COLUMNS:
+            chunks.append(array("i", columns[column]).tobytes())
+        chunks.extend([text, names])
+        for chunk in chunks:
+            end = offset + len(chunk)
+            shm.buf[offset:end] = chunk
+            offset = end
+
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedDocument":
+        """Open a document published by another process, without copying."""
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(  # pragma: no cover
+                name=name, track=False
+            )
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            # Only the publisher may unlink the block.
+            resource_tracker.unregister(
+                shm._name, "shared_memory"  # type: ignore
+            )
+        return cls(shm, owner=False)
+
+    def close(self) -> None:
+        """Release this process' view of the shared memory block."""
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory block. Only the publisher may call it."""
+        if not self.owner:
+            raise RuntimeError("Only the publishing process can unlink.")
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedDocument":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        if self.owner:
+            self.unlink()
+
+    def __len__(self) -> int:
+        return self.length
+
+    def get_text(self, position: int) -> str:
+        """Return the text of an element, stripped like ``query_by_text``."""
+        start, end = self.text_start[position], self.text_end[position]
+        return str(self.text[start:end], "utf-8")
+
+    def get_name(self, position: int) -> Optional[str]:
+        """Return the accessible name of an element with a role."""
+        start, end = self.name_start[position], self.name_end[position]
+        if start < 0:
+            return None
+        return str(self.names[start:end], "utf-8")
+
+    def get_description(self, position: int) -> Optional[str]:
+        """Return the accessible description of an element."""
+        start = self.description_start[position]
+        end = self.description_end[position]
+        if start < 0:
+            return None
+        return str(self.names[start:end], "utf-8")
+
+    def is_parent_of(self, parent: int, child: int) -> bool:
+        current = self.parent[child]
+        while current >= 0:
+            if current == parent:
+                return True
+            current = self.parent[current]
+        return False
+
+    def is_html_or_body(self, position: int) -> bool:
+        return self.strings[self.tag[position]] in ["html", "body"]
+
+    def query_all_by_role(
+        self, role: str, current: Optional[bool | str] = None
+    ) -> list[int]:
+        """Return the positions of the elements with the given role."""
+        role_id = self.string_ids.get(role.lower())
+        if not role_id:
+            return []
+
+        matches = []
+        explicit_role, implicit_role = self.explicit_role, self.implicit_role
+        for position in range(self.length):
+            if (
+                explicit_role[position] != role_id
+                and implicit_role[position] != role_id
+            ):
+                continue
+            if current is not None:
+                expected = str(current).lower() == "true"
+                if bool(self.current[position]) != expected:
+                    continue
+            matches.append(position)
+        return matches
+
+    def query_by_role(
+        self,
+        role: str,
+        current: Optional[bool | str] = None,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Query the document by role, like ``unbrowsed.query_by_role``.
+
+        Raises:
+            MultipleElementsFoundError:
+                If multiple elements with matching role are found.
+        """
+        matches: list[int] = []
+        for position in self.query_all_by_role(role, current=current):
+            if role.lower() != "document" and self.is_html_or_body(position):
+                continue
+            if name is not None and self.get_name(position) != name:
+                continue
+            if (
+                description is not None
+                and self.get_description(position) != description
+            ):
+                continue
+
+            matches.append(position)
+
+            if len(matches) > 1:
+                for i, parent in enumerate(matches):
+                    for j, child in enumerate(matches):
+                        if i != j and self.is_parent_of(parent, child):
+                            return child
+
+                raise MultipleElementsFoundError(
+                    f"Found {len(matches)} elements with role '{role}'. "
+                    f"Use query_all_by_role if multiple matches are expected."
+                )
+
+        if not matches:
+            return None
+        return matches[0]
+
+    def query_by_text(self, text: str, exact=True) -> Optional[int]:
+        """
+        Query the document by text, like ``unbrowsed.query_by_text``.
+
+        Exact queries compare the UTF-8 bytes of each element in place.
+
+        Raises:
+            MultipleElementsFoundError:
+                If multiple elements with matching text are found.
+        """
+        search_text = TextMatch(text, exact=exact)
+        needle = search_text.text.encode()
+        matches = []
+
+        for position in range(self.length):
+            if self.is_html_or_body(position):
+                continue
+            if exact:
+                start = self.text_start[position]
+                end = self.text_end[position]
+                if (
+                    end - start == len(needle)
+                    and self.text[start:end] == needle
+                ):
+                    matches.append(position)
+            elif search_text.matches(self.get_text(position)):
+                matches.append(position)
+
+        if len(matches) > 1:
+            for i, parent in enumerate(matches):
+                for j, child in enumerate(matches):
+                    if i != j and self.is_parent_of(parent, child):
+                        return matches[i]
+
+            raise MultipleElementsFoundError(
+                f"Found {len(matches)} elements with text '{text}'. "
+                f"Use query_all_by_text if multiple matches are expected."
+            )
+
+        if not matches:
+            return None
+        return matches[0]
@@ -1,4 +1,4 @@
-from typing import Literal, TypedDict
+from typing import Literal, NamedTuple, Optional, TypedDict
 from collections.abc import Callable
 
 Alert = Literal["alert"]
@@ -163,3 +163,18 @@ class ImplicitRoleMapping(TypedDict, total=False):
     time: Time
     tr: Row
     ul: List
+
+
+class ElementState(NamedTuple):
+    """
+    ARIA states of an element.
+
+    A state is ``None`` when the element does not support it.
+    """
+
+    checked: Optional[bool | str] = None
+    selected: Optional[bool] = None
+    pressed: Optional[bool | str] = None
+    expanded: Optional[bool] = None
+    disabled: bool = False
+    level: Optional[int] = None
@@ -0,0 +1,403 @@
+"""
+unbrowsed user interactions.
+
+Simulate a user filling in a form: typing into text fields, clicking
+checkboxes and radio buttons, selecting options and submitting the form.
+The interactions edit the attributes and contents of the parsed document,
+the way a browser reflects them when the page is serialized, and keep the
+document index current through ``unbrowsed.mutations``, so that the next
+query does not classify the document again.
+
+Example::
+
+    from unbrowsed import get_by_label_text, get_by_role, parse_html, user
+
+    dom = parse_html(html)
+    user.type(dom, get_by_label_text(dom, "Email"), "ada@example.com")
+    user.click(dom, get_by_role(dom, "checkbox", name="Subscribe"))
+    user.submit(dom, get_by_role(dom, "button", name="Sign up"))
+"""
+
+from typing import Optional, Union
+
+from selectolax.lexbor import LexborHTMLParser as Parser
+from selectolax.lexbor import LexborNode
+
+from unbrowsed.document import Document
+from unbrowsed.index import resolve_state
+from unbrowsed.mutations import AttributeChange, edit, edit_attributes
+from unbrowsed.queries import Result
+from unbrowsed.resolvers import select_first
+
+Target = Union[Result, LexborNode]
+
+# The types of the <input> elements users type into.
+TEXT_TYPES = ("", "text", "search", "password", "email", "tel", "url")
+
+SUBMIT_TYPES = ("submit", "image")
+
+# Buttons, which are only submitted when they submit the form.
+BUTTON_TYPES = ("submit", "image", "button", "reset")
+
+LABELABLE_TAGS = ("input", "textarea", "select")
+
+FormData = list[tuple[str, str]]
+
+
+def get_element(target: Target) -> LexborNode:
+    """Return the element of a query result."""
+    return target.element if isinstance(target, Result) else target
+
+
+def get_input_type(element: LexborNode) -> str:
+    return (element.attributes.get("type") or "").lower()
+
+
+def check_enabled(element: LexborNode) -> None:
+    """Raise ``ValueError`` if the element is disabled."""
+    if resolve_state(element).disabled:
+        raise ValueError(f"The <{element.tag}> element is disabled.")
+
+
+def get_form(element: LexborNode) -> Optional[LexborNode]:
+    """Return the form an element belongs to."""
+    ancestor = element.parent
+    while ancestor is not None and ancestor.tag != "form":
+        ancestor = ancestor.parent
+    return ancestor
+
+
+def is_same(node: Optional[LexborNode], other: Optional[LexborNode]) -> bool:
+    """
+    Check whether two nodes are the same node. Nodes compare equal when
+    their markup is.
+    """
+    if node is None or other is None:
+        return node is other
+    return node.mem_id == other.mem_id
+
+
+def get_value(element: LexborNode, default: str) -> str:
+    """
+    Return the ``value`` attribute of an element, or the default when it
+    has none. A ``value`` attribute without a value is empty.
+    """
+    if "value" not in element.attributes:
+        return default
+    return element.attributes["value"] or ""
+
+
+def get_option_value(option: LexborNode) -> str:
+    return get_value(option, option.text(deep=True, strip=True))
+
+
+def set_text(
+    dom: Union[Parser, Document], element: LexborNode, text: str
+) -> None:
+    """Set the value of a text field."""
+    if element.tag == "textarea":
+
+        def apply() -> list[LexborNode]:
+            child = element.child
+            while child is not None:
+                following = child.next
+                child.decompose()
+                child = following
+            if text:
+                element.insert_child(text)
+            return []
+
+        edit(dom, [element], [], apply)
+    else:
+        edit_attributes(dom, [(element, "value", text)])
+
+
+def get_text(element: LexborNode) -> str:
+    """Return the value of a text field."""
+    if element.tag == "textarea":
+        return element.text(deep=True, strip=False)
+    return element.attributes.get("value") or ""
+
+
+def check_text_field(element: LexborNode) -> None:
+    """Raise ``ValueError`` unless users can type into the element."""
+    if not (
+        element.tag == "textarea"
+        or (element.tag == "input" and get_input_type(element) in TEXT_TYPES)
+    ):
+        raise ValueError(f"Cannot type into a <{element.tag}> element.")
+    check_enabled(element)
+    if "readonly" in element.attributes:
+        raise ValueError(f"The <{element.tag}> element is read-only.")
+
+
+def type(dom: Union[Parser, Document], target: Target, text: str) -> None:
+    """
+    Type text at the end of a text field, ``<input>`` or ``<textarea>``.
+
+    The value of an ``<input>`` is kept in its ``value`` attribute, and
+    is cut to its ``maxlength``.
+
+    Args:
+        dom: The document.
+        target: The text field, or a query result for it.
+        text: The text to type.
+
+    Raises:
+        ValueError: If the element is not an enabled, editable text field.
+
+    .. versionadded:: 0.1.0a24
+    """
+    element = get_element(target)
+    check_text_field(element)
+    value = get_text(element) + text
+    maxlength = element.attributes.get("maxlength") or ""
+    if maxlength.isdigit():
+        value = value[: int(maxlength)]
+    set_text(dom, element, value)
+
+
+def clear(dom: Union[Parser, Document], target: Target) -> None:
+    """
+    Clear a text field, ``<input>`` or ``<textarea>``.
+
+    Args:
+        dom: The document.
+        target: The text field, or a query result for it.
+
+    Raises:
+        ValueError: If the element is not an enabled, editable text field.
+
+    .. versionadded:: 0.1.0a24
+    """
+    element = get_element(target)
+    check_text_field(element)
+    set_text(dom, element, "")
+
+
+def get_labelled_control(label: LexborNode) -> Optional[LexborNode]:
+    """Return the control a ``<label>`` is for."""
+    control_id = label.attributes.get("for")
+    if control_id:
+        root = label
+        while root.parent is not None:
+            root = root.parent
+        return select_first(root, f"#{control_id}")
+    return select_first(label, ", ".join(LABELABLE_TAGS))
+
+
+def get_radio_group(element: LexborNode) -> list[LexborNode]:
+    """Return the radio buttons of the same group as the given one."""
+    name = element.attributes.get("name")
+    if not name:
+        return [element]
+    form = get_form(element)
+    root = form
+    if root is None:
+        root = element
+        while root.parent is not None:
+            root = root.parent
+    return [
+        radio
+        for radio in root.css("input")
+        if get_input_type(radio) == "radio"
+        and radio.attributes.get("name") == name
+        and is_same(get_form(radio), form)
+    ]
+
+
+def click(dom: Union[Parser, Document], target: Target) -> None:
+    """
+    Click an element.
+
+    Clicking a checkbox toggles it, and clicking a radio button checks it
+    and unchecks the others of its group: the ones of the same form with
+    the same ``name``. Elements with an explicit ``checkbox`` or
+    ``switch`` role toggle their ``aria-checked`` attribute. Clicking a
+    ``<label>`` clicks its control, and clicking an ``<option>`` selects
+    it, or toggles it in a multiple-choice ``<select>``. Clicking other
+    elements changes nothing.
+
+    Args:
+        dom: The document.
+        target: The element, or a query result for it.
+
+    Raises:
+        ValueError: If the element is disabled.
+
+    .. versionadded:: 0.1.0a24
+    """
+    element = get_element(target)
+    if element.tag == "label":
+        control = get_labelled_control(element)
+        if control is not None:
+            click(dom, control)
+        return
+
+    check_enabled(element)
+    changes: list[AttributeChange] = []
+    input_type = get_input_type(element) if element.tag == "input" else ""
+    if element.tag == "option":
+        select = element.parent
+        while select is not None and select.tag != "select":
+            select = select.parent
+        if select is None or "multiple" not in select.attributes:
+            if select is not None:
+                select_options(dom, select, get_option_value(element))
+            return
+        # Options of a multiple-choice <select> toggle.
+        selected = "selected" in element.attributes
+        changes.append((element, "selected", None if selected else ""))
+    elif input_type == "checkbox":
+        checked = "checked" in element.attributes
+        changes.append((element, "checked", None if checked else ""))
+    elif input_type == "radio":
+        if "checked" in element.attributes:
+            return
+        for radio in get_radio_group(element):
+            if is_same(radio, element):
+                changes.append((radio, "checked", ""))
+            elif "checked" in radio.attributes:
+                changes.append((radio, "checked", None))
+    elif (element.attributes.get("role") or "").lower() in (
+        "checkbox",
+        "switch",
+    ):
+        checked = element.attributes.get("aria-checked") == "true"
+        changes.append(
+            (element, "aria-checked", "false" if checked else "true")
+        )
+    if changes:
+        edit_attributes(dom, changes)
+
+
+def select_options(
+    dom: Union[Parser, Document],
+    target: Target,
+    values: Union[str, list[str]],
+) -> None:
+    """
+    Select options of a ``<select>``, by value or by text, and deselect
+    the others.
+
+    Args:
+        dom: The document.
+        target: The ``<select>`` element, or a query result for it.
+        values: The values or texts of the options to select.
+
+    Raises:
+        ValueError: If the element is not an enabled ``<select>``, an
+                    option is missing or disabled, or more than one option
+                    is selected in a single-choice ``<select>``.
+
+    .. versionadded:: 0.1.0a24
+    """
+    element = get_element(target)
+    if element.tag != "select":
+        raise ValueError(f"Cannot select options of a <{element.tag}>.")
+    check_enabled(element)
+    if isinstance(values, str):
+        values = [values]
+    if len(values) > 1 and "multiple" not in element.attributes:
+        raise ValueError("Cannot select more than one option.")
+
+    options = element.css("option")
+    selected = []
+    for value in values:
+        for option in options:
+            if value in (
+                get_option_value(option),
+                option.text(deep=True, strip=True),
+            ):
+                check_enabled(option)
+                selected.append(option)
+                break
+        else:
+            raise ValueError(f"No option {value!r} found.")
+
+    selected_ids = {option.mem_id for option in selected}
+    changes: list[AttributeChange] = []
+    for option in options:
+        is_selected = "selected" in option.attributes
+        if option.mem_id in selected_ids and not is_selected:
+            changes.append((option, "selected", ""))
+        elif option.mem_id not in selected_ids and is_selected:
+            changes.append((option, "selected", None))
+    if changes:
+        edit_attributes(dom, changes)
+
+
+def get_select_values(select: LexborNode) -> list[str]:
+    """Return the values of the selected options of a ``<select>``."""
+    options = select.css("option")
+    values = [
+        get_option_value(option)
+        for option in options
+        if "selected" in option.attributes
+    ]
+    if values or "multiple" in select.attributes:
+        return values
+    size = select.attributes.get("size") or ""
+    if size.isdigit() and int(size) > 1:
+        return values
+    # A single-choice drop-down shows its first enabled option.
+    for option in options:
+        if not resolve_state(option).disabled:
+            return [get_option_value(option)]
+    return values
+
+
+def submit(dom: Union[Parser, Document], target: Target) -> FormData:
+    """
+    Submit a form, returning the names and values it would send.
+
+    Like a browser, the submitted form includes the enabled controls with
+    a ``name``: checked checkboxes and radio buttons, the selected options
+    of each ``<select>``, and the values of the other fields. Of the
+    buttons, only the one submitting the form is included. The document is
+    not changed.
+
+    Args:
+        dom: The document.
+        target: The form or one of its elements, such as the button
+                submitting it, or a query result for either.
+
+    Returns:
+        list[tuple[str, str]]: The names and values of the form data, in
+        document order.
+
+    Raises:
+        ValueError: If the element is not in a form, or is disabled.
+
+    .. versionadded:: 0.1.0a24
+    """
+    element = get_element(target)
+    form = element if element.tag == "form" else get_form(element)
+    if form is None:
+        raise ValueError(f"The <{element.tag}> element is not in a form.")
+    if element is not form:
+        check_enabled(element)
+
+    form_data: FormData = []
+    for control in form.css("input, select, textarea, button"):
+        name = control.attributes.get("name")
+        if not name or resolve_state(control).disabled:
+            continue
+        if control.tag == "select":
+            form_data.extend(
+                (name, value) for value in get_select_values(control)
+            )
+            continue
+
+        input_type = get_input_type(control)
+        if control.tag == "button" or input_type in BUTTON_TYPES:
+            if control.tag == "button":
+                input_type = input_type or "submit"
+            if is_same(control, element) and input_type in SUBMIT_TYPES:
+                form_data.append((name, get_value(control, "")))
+        elif input_type in ("checkbox", "radio"):
+            if "checked" in control.attributes:
+                form_data.append((name, get_value(control, "on")))
+        elif input_type != "file":
+            form_data.append((name, get_text(control)))
+    return form_data
@@ -1,5 +1,7 @@
 """unbrowsed utils."""
 
+from typing import Any
+
 from selectolax.lexbor import LexborNode
 from unbrowsed.types import AriaRoles
 
@@ -21,3 +23,73 @@ def get_selector(role: AriaRoles | None = None):
     if role == "document":
         return "*"
     return "*:not(html):not(body)"
+
+
+# States that are ``True``, ``False`` or ``"mixed"``.
+TRISTATES = ("checked", "pressed")
+
+
+def get_tristate(value: Any) -> Any:
+    """
+    Normalize a tristate filter, so that ``"true"`` and ``"false"`` match
+    like ``True`` and ``False``, the way ``current`` does.
+    """
+    if not isinstance(value, str):
+        return value
+    value = value.strip().lower()
+    if value == "mixed":
+        return "mixed"
+    return value == "true"
+
+
+def get_state_filters(**states: Any) -> dict[str, Any]:
+    """Return only the state filters that were requested."""
+    return {
+        state: get_tristate(value) if state in TRISTATES else value
+        for state, value in states.items()
+        if value is not None
+    }
+
+
+def get_path(element: LexborNode) -> tuple[int, ...]:
+    """
+    Return the position of the element among the elements of its parent,
+    and the same for each of its ancestors, from the root element down.
+
+    Paths compare in document order.
+    """
+    path = []
+    current = element
+    while current is not None and not current.tag.startswith("-"):
+        position = 0
+        sibling = current.prev
+        while sibling is not None:
+            if not sibling.tag.startswith("-"):
+                position += 1
+            sibling = sibling.prev
+        path.append(position)
+        current = current.parent
+    path.reverse()
+    return tuple(path)
+
+
+def get_css_path(element: LexborNode) -> str:
+    """
+    Return a CSS selector locating the element by its position, such as
+    ``html > body:nth-child(2) > form:nth-child(1) > button:nth-child(3)``.
+    """
+    parts = []
+    current = element
+    while current is not None and not current.tag.startswith("-"):
+        position = 1
+        sibling = current.prev
+        while sibling is not None:
+            if not sibling.tag.startswith("-"):
+                position += 1
+            sibling = sibling.prev
+        if current.parent is None or current.parent.tag.startswith("-"):
+            parts.append(current.tag)
+        else:
+            parts.append(f"{current.tag}:nth-child({position})")
+        current = current.parent
+    return " > ".join(reversed(parts))
@@ -0,0 +1,290 @@
+import pytest
+
+from selectolax.lexbor import LexborHTMLParser
+
+from unbrowsed import (
+    Document,
+    aria_snapshot,
+    assert_aria_snapshot,
+    diff_accessibility,
+    parse_html,
+    stats,
+)
+from unbrowsed.accessibility import align, build_tree, walk
+from unbrowsed.index import get_index
+
+PAGE = """
+<header><h1>Shop</h1></header>
+<nav aria-label="Main"><a href="/">Home</a><a href="/cart">Cart</a></nav>
+<main>
+  <p>Hello <b>world</b></p>
+  <ul><li>First</li><li>Second</li></ul>
+  <button aria-describedby="hint">Save</button>
+  <span id="hint">Saves the cart</span>
+  <script>ignored()</script>
+  <div hidden><button>Hidden</button></div>
+</main>
+"""
+
+
+def describe(dom):
+    return [
+        ("  " * node.depth, node.role, node.name, node.description)
+        for node in walk(dom)
+    ]
+
+
+def format_changes(before, after):
+    return [
+        change.format()
+        for change in diff_accessibility(parse_html(before), parse_html(after))
+    ]
+
+
+def test_walk():
+    assert describe(parse_html(PAGE)) == [
+        ("", "document", None, None),
+        ("  ", "banner", None, None),
+        ("    ", "heading", "Shop", None),
+        ("  ", "navigation", "Main", None),
+        ("    ", "link", "Home", None),
+        ("    ", "link", "Cart", None),
+        ("  ", "main", None, None),
+        ("    ", "paragraph", None, None),
+        ("      ", "text", "Helloworld", None),
+        ("    ", "list", None, None),
+        ("      ", "text", "First", None),
+        ("      ", "text", "Second", None),
+        ("    ", "button", "Save", "Saves the cart"),
+        ("    ", "text", "Saves the cart", None),
+    ]
+    # Blocks split the text around them.
+    assert describe(parse_html("<main>A<div>B</div>C</main>"))[2:] == [
+        ("    ", "text", "A", None),
+        ("    ", "text", "B", None),
+        ("    ", "text", "C", None),
+    ]
+
+    class Empty(LexborHTMLParser):
+        root = None
+
+    assert describe(Empty("")) == []
+
+
+def test_build_tree():
+    root = build_tree(Document(PAGE))
+    assert [child.role for child in root.children] == [
+        "banner",
+        "navigation",
+        "main",
+    ]
+    assert repr(root.children[1]) == "AccessibleNode('navigation', 'Main')"
+    assert root.children[1].children[0].locator == (
+        "html > body:nth-child(2) > nav:nth-child(2) > a:nth-child(1)"
+    )
+    assert build_tree(parse_html(PAGE)).digest == root.digest
+    assert build_tree(parse_html(PAGE + "<p>")).digest != root.digest
+
+
+def test_identical_documents():
+    assert diff_accessibility(parse_html(PAGE), Document(PAGE)) == []
+    # Markup that does not change the tree does not count.
+    assert (
+        format_changes(
+            "<main><div><button>Save</button></div></main>",
+            "<main><span class='x'><button>Save</button></span></main>",
+        )
+        == []
+    )
+
+
+@pytest.mark.parametrize(
+    "before, after, expected",
+    [
+        (
+            "<button>Save</button>",
+            "<button>Save all</button>",
+            ["~ button 'Save' -> button 'Save all'"],
+        ),
+        (
+            "<main><h1>Title</h1></main>",
+            "<main><h1>Title</h1><p>New</p></main>",
+            ["+ paragraph"],
+        ),
+        (
+            "<nav><a href='/a'>A</a><a href='/b'>B</a></nav>",
+            "<nav><a href='/b'>B</a></nav>",
+            ["- link 'A'"],
+        ),
+        (
+            "<main><h1>Title</h1></main>",
+            "<main><h2>Title</h2></main>",
+            [],
+        ),
+        (
+            "<main><h1>Title</h1></main>",
+            "<main><button>Title</button></main>",
+            ["- heading 'Title'", "+ button 'Title'"],
+        ),
+        ("<html hidden>", "<p>Text</p>", ["+ document"]),
+        ("<p>Text</p>", "<html hidden>", ["- document"]),
+        (
+            "<html role='application'>",
+            "<html>",
+            ["- application", "+ document"],
+        ),
+        (
+            "<input type='text' aria-describedby='d'><p id='d'>Old</p>",
+            "<input type='text' aria-describedby='d'><p id='d'>New</p>",
+            [
+                "~ textbox ('Old') -> textbox ('New')",
+                "~ text 'Old' -> text 'New'",
+            ],
+        ),
+    ],
+)
+def test_diff(before, after, expected):
+    assert format_changes(before, after) == expected
+
+
+def test_diff_skips_identical_subtrees():
+    rows = "".join(
+        f"<li><a href='/{i}'>Item {i}</a><button>Buy</button></li>"
+        for i in range(500)
+    )
+    before = parse_html(f"<main><ul>{rows}</ul></main>")
+    after = parse_html(
+        f"<main><ul>{rows.replace('Item 250<', 'Item 250!<')}</ul></main>"
+    )
+    changes = diff_accessibility(before, after)
+    assert [change.format() for change in changes] == [
+        "~ link 'Item 250' -> link 'Item 250!'"
+    ]
+    assert changes[0].after.element.attributes["href"] == "/250"
+
+
+@pytest.mark.parametrize(
+    "old, new",
+    [
+        ("abcdef", "abcdef"),
+        ("abcdef", "abXdef"),
+        ("abcabc", "cbacba"),
+        ("", "abc"),
+        ("aaaa", "aa"),
+        ("xabcy", "yabcx"),
+        # Too large to compare without anchors.
+        ("ab" * 40, "cd" * 40),
+    ],
+)
+def test_align(old, new):
+    matches = align(old, new)
+    assert all(old[i] == new[j] for i, j in matches)
+    assert [j for _, j in matches] == sorted(j for _, j in matches)
+    assert len({j for _, j in matches}) == len(matches)
+
+
+def test_stats():
+    with stats() as query_stats:
+        build_tree(parse_html(PAGE))
+    # Hidden elements, like <head> and <script>, are not visited.
+    assert query_stats.nodes_visited == 15
+
+
+SNAPSHOT = """
+- document:
+  - banner:
+    - heading "Shop" [level=1]
+  - navigation "Main":
+    - link "Home"
+    - link "Cart"
+  - main:
+    - paragraph:
+      - text: Helloworld
+    - list:
+      - text: First
+      - text: Second
+    - button "Save"
+    - text: Saves the cart
+"""
+
+
+def test_aria_snapshot():
+    assert aria_snapshot(parse_html(PAGE)) == SNAPSHOT.lstrip()
+    assert aria_snapshot(parse_html("")) == "- document\n"
+    assert aria_snapshot(parse_html("<html hidden><p>Text</p>")) == ""
+
+
+@pytest.mark.parametrize(
+    "html, expected",
+    [
+        (
+            "<input type='checkbox' checked aria-label='Agree'>",
+            '- checkbox "Agree" [checked]',
+        ),
+        (
+            "<div role='checkbox' aria-checked='mixed' aria-label='All'>",
+            '- checkbox "All" [checked=mixed]',
+        ),
+        (
+            "<fieldset disabled><button>Go</button></fieldset>",
+            '- group [disabled]:\n    - button "Go" [disabled]',
+        ),
+        (
+            "<button aria-expanded='true' aria-pressed='false'>Menu</button>",
+            '- button "Menu" [expanded]',
+        ),
+        ("<select><option selected>A</option></select>", "- combobox"),
+        ("<p>- not a list item</p>", '- paragraph:\n    - text: "- not'),
+        ("<p>key: value</p>", '- paragraph:\n    - text: "key: value"'),
+        ("<h3 aria-level='5'>\"Quoted\"</h3>", '- heading "\\"Quoted\\""'),
+    ],
+)
+def test_aria_snapshot_lines(html, expected):
+    snapshot = aria_snapshot(parse_html(html))
+    assert snapshot.startswith(f"- document:\n  {expected}")
+
+
+def test_aria_snapshot_file(tmp_path):
+    path = tmp_path / "page.snapshot"
+    with open(path, "w") as file:
+        assert aria_snapshot(Document(PAGE), file) is None
+    assert path.read_text() == SNAPSHOT.lstrip()
+
+    with open(path) as file:
+        assert_aria_snapshot(parse_html(PAGE), file)
+
+
+def test_assert_aria_snapshot():
+    assert_aria_snapshot(parse_html(PAGE), SNAPSHOT)
+    assert_aria_snapshot(
+        parse_html("<button>Save</button>"),
+        """
+            - document:
+              - button "Save"
+        """,
+    )
+
+    with pytest.raises(AssertionError) as error:
+        assert_aria_snapshot(
+            parse_html(PAGE), SNAPSHOT.replace('"Cart"', '"Basket"')
+        )
+    assert str(error.value) == (
+        "ARIA snapshot differs at line 6:\n"
+        '  expected:     - link "Basket"\n'
+        '  actual:       - link "Cart"'
+    )
+
+    with pytest.raises(AssertionError, match="line 15"):
+        assert_aria_snapshot(parse_html(PAGE), SNAPSHOT + "- text: More")
+    with pytest.raises(AssertionError, match=r"\(end of snapshot\)"):
+        assert_aria_snapshot(parse_html(PAGE), SNAPSHOT.splitlines()[:5])
+
+
+def test_assert_aria_snapshot_stops_at_first_mismatch():
+    dom = parse_html("<button>Save</button>" * 1000)
+    with stats() as query_stats:
+        with pytest.raises(AssertionError):
+            assert_aria_snapshot(dom, "- document:\n  - button 'Save'")
+    assert query_stats.name_resolutions < 5
+    # The states of the rendered lines were resolved one by one.
+    assert get_index(dom).states is None
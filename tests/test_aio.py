@@ -0,0 +1,215 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from selectolax.lexbor import LexborHTMLParser
+
+import unbrowsed
+from unbrowsed import (
+    Document,
+    NoElementsFoundError,
+    aget_all_by_role,
+    aget_by_label_text,
+    aget_by_role,
+    aget_by_text,
+    aparse_html,
+    aparse_html_bytes,
+    aparse_html_file,
+    aquery_all_by_role,
+    aquery_by_label_text,
+    aquery_by_role,
+    aquery_by_text,
+    configure_executor,
+)
+from unbrowsed.aio import INLINE_SIZE, get_lock, make_async
+
+HTML = """
+<main>
+    <h1>Books</h1>
+    <label>Title <input></label>
+    <button>Add</button>
+    <button>Remove</button>
+</main>
+"""
+LARGE_HTML = HTML + "<p>filler</p>" * (INLINE_SIZE // 10)
+
+
+@pytest.fixture(autouse=True)
+def executor():
+    yield
+    configure_executor()
+
+
+def test_queries():
+    async def main():
+        dom = await aparse_html(HTML)
+        return await asyncio.gather(
+            aquery_by_role(dom, "heading", name="Books"),
+            aget_by_role(dom, "button", name="Add"),
+            aquery_all_by_role(dom, "button"),
+            aget_all_by_role(dom, "button"),
+            aquery_by_text(dom, "Books"),
+            aget_by_text(dom, "Remove"),
+            aquery_by_label_text(dom, "Title"),
+            aget_by_label_text(dom, "Title"),
+        )
+
+    results = asyncio.run(main())
+    assert results[0].element.tag == "h1"
+    assert len(results[2]) == len(results[3]) == 2
+    assert results[7].element.tag == "input"
+
+
+def test_errors_propagate():
+    async def main():
+        dom = await aparse_html(HTML)
+        await aget_by_role(dom, "dialog")
+
+    with pytest.raises(NoElementsFoundError):
+        asyncio.run(main())
+
+
+def test_large_documents_are_parsed_in_the_executor(tmp_path):
+    threads = set()
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, function, *args, **kwargs):
+            def record():
+                threads.add(threading.current_thread().name)
+                return function(*args, **kwargs)
+
+            return super().submit(record)
+
+    configure_executor(RecordingExecutor(thread_name_prefix="custom"))
+    path = tmp_path / "page.html"
+    path.write_text(LARGE_HTML)
+
+    async def main():
+        small = await aparse_html(HTML)
+        assert not threads
+        return await asyncio.gather(
+            aparse_html(LARGE_HTML),
+            aparse_html_bytes(LARGE_HTML.encode()),
+            aparse_html_bytes(HTML.encode()),
+            aparse_html_file(path),
+            aquery_by_role(small, "heading"),
+        )
+
+    documents = asyncio.run(main())
+    assert all(dom.css_first("h1") is not None for dom in documents[:4])
+    assert threads and all(name.startswith("custom") for name in threads)
+
+
+def test_gathered_queries_reuse_the_index():
+    async def main(documents):
+        return await asyncio.gather(
+            *(
+                aget_by_role(dom, "button", name=name)
+                for dom in documents
+                for name in ["Add", "Remove"] * 5
+            )
+        )
+
+    documents = [unbrowsed.parse_html(HTML, tracked=True) for _ in range(3)]
+    with unbrowsed.stats() as s:
+        results = asyncio.run(main(documents))
+
+    assert len(results) == 30
+    # Each document answers its two queries once, then remembers them.
+    assert s.plans["memo"] == 8 * len(documents)
+    assert s.name_resolutions == 2 * 2 * len(documents)
+
+
+def test_bounded_concurrency():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def slow_query(dom):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        release.wait(1)
+        with lock:
+            running -= 1
+
+    configure_executor(ThreadPoolExecutor(max_workers=8), max_concurrency=2)
+
+    async def main():
+        from unbrowsed.aio import get_semaphore, run
+
+        tasks = [
+            asyncio.ensure_future(run(slow_query, None)) for _ in range(6)
+        ]
+        await asyncio.sleep(0.05)
+        waiting = get_semaphore(asyncio.get_running_loop())
+        assert waiting.locked()
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert peak == 2
+
+
+def test_queries_lock_their_document():
+    running = {}
+    peak = {}
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def slow_query(dom):
+        with lock:
+            running[dom] = running.get(dom, 0) + 1
+            peak[dom] = max(peak.get(dom, 0), running[dom])
+            concurrent = sum(running.values())
+        if concurrent == 2:
+            release.set()
+        release.wait(1)
+        with lock:
+            running[dom] -= 1
+
+    configure_executor(ThreadPoolExecutor(max_workers=8))
+    aslow_query = make_async(slow_query)
+    documents = [
+        unbrowsed.parse_html(HTML),
+        unbrowsed.parse_html(HTML),
+        Document(HTML),
+    ]
+
+    async def main():
+        await asyncio.gather(
+            *(aslow_query(dom) for dom in documents for _ in range(3))
+        )
+
+    asyncio.run(main())
+    # Different documents are queried at once, each one by a single job.
+    assert release.is_set()
+    assert set(peak.values()) == {1}
+
+    plain = LexborHTMLParser(HTML)
+    assert get_lock(plain) is get_lock(LexborHTMLParser(HTML))
+    assert get_lock(documents[0]) is not get_lock(plain)
+
+
+def test_lazy_documents():
+    async def main():
+        document = Document(HTML)
+        assert await aquery_by_text(document, "Missing") is None
+        assert document.parsed is None
+        return await aget_by_role(document, "heading")
+
+    assert asyncio.run(main()).element.tag == "h1"
+
+
+def test_configure_executor_validates_concurrency():
+    with pytest.raises(ValueError):
+        configure_executor(max_concurrency=0)
+
+
+def test_async_functions_are_documented():
+    assert aquery_by_role.__name__ == "aquery_by_role"
+    assert "query_by_role" in aquery_by_role.__doc__
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+import unbrowsed
+from unbrowsed import parse_html
+
+from benchmarks.__main__ import compare, main, run_document
+from benchmarks.documents import DocumentSpec, generate_document
+from benchmarks.queries import QUERIES
+
+
+@pytest.mark.parametrize("nodes", [100, 1000, 5000])
+def test_generated_document_size(nodes):
+    dom = parse_html(generate_document(DocumentSpec(nodes=nodes)))
+
+    assert abs(len(dom.css("*")) - nodes) <= max(nodes * 0.05, 40)
+
+
+def test_generated_document_is_reproducible():
+    spec = DocumentSpec(nodes=500, seed=3)
+
+    assert generate_document(spec) == generate_document(spec)
+    assert generate_document(spec) != generate_document(spec._replace(seed=4))
+
+
+@pytest.mark.parametrize("query", sorted(QUERIES))
+def test_benchmark_queries_find_needles(query):
+    spec = DocumentSpec(nodes=500, form_density=0.5, idref_density=0.5)
+    dom = parse_html(generate_document(spec))
+
+    assert QUERIES[query](dom)
+
+
+def test_benchmark_run_writes_json(tmp_path):
+    output = tmp_path / "results.json"
+
+    main(["run", "--nodes", "200", "--repeat", "1", "--output", str(output)])
+
+    results = json.loads(output.read_text())
+    assert results["unbrowsed"]
+    assert {result["query"] for result in results["results"]} == set(QUERIES)
+    assert all(row["cold_ratio"] for row in compare(results, results))
+
+
+def test_warm_runs_are_not_memo_hits():
+    with unbrowsed.stats() as s:
+        run_document(DocumentSpec(nodes=200), sorted(QUERIES), repeat=3)
+    assert s.plans
+    assert "memo" not in s.plans
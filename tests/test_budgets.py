@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from unbrowsed import (
+    QueryBudgetExceededError,
+    get_by_role,
+    get_by_text,
+    parse_html,
+    query_all_by_role,
+    query_by_label_text,
+    query_by_role,
+    query_by_text,
+    set_budget,
+)
+from unbrowsed.budgets import BUDGETS, CHECK_INTERVAL, Budget
+
+HTML = "<main>" + "<p>filler</p>" * 2000 + "<button>Save</button></main>"
+
+
+@pytest.fixture
+def dom():
+    return parse_html(HTML, tracked=True)
+
+
+@pytest.fixture(autouse=True)
+def clear_budget():
+    yield
+    set_budget()
+
+
+def test_max_nodes_raises_with_partial_stats(dom):
+    with pytest.raises(QueryBudgetExceededError) as exc_info:
+        query_by_text(dom, "Save", max_nodes=100)
+
+    stats = exc_info.value.stats
+    assert stats["query"] == "query_by_text"
+    assert stats["max_nodes"] == 100
+    assert stats["nodes_visited"] == 101
+    assert stats["elapsed"] >= 0
+    assert "visited more than 100 nodes" in exc_info.value.message
+    assert BUDGETS.get() == ()
+
+
+def test_budgets_are_per_thread(dom):
+    token = BUDGETS.set((Budget("query_by_text", max_nodes=0),))
+    try:
+        with ThreadPoolExecutor(1) as executor:
+            assert executor.submit(query_by_text, dom, "Save").result()
+        with pytest.raises(QueryBudgetExceededError):
+            query_by_text(parse_html(HTML), "Save")
+    finally:
+        BUDGETS.reset(token)
+
+
+def test_timeout_is_checked_every_interval(dom):
+    with pytest.raises(QueryBudgetExceededError) as exc_info:
+        query_by_text(dom, "Save", timeout=0)
+
+    assert exc_info.value.stats["nodes_visited"] == CHECK_INTERVAL
+    assert "timeout" in exc_info.value.message
+
+
+def test_small_queries_never_read_the_clock():
+    dom = parse_html("<button>Save</button>")
+    assert query_by_role(dom, "button", timeout=0) is not None
+
+
+def test_budget_covers_index_build(dom):
+    with pytest.raises(QueryBudgetExceededError):
+        query_all_by_role(dom, "paragraph", max_nodes=10)
+
+
+def test_generous_budget_returns_results(dom):
+    result = get_by_text(dom, "Save", timeout=60, max_nodes=10_000)
+    assert result.element.tag == "button"
+    assert query_by_label_text(dom, "Name", max_nodes=10) is None
+
+
+def test_set_budget_applies_to_every_query(dom):
+    set_budget(max_nodes=100)
+    with pytest.raises(QueryBudgetExceededError) as exc_info:
+        get_by_role(dom, "paragraph", name="Save")
+
+    # The inner query_by_role shares the budget of get_by_role.
+    assert exc_info.value.stats["query"] == "get_by_role"
+
+    set_budget()
+    assert get_by_role(dom, "button", name="Save") is not None
+
+
+def test_call_limits_override_set_budget(dom):
+    set_budget(max_nodes=10)
+    assert query_by_text(dom, "Save", max_nodes=10_000) is not None
+
+
+def test_budget_covers_every_stage(dom, monkeypatch):
+    monkeypatch.setattr("unbrowsed.index.NodeTable", None)
+    set_budget(max_nodes=10_000)
+    assert len(query_all_by_role(dom, "paragraph")) == 2000
+    # Scanning again costs more than the index, which is built instead.
+    assert len(query_all_by_role(dom, "paragraph", disabled=False)) == 2000
+    assert query_by_role(dom, "button", name="Save")
+
+    dom = parse_html("<label>Name <input></label>")
+    assert query_by_label_text(dom, "Name") is not None
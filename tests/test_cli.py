@@ -0,0 +1,308 @@
+import importlib
+import json
+import os
+import runpy
+import subprocess
+import sys
+
+import pytest
+
+import unbrowsed.cli
+from unbrowsed import parse_html
+from unbrowsed.cli import iter_files, main
+from unbrowsed.utils import get_css_path
+
+
+@pytest.fixture
+def pages(tmp_path):
+    (tmp_path / "home.html").write_text(
+        "<main><h1>Welcome</h1><button>Save</button></main>"
+    )
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "list.htm").write_text(
+        "<button>Save</button><button>Save</button>"
+        "<label>Email <input type='text'></label><img src='logo.png'>"
+    )
+    (tmp_path / "notes.txt").write_text("<button>Save</button>")
+    return tmp_path
+
+
+def run(capsys, *argv):
+    code = main([*map(str, argv), "--workers", "1"])
+    lines = capsys.readouterr().out.splitlines()
+    return code, [json.loads(line) for line in lines]
+
+
+def test_iter_files(pages):
+    assert list(iter_files([str(pages)])) == [
+        str(pages / "home.html"),
+        str(pages / "nested" / "list.htm"),
+    ]
+    assert list(iter_files([f"{pages}/**/*.htm"])) == [
+        str(pages / "nested" / "list.htm")
+    ]
+    assert list(iter_files([str(pages / "notes.txt")])) == [
+        str(pages / "notes.txt")
+    ]
+
+
+def test_queries(pages, capsys):
+    code, records = run(
+        capsys, pages, "--role", "button", "--name", "Save", "--text", "Hi"
+    )
+    assert code == 0
+    assert [
+        (record["file"], record["query"], record["matches"])
+        for record in records
+    ] == [
+        (
+            str(pages / "home.html"),
+            {"type": "role", "role": "button", "name": "Save"},
+            1,
+        ),
+        (str(pages / "home.html"), {"type": "text", "text": "Hi"}, 0),
+        (
+            str(pages / "nested" / "list.htm"),
+            {"type": "role", "role": "button", "name": "Save"},
+            2,
+        ),
+        (
+            str(pages / "nested" / "list.htm"),
+            {"type": "text", "text": "Hi"},
+            0,
+        ),
+    ]
+    assert records[0]["locator"] == (
+        "html > body:nth-child(2) > main:nth-child(1) > button:nth-child(2)"
+    )
+    assert records[1]["locator"] is None
+    assert all(record["elapsed_ms"] >= 0 for record in records)
+
+
+def test_inexact_label(pages, capsys):
+    code, records = run(capsys, pages / "nested", "--label", "email")
+    assert (code, records[0]["matches"]) == (0, 0)
+
+    code, records = run(
+        capsys, pages / "nested", "--label", "email", "--inexact"
+    )
+    assert records[0]["query"] == {
+        "type": "label",
+        "text": "email",
+        "exact": False,
+    }
+    assert records[0]["matches"] == 1
+
+
+def test_errors(pages, capsys):
+    code, records = run(
+        capsys,
+        pages / "missing.html",
+        pages,
+        "--role",
+        "main",
+        "--max-nodes",
+        1,
+    )
+    assert code == 1
+    assert records[0]["file"] == str(pages / "missing.html")
+    assert "No such file" in records[0]["error"]
+    assert "visited more than 1 nodes" in records[1]["error"]
+
+
+def test_lint(pages, capsys):
+    code, records = run(capsys, pages, "--lint", "--text", "Welcome")
+    assert code == 0
+    assert [(record["file"], "lint" in record) for record in records] == [
+        (str(pages / "home.html"), False),
+        (str(pages / "home.html"), True),
+        (str(pages / "nested" / "list.htm"), False),
+        (str(pages / "nested" / "list.htm"), True),
+    ]
+    assert records[1]["lint"] == []
+    assert [finding["rule"] for finding in records[3]["lint"]] == ["image-alt"]
+
+
+@pytest.mark.parametrize(
+    "argv", [["--name", "Save"], ["--text", "Hi", "--name", "Save"], []]
+)
+def test_invalid_arguments(pages, argv):
+    with pytest.raises(SystemExit) as error:
+        main([str(pages), *argv])
+    assert error.value.code == 2
+
+
+# With no files per worker, results are collected while later files are
+# still submitted.
+@pytest.mark.parametrize("files_per_worker", [0, 4])
+def test_workers(pages, tmp_path, monkeypatch, files_per_worker):
+    monkeypatch.setattr("unbrowsed.cli.FILES_PER_WORKER", files_per_worker)
+    output = tmp_path / "results.jsonl"
+    code = main(
+        [
+            str(pages),
+            "--text",
+            "Welcome",
+            "--workers",
+            "2",
+            "--output",
+            str(output),
+        ]
+    )
+    assert code == 0
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(
+        (record["file"], record["matches"]) for record in records
+    ) == [(str(pages / "home.html"), 1), (str(pages / "nested/list.htm"), 0)]
+
+
+def test_get_css_path():
+    dom = parse_html("<p>one</p><!-- note --><form><input><button>")
+    button = dom.css_first("button")
+    path = get_css_path(button)
+    assert path == (
+        "html > body:nth-child(2) > form:nth-child(2) > button:nth-child(2)"
+    )
+    assert dom.css_first(path) == button
+
+
+def test_manifest(pages, capsys):
+    manifest = pages / "manifest.json"
+    argv = [pages, "--text", "Welcome", "--lint", "--manifest", manifest]
+    code, first = run(capsys, *argv)
+    assert code == 0
+    assert not any("cached" in record for record in first)
+
+    code, second = run(capsys, *argv)
+    assert all(record.pop("cached") for record in second)
+    assert second == first
+
+    (pages / "home.html").write_text("<p>Welcome back</p>")
+    os.utime(pages / "nested" / "list.htm")
+    code, third = run(capsys, *argv)
+    assert [
+        (record["file"], record.get("matches"), "cached" in record)
+        for record in third
+    ] == [
+        (str(pages / "home.html"), 0, False),
+        (str(pages / "home.html"), None, False),
+        (str(pages / "nested" / "list.htm"), 0, True),
+        (str(pages / "nested" / "list.htm"), None, True),
+    ]
+
+    # Other queries do not reuse the results.
+    code, records = run(capsys, pages, "--text", "Hi", "--manifest", manifest)
+    assert not any("cached" in record for record in records)
+
+
+def test_undecodable_file(pages, capsys):
+    (pages / "hex.html").write_bytes(b'<meta charset="hex"><p>Welcome</p>')
+    code, records = run(capsys, pages / "hex.html", "--text", "Welcome")
+    assert code == 1
+    assert "not a text encoding" in records[0]["error"]
+
+
+def test_unexpected_errors(pages, capsys, monkeypatch):
+    def get_css_path(element):
+        if element.text() == "Broken":
+            raise ValueError("broken element")
+        return original_get_css_path(element)
+
+    def lint(dom, memo=None):
+        if "Broken" in dom.html:
+            raise ValueError("broken document")
+        return []
+
+    original_get_css_path = unbrowsed.cli.get_css_path
+    monkeypatch.setattr("unbrowsed.cli.get_css_path", get_css_path)
+    monkeypatch.setattr("unbrowsed.cli.lint", lint)
+    (pages / "broken.html").write_text("<button>Broken</button>")
+    manifest = pages / "manifest.json"
+    argv = [pages, "--role", "button", "--lint", "--manifest", manifest]
+
+    code, records = run(capsys, *argv)
+    assert code == 1
+    assert [
+        (os.path.basename(record["file"]), record.get("error"))
+        for record in records
+    ] == [
+        ("broken.html", "ValueError: broken document"),
+        ("home.html", None),
+        ("home.html", None),
+        ("list.htm", None),
+        ("list.htm", None),
+    ]
+    assert len(json.loads(manifest.read_text())["files"]) == 2
+
+    code, records = run(capsys, pages / "broken.html", "--role", "button")
+    assert records[0]["error"] == "ValueError: broken element"
+
+
+def test_manifest_skips_errors(pages, capsys):
+    manifest = pages / "manifest.json"
+    argv = [pages / "home.html", "--role", "main", "--max-nodes", 1]
+    run(capsys, *argv, "--manifest", manifest)
+    code, records = run(capsys, *argv, "--manifest", manifest)
+    assert code == 1
+    assert "cached" not in records[0]
+
+    manifest.write_text("{")
+    code, records = run(
+        capsys, pages / "home.html", "--lint", "--manifest", manifest
+    )
+    assert code == 0
+
+
+def test_broken_pipe(pages):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "unbrowsed", "--role", "button", str(pages)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    # Like `| head -0`: nothing is read.
+    process.stdout.close()
+    stderr = process.stderr.read()
+    process.stderr.close()
+    assert process.wait() == 1
+    assert stderr == b""
+
+
+def test_broken_pipe_redirects_stdout(pages, tmp_path, monkeypatch):
+    class ClosedPipe:
+        def __init__(self, file):
+            self.file = file
+
+        def write(self, text):
+            raise BrokenPipeError
+
+        def fileno(self):
+            return self.file.fileno()
+
+    with open(tmp_path / "stdout", "w") as file:
+        monkeypatch.setattr(sys, "stdout", ClosedPipe(file))
+        # The parser is made by main, so it writes to the patched stdout.
+        assert main(["--role", "button", str(pages), "--workers", "1"]) == 1
+
+
+def test_broken_pipe_on_output_file(pages, tmp_path, monkeypatch):
+    def write_records(output, records):
+        raise BrokenPipeError
+
+    monkeypatch.setattr("unbrowsed.cli.write_records", write_records)
+    output = tmp_path / "results.jsonl"
+    argv = ["--role", "button", str(pages), "--output", str(output)]
+    assert main([*argv, "--workers", "1"]) == 1
+
+
+def test_module_entry_point(pages, monkeypatch, capsys):
+    monkeypatch.setattr(
+        sys, "argv", ["unbrowsed", "--role", "main", str(pages / "home.html")]
+    )
+    with pytest.raises(SystemExit) as exit_info:
+        runpy.run_module("unbrowsed", run_name="__main__")
+    assert exit_info.value.code == 0
+    assert json.loads(capsys.readouterr().out)["matches"] == 1
+
+    # Importing the module does not run the command.
+    importlib.import_module("unbrowsed.__main__")
+    assert capsys.readouterr().out == ""
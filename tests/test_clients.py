@@ -0,0 +1,245 @@
+import asyncio
+import sys
+
+import pytest
+
+from unbrowsed import get_by_role, get_by_text, query_by_text
+from unbrowsed.clients import (
+    ASGIClient,
+    WSGIClient,
+    get_charset,
+    get_document,
+)
+
+PAGE = [
+    b"<!doctype html><main>",
+    b"<h1>Books</h1>",
+    b"<button>Add book</button>",
+    b"</main>",
+]
+
+
+def wsgi_app(environ, start_response):
+    if environ["PATH_INFO"] == "/latin":
+        start_response(
+            "200 OK", [("Content-Type", "text/html; charset=iso-8859-1")]
+        )
+        return ["<p>Café</p>".encode("latin-1")]
+    if environ["PATH_INFO"] == "/echo":
+        body = environ["wsgi.input"].read()
+        start_response("201 Created", [("Content-Type", "text/html")])
+        return [
+            b"<p>",
+            environ["QUERY_STRING"].encode(),
+            environ.get("HTTP_X_TOKEN", "").encode(),
+            body,
+            b"</p>",
+        ]
+    start_response("200 OK", [("Content-Type", "text/html")])
+    return iter(PAGE)
+
+
+async def asgi_app(scope, receive, send):
+    message = await receive()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200 if scope["path"] == "/" else 404,
+            "headers": [(b"content-type", b"text/html; charset=utf-8")],
+        }
+    )
+    if scope["path"] != "/":
+        await send(
+            {
+                "type": "http.response.body",
+                "body": b"<p>Not found: "
+                + scope["query_string"]
+                + message["body"]
+                + b"</p>",
+            }
+        )
+        return
+    for chunk in PAGE:
+        await send(
+            {"type": "http.response.body", "body": chunk, "more_body": True}
+        )
+    await send({"type": "http.response.body", "body": b""})
+
+
+@pytest.mark.parametrize("client", [WSGIClient, ASGIClient])
+def test_response_document_is_parsed_once(client):
+    response = client(wsgi_app if client is WSGIClient else asgi_app).get("/")
+    assert response.status_code == 200
+    assert response.content == b"".join(PAGE)
+
+    document = response.document
+    assert query_by_text(document, "Missing") is None
+    assert document.parsed is None
+
+    assert get_by_role(document, "heading", name="Books")
+    parsed = document.parsed
+    assert get_by_role(response.document, "button", name="Add book")
+    assert response.document.parse() is parsed
+
+
+def test_wsgi_request_environ():
+    response = WSGIClient(wsgi_app).post(
+        "/echo?page=2",
+        body=b"&body",
+        headers=[("X-Token", "&token"), ("Content-Type", "text/plain")],
+    )
+    assert response.status_code == 201
+    assert response.get_header("content-type") == "text/html"
+    assert response.get_header("X-Missing") is None
+    assert get_by_text(response.document, "page=2&token&body")
+
+
+def test_wsgi_response_charset():
+    response = WSGIClient(wsgi_app).get("/latin")
+    assert response.charset == "iso-8859-1"
+    assert get_by_text(response.document, "Café")
+
+
+def test_wsgi_rejects_text_chunks():
+    def app(environ, start_response):
+        start_response("200 OK", [])
+        return ["<p>text</p>"]
+
+    with pytest.raises(TypeError):
+        WSGIClient(app).get("/")
+
+
+def test_wsgi_closes_iterables():
+    closed = []
+
+    def app(environ, start_response):
+        start_response("200 OK", [])
+        try:
+            yield b""
+            yield b"<p>Generated</p>"
+        finally:
+            closed.append(True)
+
+    response = WSGIClient(app).get("/")
+    assert response.content == b"<p>Generated</p>"
+    assert closed == [True]
+
+
+def test_wsgi_requires_start_response():
+    with pytest.raises(RuntimeError):
+        WSGIClient(lambda environ, start_response: []).get("/")
+
+
+def test_wsgi_error_replaces_the_response():
+    def app(environ, start_response):
+        write = start_response("200 OK", [("Content-Type", "text/plain")])
+        write(b"partial")
+        try:
+            raise ValueError("broken")
+        except ValueError:
+            start_response(
+                "500 Internal Server Error",
+                [("Content-Type", "text/html")],
+                sys.exc_info(),
+            )
+        return [b"<p>Error</p>"]
+
+    response = WSGIClient(app).get("/")
+    assert response.status_code == 500
+    assert response.headers == [("Content-Type", "text/html")]
+    assert response.content == b"<p>Error</p>"
+
+
+def test_wsgi_start_response_once():
+    def app(environ, start_response):
+        start_response("200 OK", [])
+        return start_response("404 Not Found", [])
+
+    with pytest.raises(RuntimeError):
+        WSGIClient(app).get("/")
+
+
+def test_asgi_request_scope():
+    response = ASGIClient(asgi_app).post("/missing?q=1", body=b"&body")
+    assert response.status_code == 404
+    assert get_by_text(response.document, "Not found: q=1&body")
+
+
+def test_asgi_receive_after_the_request():
+    messages = []
+
+    async def app(scope, receive, send):
+        messages.append(await receive())
+        await send({"type": "http.response.start", "status": 204})
+        await send({"type": "http.response.trailers"})
+        await send({"type": "http.response.body"})
+        messages.append(await receive())
+
+    response = ASGIClient(app).get("/")
+    assert response.status_code == 204
+    assert response.content == b""
+    assert [message["type"] for message in messages] == [
+        "http.request",
+        "http.disconnect",
+    ]
+
+
+def test_asgi_requires_a_response():
+    async def app(scope, receive, send):
+        await receive()
+
+    with pytest.raises(RuntimeError):
+        ASGIClient(app).get("/")
+
+
+def test_asgi_from_async_code():
+    async def main():
+        client = ASGIClient(asgi_app)
+        return await asyncio.gather(
+            client.arequest("GET", "/"), client.arequest("GET", "/")
+        )
+
+    first, second = asyncio.run(main())
+    assert first.content == second.content
+
+
+def test_get_document_attaches_to_responses():
+    class DjangoResponse:
+        content = "<p>Añadir</p>".encode("cp1252")
+        charset = "cp1252"
+
+    response = DjangoResponse()
+    document = get_document(response)
+    assert get_document(response) is document
+    assert get_by_text(document, "Añadir")
+
+
+@pytest.mark.parametrize("charset", ["foo", "hex", "idna"])
+def test_get_document_ignores_unknown_charsets(charset):
+    class DjangoResponse:
+        content = '<meta charset="cp1252"><p>Añadir</p>'.encode("cp1252")
+
+    response = DjangoResponse()
+    response.charset = charset
+    assert get_by_text(get_document(response), "Añadir")
+
+
+@pytest.mark.parametrize(
+    "content_type, expected",
+    [
+        (None, None),
+        ("text/html", None),
+        ("text/html; charset=UTF-8", "UTF-8"),
+        ("multipart/form-data; boundary=x; charset=ascii", "ascii"),
+        ('text/html; Charset="koi8-r"', "koi8-r"),
+    ],
+)
+def test_get_charset(content_type, expected):
+    assert get_charset(content_type) == expected
+
+
+def test_get_document_without_attributes():
+    from collections import namedtuple
+
+    response = namedtuple("Response", "content")(b"<p>Hello</p>")
+    assert get_by_text(get_document(response), "Hello")
@@ -0,0 +1,105 @@
+import pytest
+
+from unbrowsed import (
+    Document,
+    NoElementsFoundError,
+    explain,
+    get_by_role,
+    get_by_text,
+    query_all_by_role,
+    query_by_label_text,
+    query_by_text,
+)
+from unbrowsed.document import could_contain_text
+from unbrowsed.queries import ByText
+
+HTML = """
+<main>
+    <h1>Welcome</h1>
+    <p>Tom &amp; Jerry</p>
+    <p>Caf&eacute; au lait</p>
+    <p><b>W</b>elcome back</p>
+    <label>Email <input type="email"></label>
+</main>
+"""
+
+
+@pytest.mark.parametrize("source", [HTML, HTML.encode()])
+def test_missing_text_skips_parsing(source):
+    document = Document(source)
+    assert query_by_text(document, "Goodbye") is None
+    assert query_by_label_text(document, "Password") is None
+    with pytest.raises(NoElementsFoundError):
+        get_by_text(document, "Goodbye")
+    assert document.parsed is None
+
+
+@pytest.mark.parametrize("source", [HTML, HTML.encode()])
+def test_present_text_is_queried(source):
+    document = Document(source)
+    assert get_by_text(document, "Welcome").element.tag == "h1"
+    assert document.parsed is not None
+    assert get_by_text(document, "Tom & Jerry").element.tag == "p"
+    assert get_by_text(document, "Café au lait").element.tag == "p"
+    assert get_by_text(document, "Welcome back").element.tag == "p"
+    assert get_by_text(document, "welcome BACK", exact=False)
+    assert query_by_label_text(document, "Email")
+
+
+def test_other_queries_parse_once():
+    document = Document(HTML)
+    assert get_by_role(document, "heading", name="Welcome")
+    parsed = document.parsed
+    assert get_by_role(document, "main")
+    assert len(query_all_by_role(document, "paragraph")) == 3
+    assert document.parse() is parsed
+    assert explain(document, ByText("Welcome")).matches == 1
+
+
+@pytest.mark.parametrize(
+    "source, text, exact",
+    [
+        ("<p>Welcome</p>", "Welcome", True),
+        ("<p>WELCOME</p>", "welcome", False),
+        ("<p><b>W</b>elcome</p>", "Welcome", True),
+        ("<p>Wel  <i>come</i></p>", "Welcome", True),
+        ("<p>&#87;elcome</p>", "Welcome", True),
+        ("<p>&#x77;ELCOME</p>", "welcome", False),
+        ("<p>We&shy;lcome</p>", "We\xadlcome", True),
+        ("<p>Tom &amp; Jerry</p>", "Tom & Jerry", True),
+        ("<p>a\r\nb</p>", "a\nb", True),
+        ("<p>K</p>", "k", False),
+        ("<p>&#8490;</p>", "k", False),
+        ("<p>CAFÉ</p>", "café", False),
+        ("<p>&fjlig;ord</p>", "jord", True),
+        ("<p>&#128;</p>", "€", True),
+        ("<p>anything</p>", "", True),
+        ("<svg><text><![CDATA[Wel]]>come</text></svg>", "Welcome", True),
+    ],
+)
+def test_could_contain_text(source, text, exact):
+    assert could_contain_text(source, text, exact=exact)
+    assert could_contain_text(source.encode(), text, exact=exact)
+
+
+@pytest.mark.parametrize(
+    "source, text, exact",
+    [
+        ("<p>Welcome</p>", "Goodbye", True),
+        ("<p>Welcome</p>", "welcome", True),
+        ("<p>Well come</p>", "Welcome", True),
+        ("<p>WELCOME</p>", "goodbye", False),
+    ],
+)
+def test_could_not_contain_text(source, text, exact):
+    assert not could_contain_text(source, text, exact=exact)
+    assert not could_contain_text(source.encode(), text, exact=exact)
+
+
+def test_other_encodings_are_always_parsed():
+    source = '<meta charset="windows-1251"><p>Привет</p>'.encode("cp1251")
+    document = Document(source)
+    assert not document.searchable
+    assert query_by_text(document, "Goodbye") is None
+    assert document.parsed is not None
+    assert get_by_text(document, "Привет")
@@ -3,6 +3,7 @@ import pickle
 from unbrowsed.exceptions import (
     NoElementsFoundError,
     MultipleElementsFoundError,
+    QueryBudgetExceededError,
 )
 
 
@@ -22,3 +23,13 @@ def test_multiple_elements_found_serialization():
     )
     serialized = pickle.dumps(e)
     pickle.loads(serialized)
+
+
+def test_query_budget_exceeded_serialization():
+    e = QueryBudgetExceededError(
+        "query_by_text visited more than 10 nodes (11 nodes in 0.001s).",
+        {"query": "query_by_text", "nodes_visited": 11},
+    )
+    restored = pickle.loads(pickle.dumps(e))
+    assert restored.message == e.message
+    assert restored.stats == e.stats
@@ -0,0 +1,181 @@
+import pytest
+
+from selectolax.lexbor import LexborHTMLParser
+
+from unbrowsed import (
+    ByLabelText,
+    ByRole,
+    ByText,
+    MultipleElementsFoundError,
+    explain,
+    parse_html,
+    query_by_role,
+    query_by_text,
+)
+from unbrowsed.index import get_index
+from unbrowsed.queries import get_role_selector
+
+HTML = """
+<nav>
+    <a href="/" aria-current="true">Home</a>
+    <a href="/about">About</a>
+</nav>
+<main>
+    <button aria-describedby="hint">Save</button>
+    <button>Cancel</button>
+    <button disabled>Save</button>
+    <p id="hint">Stores the draft</p>
+    <label>Email <input type="text"></label>
+</main>
+"""
+
+
+def test_explain_role_with_name():
+    dom = parse_html(HTML, tracked=True)
+    plan = explain(dom, ByRole("button", name="Save"))
+
+    # Scanning the buttons costs less than indexing the small document.
+    assert plan.strategy == "scan"
+    assert plan.selector == get_role_selector("button")
+    assert plan.nodes_scanned == len(dom.css(plan.selector))
+    assert [stage.name for stage in plan.stages] == ["role", "name"]
+    role, name = plan.stages
+    assert role.candidates - role.rejected == 3
+    assert name.candidates == 3
+    assert name.rejected == 1
+    assert name.counters["name_resolutions"] == 3
+    assert plan.matches == 2
+    assert plan.outcome == "multiple"
+    assert plan.comparisons == 2
+
+    # Explaining a query does not build the index.
+    index = get_index(dom)
+    assert index.roles is None
+    assert index.names == {}
+
+    with pytest.raises(MultipleElementsFoundError):
+        query_by_role(dom, "button", name="Save")
+
+    get_index(dom).get_named_elements("button", "Save")
+    plan = explain(dom, ByRole("button", name="Save"))
+    assert plan.strategy == "index"
+    assert plan.selector == ""
+    assert plan.nodes_scanned == 0
+    assert plan.stages[0].candidates == 3
+    assert plan.matches == 2
+
+
+def test_explain_role_index_build():
+    dom = parse_html(HTML, tracked=True)
+    index = get_index(dom)
+    index.costs["role"] = 10**6
+    plan = explain(dom, ByRole("button", name="Save", disabled=False))
+
+    assert plan.strategy == "index build"
+    assert plan.selector == "*"
+    assert plan.nodes_scanned == len(dom.css("*"))
+    assert plan.matches == 1
+    assert index.roles is None
+    assert index.names == {}
+    assert index.states is None
+
+
+def test_explain_role_stages():
+    dom = parse_html(HTML, tracked=True)
+    plan = explain(
+        dom,
+        ByRole("button", description="Stores the draft", disabled=False),
+    )
+
+    assert [stage.name for stage in plan.stages] == [
+        "role",
+        "state",
+        "description",
+    ]
+    assert plan.stages[1].rejected == 1
+    assert plan.stages[2].rejected == 1
+    assert plan.outcome == "single"
+
+    plan = explain(dom, ByRole("link", current=True))
+    assert plan.stages[-1].name == "current"
+    assert plan.stages[-1].rejected == 1
+
+
+def test_explain_role_on_plain_parser():
+    plan = explain(LexborHTMLParser(HTML), ByRole("navigation"))
+
+    assert plan.strategy == "scan"
+    assert plan.outcome == "single"
+
+
+def test_explain_text():
+    dom = parse_html(HTML, tracked=True)
+
+    plan = explain(dom, ByText("Cancel"))
+    assert plan.strategy == "scan"
+    assert plan.stages[0].name == "text"
+    assert plan.stages[0].counters["text_extractions"] == plan.nodes_scanned
+    assert plan.outcome == "single"
+
+    plan = explain(dom, ByText("cancel", exact=False))
+    assert plan.outcome == "nested"
+    assert plan.comparisons > 0
+
+    plan = explain(dom, ByText("Missing"))
+    assert plan.strategy == "skip"
+    assert (plan.selector, plan.nodes_scanned) == ("", 0)
+    assert plan.stages[0].candidates == 0
+    assert plan.outcome == "none"
+
+    # A scan, then the index build.
+    query_by_text(dom, "Cancel")
+    query_by_text(dom, "Cancel", exact=False)
+    plan = explain(dom, ByText("Cancel"))
+    assert plan.strategy == "index"
+    assert (plan.selector, plan.nodes_scanned) == ("", 0)
+    assert plan.stages[0].candidates == len(get_index(dom).text_elements)
+    assert plan.stages[0].counters["text_extractions"] == 0
+    assert plan.outcome == "single"
+
+
+def test_explain_label_text():
+    plan = explain(parse_html(HTML), ByLabelText("Email"))
+
+    assert plan.selector == "label"
+    assert [stage.name for stage in plan.stages] == ["label", "control"]
+    assert plan.outcome == "single"
+
+    dom = parse_html(
+        '<label for="a">Note</label><textarea id="a"></textarea>'
+        '<label for="b">Note</label><input id="b">'
+        '<label for="missing">Note</label>'
+    )
+    plan = explain(dom, ByLabelText("Note"))
+    assert plan.stages[-1].rejected == 1
+    assert plan.outcome == "multiple"
+    plan = explain(dom, ByLabelText("Other"))
+    assert plan.strategy == "skip"
+    assert (plan.selector, plan.nodes_scanned) == ("", 0)
+    assert plan.outcome == "none"
+
+
+def test_query_objects():
+    dom = parse_html(HTML, tracked=True)
+    assert ByRole("button", name="Cancel").query(dom).name == "Cancel"
+    assert len(ByRole("button", disabled=False).query_all(dom)) == 2
+    with pytest.raises(ValueError):
+        ByRole("button", name="Save").query_all(dom)
+
+
+def test_explain_format():
+    plan = explain(parse_html(HTML), ByRole("button", name="Cancel"))
+    text = plan.format()
+
+    assert "ByRole(role='button'" in text
+    assert "name" in text
+    assert "outcome: single" in text
+
+
+def test_explain_rejects_unknown_queries():
+    with pytest.raises(TypeError):
+        explain(parse_html(HTML), "button")
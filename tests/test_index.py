@@ -0,0 +1,141 @@
+import pytest
+
+import unbrowsed.index
+from unbrowsed import (
+    MultipleElementsFoundError,
+    get_by_role,
+    parse_html,
+    query_by_role,
+)
+from unbrowsed.index import get_index
+from unbrowsed.resolvers import RoleResolver
+from unbrowsed.utils import get_selector
+
+HTML = """
+<html>
+<body>
+    <header>Site</header>
+    <nav><a href="/">Home</a><a>Anchor</a></nav>
+    <main>
+        <h1>Title</h1>
+        <button>Save</button>
+        <button role="button">Cancel</button>
+        <div role="button">Custom</div>
+        <a href="/x" role="button">Link button</a>
+        <img src="a.png" alt="">
+        <img src="b.png" alt="Logo">
+        <select multiple></select>
+        <select size="3"></select>
+        <select></select>
+        <table role="grid"><tr><td>Cell</td></tr></table>
+        <article><footer>Article footer</footer></article>
+    </main>
+    <footer>Page footer</footer>
+</body>
+</html>
+"""
+
+ROLES = [
+    "banner",
+    "button",
+    "cell",
+    "combobox",
+    "contentinfo",
+    "document",
+    "generic",
+    "gridcell",
+    "heading",
+    "img",
+    "link",
+    "listbox",
+    "main",
+    "navigation",
+    "presentation",
+]
+
+
+@pytest.fixture(autouse=True, params=["python", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(unbrowsed.index, "NodeTable", None)
+    return request.param
+
+
+@pytest.mark.parametrize("role", ROLES)
+def test_role_table_is_consistent_with_role_resolver(role):
+    dom = parse_html(HTML)
+    index = get_index(dom)
+
+    expected = [
+        element
+        for element in dom.css("*")
+        if RoleResolver(element=element, target_role=role).matches()
+    ]
+
+    assert index.get_role_elements(role) == expected
+
+
+def test_role_resolver_matches_names_and_descriptions():
+    dom = parse_html(
+        '<p id="hint">Saves</p><button aria-describedby="hint">Save</button>'
+    )
+    button = dom.css_first("button")
+    assert RoleResolver(button, "button", "Save", "Saves").matches()
+    assert not RoleResolver(button, "button", name="Cancel").matches()
+    assert not RoleResolver(button, "button", description="Other").matches()
+    assert dom.css(get_selector("document"))[0].tag == "html"
+
+
+def test_index_is_reused_between_queries():
+    dom = parse_html(HTML, tracked=True)
+    get_index(dom).get_named_elements("button", "Save")
+
+    with unbrowsed.stats() as s:
+        assert get_by_role(dom, "button", name="Cancel")
+        assert get_by_role(dom, "button", name="Link button")
+        assert query_by_role(dom, "button", name="Missing") is None
+    assert s.name_resolutions == 0
+
+
+def test_index_is_rebuilt_when_node_is_removed():
+    dom = parse_html(HTML, tracked=True)
+    assert get_by_role(dom, "button", name="Save")
+
+    dom.css_first("button").decompose()
+    dom.invalidate()
+
+    assert query_by_role(dom, "button", name="Save") is None
+
+
+def test_raw_edits_of_untracked_documents_are_seen():
+    dom = parse_html(HTML)
+    assert get_by_role(dom, "button", name="Save")
+
+    dom.css_first("button").decompose()
+
+    assert query_by_role(dom, "button", name="Save") is None
+    assert get_index(dom) is not get_index(dom)
+
+
+def test_index_is_rebuilt_when_node_is_inserted():
+    dom = parse_html(HTML, tracked=True)
+    assert get_by_role(dom, "button", name="Save")
+
+    other = parse_html("<button>Save</button>")
+    dom.css_first("main").insert_child(other.css_first("button"))
+    dom.invalidate()
+
+    with pytest.raises(MultipleElementsFoundError):
+        query_by_role(dom, "button", name="Save")
+
+
+def test_index_is_rebuilt_when_attribute_changes():
+    dom = parse_html(HTML, tracked=True)
+    assert query_by_role(dom, "button", name="Renamed") is None
+
+    dom.css_first("button").attrs["aria-label"] = "Renamed"
+    dom.invalidate()
+
+    assert get_by_role(dom, "button", name="Renamed")
@@ -0,0 +1,123 @@
+from typing import Optional
+
+import pytest
+
+from unbrowsed import Document, Finding, Rule, lint, parse_html, stats
+from unbrowsed.lint import LintNode
+
+
+def get_rules(findings):
+    return [(finding.rule, finding.locator) for finding in findings]
+
+
+@pytest.mark.parametrize(
+    "html, expected",
+    [
+        ("<a href='/'></a>", ["link-name"]),
+        ("<a href='/'>Home</a><a>anchor</a>", []),
+        ("<a href='/'><img alt='Home'></a>", []),
+        ("<button></button>", ["button-name"]),
+        ("<button aria-label='Close'></button>", []),
+        ("<img src='a.png'>", ["image-alt"]),
+        ("<img src='a.png' alt=''><img src='b.png' title='B'>", []),
+        ("<input type='text'>", ["control-label"]),
+        ("<label>Email <input type='text'></label>", []),
+        ("<label for='q'>Search</label><input id='q' type='search'>", []),
+        ("<select aria-label='Size'></select>", []),
+        ("<select size='abc' aria-label='Size'></select>", []),
+        ("<nav></nav><nav></nav>", ["landmark-unique"]),
+        (
+            "<nav aria-label='Main'></nav><nav aria-label='Footer'></nav>",
+            [],
+        ),
+        ("<main></main><nav></nav>", []),
+        ("<form></form><form></form>", []),
+        ("<div role='region'></div><section role='region'></section>", []),
+        (
+            "<form aria-label='Search'></form><form aria-label='Search'>",
+            ["landmark-unique"],
+        ),
+        (
+            "<section role='region' aria-label='News'></section>"
+            "<div role='region' aria-label='News'></div>",
+            ["landmark-unique"],
+        ),
+    ],
+)
+def test_default_rules(html, expected):
+    findings = lint(parse_html(html))
+    assert [finding.rule for finding in findings] == expected
+
+
+def test_findings():
+    dom = parse_html("<main><p>Hi</p><button></button></main><nav></nav>")
+    assert lint(dom) == [
+        Finding(
+            rule="button-name",
+            message="Button has no accessible name.",
+            locator="html > body:nth-child(2) > main:nth-child(1) "
+            "> button:nth-child(2)",
+            role="button",
+            name="",
+        )
+    ]
+    assert dom.css_first(lint(dom)[0].locator).tag == "button"
+
+
+def test_document():
+    assert get_rules(lint(Document(b"<button></button>"))) == [
+        ("button-name", "html > body:nth-child(2) > button:nth-child(1)")
+    ]
+
+
+class Tabindex(Rule):
+    id = "tabindex"
+    attributes = frozenset({"tabindex"})
+
+    def check(self, node: LintNode) -> Optional[str]:
+        if node.element.attributes["tabindex"] not in ("0", "-1"):
+            return "Avoid a positive tabindex."
+        return None
+
+
+class Everything(Rule):
+    id = "everything"
+    collect = True
+
+    def finish(self, nodes):
+        yield nodes[-1], f"{len(nodes)} elements."
+
+
+def test_custom_rules():
+    dom = parse_html(
+        "<div tabindex='3'></div><span tabindex='0'></span><a href='/'></a>"
+    )
+    assert get_rules(lint(dom, [Tabindex(), Everything()])) == [
+        ("tabindex", "html > body:nth-child(2) > div:nth-child(1)"),
+        ("everything", "html > body:nth-child(2) > a:nth-child(3)"),
+    ]
+    assert lint(dom, [Everything()])[0].message == "6 elements."
+
+
+class Collecting(Rule):
+    id = "collecting"
+    collect = True
+
+
+def test_rules_report_nothing_by_default():
+    dom = parse_html('<nav role="button" aria-label="Save"></nav><nav></nav>')
+    # The first element is a button, so the navigation landmark is unique.
+    assert lint(dom) == []
+    assert lint(dom, [Collecting()]) == []
+
+
+def test_single_pass():
+    dom = parse_html(
+        "<a href='/'>Home</a><button>Save</button><nav></nav>" * 100
+    )
+    with stats() as query_stats:
+        lint(dom)
+    # html, head and body, then the 300 elements.
+    assert query_stats.nodes_visited == 303
+    # Every name is resolved once, however many rules look at it.
+    assert query_stats.name_resolutions == 300
@@ -0,0 +1,93 @@
+import pickle
+
+import pytest
+
+from selectolax.lexbor import LexborHTMLParser
+
+import unbrowsed.locators
+from unbrowsed import Document, Locator, get_by_role, parse_html
+from unbrowsed.locators import get_locator, hash_html
+from unbrowsed.mutations import insert_child
+
+HTML = """<!doctype html>
+<html>
+<head><title>Shop</title></head>
+<body>
+    <!-- Navigation -->
+    <nav><a href="/">Home</a> text <a href="/cart">Cart</a></nav>
+    <main><p>Intro</p><button>Save</button></main>
+</body>
+</html>
+"""
+
+
+def test_round_trip():
+    dom = parse_html(HTML)
+    locator = get_by_role(dom, "button", name="Save").locator
+    assert isinstance(locator, Locator)
+    assert locator.path == (0, 1, 1, 1)
+
+    restored = pickle.loads(pickle.dumps(locator))
+    assert restored == locator
+    element = restored.resolve(parse_html(HTML))
+    assert element.html == "<button>Save</button>"
+    assert restored.resolve(Document(HTML)).html == element.html
+
+
+def test_every_element():
+    dom = parse_html(HTML)
+    other = LexborHTMLParser(HTML)
+    for element, expected in zip(dom.css("*"), other.css("*")):
+        resolved = get_locator(element).resolve(other)
+        assert resolved.mem_id == expected.mem_id
+
+
+def test_another_document():
+    locator = get_by_role(parse_html(HTML), "link", name="Cart").locator
+    with pytest.raises(ValueError):
+        locator.resolve(parse_html(HTML.replace("Cart", "Basket")))
+    with pytest.raises(ValueError):
+        Locator((0, 5), locator.digest).resolve(parse_html(HTML))
+
+
+def test_tracked_documents_are_hashed_once(monkeypatch):
+    dom = parse_html(HTML, tracked=True)
+    hashed = []
+    monkeypatch.setattr(
+        unbrowsed.locators,
+        "hash_html",
+        lambda html: hashed.append(html) or hash_html(html),
+    )
+    locators = [get_locator(element) for element in dom.css("*")]
+    assert len(hashed) == 1
+    assert locators[0].resolve(dom).tag == "html"
+    assert len(hashed) == 1
+
+    insert_child(
+        dom, dom.css_first("nav"), parse_html("<a>Help</a>").body.child
+    )
+    assert get_locator(dom.css_first("a")).digest != locators[0].digest
+    dom.css_first("nav").insert_child("raw")
+    dom.invalidate()
+    locator = get_locator(dom.css_first("a"))
+    assert len(hashed) == 3
+    assert locator.resolve(parse_html(dom.html)).html == '<a href="/">Home</a>'
+
+
+def test_digest_follows_edits():
+    dom = parse_html(HTML)
+    first = get_locator(dom.css_first("a"))
+
+    insert_child(
+        dom, dom.css_first("nav"), parse_html("<a>Help</a>").body.child
+    )
+    locator = get_locator(dom.css_first("nav").last_child)
+    assert locator.digest != first.digest
+    assert locator.resolve(parse_html(dom.html)).html == "<a>Help</a>"
+
+    dom.css_first("nav").insert_child("raw")
+    edited = get_locator(dom.css_first("a"))
+    assert edited.digest != locator.digest
+    assert edited.resolve(parse_html(dom.html)).html == '<a href="/">Home</a>'
+    with pytest.raises(ValueError):
+        locator.resolve(dom)
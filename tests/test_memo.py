@@ -0,0 +1,151 @@
+import pytest
+
+from unbrowsed import (
+    Document,
+    SubtreeMemo,
+    diff_accessibility,
+    lint,
+    parse_html,
+    stats,
+)
+from unbrowsed.accessibility import walk
+
+HEADER = """
+<header>
+  <h1>Shop</h1>
+  <nav><a href="/">Home</a><a href="/cart">Cart</a><a href="/x"></a></nav>
+</header>
+"""
+
+FOOTER = "<footer><a href='/about'>About</a></footer>"
+
+
+def make_page(content):
+    return parse_html(f"{HEADER}<main>{content}</main>{FOOTER}")
+
+
+def describe(dom, memo=None):
+    return [(node.role, node.name, node.depth) for node in walk(dom, memo)]
+
+
+def test_hits_and_misses():
+    memo = SubtreeMemo()
+    first = make_page("<button>Buy</button>")
+    second = make_page("<button>Sell</button>")
+
+    assert describe(first, memo) == describe(first)
+    assert (memo.hits, memo.misses, len(memo)) == (0, 2, 2)
+    assert describe(second, memo) == describe(second)
+    assert (memo.hits, memo.misses, len(memo)) == (2, 2, 2)
+
+    memo.clear()
+    assert (memo.hits, memo.misses, len(memo)) == (0, 0, 0)
+
+
+def test_stats_and_documents():
+    html = "<nav><a href='/'>Home</a></nav>"
+    memo = SubtreeMemo()
+    with stats() as query_stats:
+        memo.resolve(parse_html(html))
+    assert query_stats.nodes_visited == 2
+    assert len(memo.resolve(Document(html))) == 2
+    assert (memo.hits, memo.misses) == (1, 1)
+
+
+def test_lint():
+    memo = SubtreeMemo()
+    pages = [make_page(f"<button>{i}</button><button></button>") for i in "ab"]
+    assert [lint(page, memo=memo) for page in pages] == [
+        lint(page) for page in pages
+    ]
+    assert [finding.rule for finding in lint(pages[0], memo=memo)] == [
+        "link-name",
+        "button-name",
+    ]
+
+
+def test_fewer_resolutions():
+    memo = SubtreeMemo()
+    lint(make_page("<p>First</p>"), memo=memo)
+    with stats() as query_stats:
+        lint(make_page("<p>Second</p>"), memo=memo)
+    # The header and footer roots are resolved again, and the main landmark
+    # is resolved by the rules.
+    assert query_stats.name_resolutions == 3
+
+
+def test_diff():
+    memo = SubtreeMemo()
+    changes = diff_accessibility(
+        make_page("<button>Buy</button>"),
+        make_page("<button>Sell</button>"),
+        memo=memo,
+    )
+    assert [change.format() for change in changes] == [
+        "~ button 'Buy' -> button 'Sell'"
+    ]
+    assert memo.hits == 2
+
+
+def test_root_role():
+    # A footer is only a contentinfo landmark outside of sectioning content.
+    memo = SubtreeMemo()
+    describe(parse_html(FOOTER), memo)
+    roles = [role for role, _, _ in describe(parse_html(f"<article>{FOOTER}"))]
+    assert roles == ["document", "article", "link"]
+    assert [
+        role for role, _, _ in describe(parse_html(f"<article>{FOOTER}"), memo)
+    ] == roles
+    assert memo.hits == 1
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<nav aria-labelledby='title'><h2 id='title'>Menu</h2></nav>",
+        "<aside><label for='q'>Search</label><input id='q'></aside>",
+        "<aside><input type='text'></aside>",
+        "<aside><table><tr><td>Cell</td></tr></table></aside>",
+    ],
+)
+def test_self_contained(html):
+    memo = SubtreeMemo()
+    assert describe(parse_html(html), memo) == describe(parse_html(html))
+    assert memo.misses == 1
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "<nav aria-labelledby='title'><a href='/'>Home</a></nav>"
+        "<h2 id='title'>Menu</h2>",
+        "<nav><a href='/' aria-describedby='tip'>Home</a></nav>"
+        "<p id='tip'>Start</p>",
+        "<label for='q'>Search</label><aside><input id='q'></aside>",
+        "<table><tr role='complementary'><td>Cell</td></tr></table>",
+        "<table><tr><td role='complementary'>Cell</td></tr></table>",
+    ],
+)
+def test_external_references(html):
+    memo = SubtreeMemo()
+    changed = html.replace("Menu", "Links").replace("Start", "Go")
+    changed = changed.replace("Search", "Find")
+    assert describe(parse_html(html), memo) == describe(parse_html(html))
+    assert describe(parse_html(changed), memo) == describe(parse_html(changed))
+    assert (memo.hits, memo.misses, len(memo)) == (0, 0, 0)
+
+
+def test_eviction():
+    memo = SubtreeMemo(maxsize=2)
+    navs = [parse_html(f"<nav><a href='/'>{i}</a></nav>") for i in "abc"]
+    for dom in navs:
+        list(walk(dom, memo))
+    assert len(memo) == 2
+
+    list(walk(navs[1], memo))
+    assert memo.hits == 1
+    list(walk(navs[0], memo))
+    assert (memo.hits, memo.misses) == (1, 4)
+
+    with pytest.raises(ValueError):
+        SubtreeMemo(maxsize=0)
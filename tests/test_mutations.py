@@ -0,0 +1,260 @@
+import pytest
+
+from selectolax.lexbor import LexborHTMLParser
+
+import unbrowsed
+import unbrowsed.index
+from unbrowsed import Document, get_by_role, parse_html, query_by_role
+from unbrowsed.index import DocumentIndex, get_index, resolve_state
+from unbrowsed.mutations import (
+    decompose,
+    insert_child,
+    remove_attribute,
+    replace_with,
+    set_attribute,
+    unwrap,
+)
+
+HTML = """
+<main>
+    <h1 id="title">Orders</h1>
+    <section aria-labelledby="title">
+        <button aria-describedby="hint">Save</button>
+        <p id="hint">Saves the order</p>
+        <label for="email">Email</label>
+        <input id="email" type="text">
+        <div class="wrapper"><a href="/help">Help</a><b>Bold</b></div>
+    </section>
+    <fieldset disabled>
+        <legend><button>Inside legend</button></legend>
+        <button>Inside</button>
+    </fieldset>
+    <footer>Main footer</footer>
+</main>
+<footer>Page footer</footer>
+"""
+
+ROLES = [
+    "button",
+    "contentinfo",
+    "generic",
+    "heading",
+    "link",
+    "main",
+    "paragraph",
+    "textbox",
+]
+
+
+@pytest.fixture(autouse=True, params=["python", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(unbrowsed.index, "NodeTable", None)
+    return request.param
+
+
+def build(html=HTML):
+    dom = parse_html(html, tracked=True)
+    return dom, prime(dom)
+
+
+def prime(dom):
+    index = get_index(dom)
+    for role in ROLES:
+        index.get_named_elements(role, None)
+    index.get_state(dom.root)
+    return index
+
+
+def ids(elements):
+    return [element.mem_id for element in elements]
+
+
+def assert_matches_rebuild(dom, index):
+    assert get_index(dom) is index
+    fresh = DocumentIndex(dom)
+    for role in ROLES:
+        assert ids(index.get_role_elements(role)) == ids(
+            fresh.get_role_elements(role)
+        )
+        fresh.get_named_elements(role, None)
+        assert index.names[role].keys() == fresh.names[role].keys()
+        for name, elements in index.names[role].items():
+            assert ids(elements) == ids(fresh.names[role][name])
+    for element in dom.css("*"):
+        assert index.get_state(element) == resolve_state(element)
+
+
+def test_decompose():
+    dom, index = build()
+    decompose(dom, dom.css_first("#hint"))
+    decompose(dom, dom.css_first("label"))
+    assert_matches_rebuild(dom, index)
+    assert get_by_role(dom, "button", name="Save", description=None)
+    assert get_by_role(dom, "textbox", name=None)
+
+
+def test_unwrap():
+    dom, index = build()
+    unwrap(dom, dom.css_first(".wrapper"))
+    assert_matches_rebuild(dom, index)
+    assert "<div" not in dom.css_first("section").html
+
+    # Like selectolax, empty elements stay.
+    empty = parse_html("<div></div>")
+    unwrap(empty, empty.css_first("div"))
+    assert empty.css_first("div") is not None
+
+
+def test_replace_with():
+    dom, index = build()
+    other = parse_html("<h1 id='title'>Invoices</h1><p>First</p>")
+    replace_with(dom, dom.css_first("h1"), other.css_first("h1"))
+    replace_with(dom, dom.css_first("a"), "Help")
+    replace_with(dom, dom.css_first("#hint"), other.css_first("p"))
+    replace_with(dom, dom.css_first("main").child, other.css_first("p"))
+    assert_matches_rebuild(dom, index)
+    assert query_by_role(dom, "heading", name="Invoices") is not None
+    assert query_by_role(dom, "link") is None
+
+
+def test_insert_child():
+    dom, index = build()
+    other = parse_html(
+        "<footer>Article footer</footer><label for='email'>Mail</label>"
+        "<legend>First</legend>"
+    )
+    insert_child(dom, dom.css_first("#hint"), ".")
+    replace_with(dom, dom.css_first("h1").child, "Archive")
+    insert_child(dom, dom.css_first("section"), other.css_first("footer"))
+    insert_child(dom, dom.body, other.css_first("label"))
+    label = parse_html("<label for='title'>Heading</label><label for='x'>")
+    insert_child(dom, dom.body, label.css_first("label"))
+    insert_child(dom, dom.body, label.css("label")[1])
+    fieldset = dom.css_first("fieldset")
+    fieldset.css_first("legend").decompose()
+    dom.invalidate()
+    index = prime(dom)
+    insert_child(dom, fieldset, other.css_first("legend"))
+    assert_matches_rebuild(dom, index)
+    assert get_by_role(dom, "heading", name="Archive")
+    assert get_by_role(dom, "button", description="Saves the order.")
+
+
+def test_attributes():
+    dom, index = build()
+    set_attribute(dom, dom.css_first("#hint"), "id", "tip")
+    remove_attribute(dom, dom.css_first("a"), "href")
+    set_attribute(dom, dom.css_first("fieldset button"), "role", "link")
+    remove_attribute(dom, dom.css_first("fieldset"), "disabled")
+    # Removing a missing attribute does nothing.
+    remove_attribute(dom, dom.css_first("fieldset"), "disabled")
+    assert_matches_rebuild(dom, index)
+    assert get_by_role(dom, "button", name="Save", description=None)
+    assert get_by_role(dom, "link", name="Inside legend")
+
+
+def test_landmarks_follow_their_context():
+    dom, index = build("<article></article><footer>Page</footer>")
+    other = parse_html("<div role='main'>Main</div>")
+    insert_child(dom, dom.css_first("article"), other.css_first("div"))
+    assert_matches_rebuild(dom, index)
+    assert query_by_role(dom, "contentinfo") is None
+
+
+def test_index_is_patched():
+    dom, index = build("<p>Filler</p>" * 200 + HTML)
+    other = parse_html("<button>Add</button>")
+    with unbrowsed.stats() as s:
+        insert_child(dom, dom.css_first("main"), other.css_first("button"))
+        assert get_by_role(dom, "button", name="Add")
+    assert s.nodes_visited == 0
+    assert s.name_resolutions < 10
+    assert get_index(dom) is index
+    assert dom.generation == 1
+
+
+def test_stats_are_patched():
+    dom, index = build()
+    stats = index.stats
+    assert stats.elements == len(dom.css("*"))
+    assert stats.tags["button"] == 3
+    assert stats.text_length
+    assert not stats.roles
+    other = parse_html("<p role='Note'>Saved</p>")
+    insert_child(dom, dom.css_first("main"), other.css_first("p"))
+    decompose(dom, dom.css_first("fieldset"))
+    fresh = DocumentIndex(dom).stats
+    assert stats.elements == fresh.elements
+    assert stats.tags == fresh.tags
+    assert stats.roles == fresh.roles == {"note": 1}
+    assert stats.text == fresh.text
+
+
+def test_results_are_dropped():
+    dom, index = build()
+    assert query_by_role(dom, "link", name="Help") is not None
+    decompose(dom, dom.css_first("a"))
+    assert query_by_role(dom, "link", name="Help") is None
+    assert len(index.results) == 1
+
+
+def test_edits_without_an_index():
+    dom = parse_html(HTML, tracked=True)
+    decompose(dom, dom.css_first("h1"))
+    assert dom.generation == 1
+    assert query_by_role(dom, "heading") is None
+
+    # Invalidated after changes made around the helpers.
+    index = get_index(dom)
+    dom.css_first("p").decompose()
+    dom.invalidate()
+    decompose(dom, dom.css_first("a"))
+    assert get_index(dom) is not index
+    assert query_by_role(dom, "paragraph") is None
+
+    document = Document(HTML)
+    decompose(document, document.parse().css_first("h1"))
+    assert query_by_role(document, "heading") is None
+
+    plain = LexborHTMLParser(HTML)
+    decompose(plain, plain.css_first("h1"))
+    assert query_by_role(plain, "heading") is None
+
+
+def test_edits_before_states_are_resolved():
+    dom = parse_html(HTML, tracked=True)
+    index = get_index(dom)
+    index.get_role_elements("link")
+    decompose(dom, dom.css_first("a"))
+    home = parse_html("<a href='/'>Home</a>").css_first("a")
+    insert_child(dom, dom.css_first("main"), home)
+    assert index.states is None
+    assert [link.text() for link in index.get_role_elements("link")] == [
+        "Home"
+    ]
+
+
+def test_tables():
+    dom, index = build("<table><tr><td>Cell</td></tr></table><nav>Nav</nav>")
+    table = index.table
+    unwrap(dom, dom.css_first("table"))
+    assert index.table is table
+    assert_matches_rebuild(dom, index)
+    # Classified after the edit.
+    assert ids(index.get_role_elements("navigation")) == ids(dom.css("nav"))
+    assert ids(index.get_role_elements("cell")) == ids(dom.css("td"))
+
+
+def test_edits_do_not_serialize(monkeypatch):
+    dom, index = build()
+    serialized = []
+    monkeypatch.setattr(
+        type(dom), "html", property(lambda self: serialized.append(self))
+    )
+    decompose(dom, dom.css_first("#hint"))
+    set_attribute(dom, dom.css_first("a"), "role", "button")
+    assert get_by_role(dom, "button", name="Help")
+    assert not serialized
@@ -0,0 +1,124 @@
+import pytest
+
+from unbrowsed import parse_html
+from unbrowsed.resolvers import RoleResolver
+
+pytest.importorskip("numpy")
+
+from unbrowsed.nodetable import NodeTable  # noqa: E402
+
+HTML = """
+<html>
+<body>
+    <header role="Banner">Site</header>
+    <nav aria-label="Main"><a href="/">Home</a><a>Anchor</a></nav>
+    <main>
+        <section><footer>Section footer</footer></section>
+        <div><p role="region">Region</p><footer>Div footer</footer></div>
+        <div><footer>Plain footer</footer></div>
+        <img src="a.png" alt="">
+        <img src="b.png" alt="Logo">
+        <img src="c.png" aria-label="Labelled">
+        <img src="d.png" title="Titled">
+        <img src="e.png">
+        <input type="checkbox">
+        <input type="search">
+        <input type="Radio">
+        <input type="email">
+        <select multiple></select>
+        <select size="3"></select>
+        <select size="1"></select>
+        <select size=" 2 "></select>
+        <select size="abc"></select>
+        <select size="²"></select>
+        <table><tr><td>Cell</td></tr></table>
+        <table role="grid"><tr><td>Grid cell</td></tr></table>
+        <table role="presentation"><tr><td>No role</td></tr></table>
+        <div hidden role="button">Hidden</div>
+    </main>
+    <footer>Page footer</footer>
+</body>
+</html>
+"""
+
+ROLES = [
+    "banner",
+    "button",
+    "cell",
+    "checkbox",
+    "combobox",
+    "contentinfo",
+    "document",
+    "generic",
+    "gridcell",
+    "img",
+    "link",
+    "listbox",
+    "main",
+    "navigation",
+    "presentation",
+    "radio",
+    "region",
+    "searchbox",
+    "textbox",
+]
+
+
+def test_node_table_is_in_document_order():
+    dom = parse_html(HTML)
+    table = NodeTable(dom)
+
+    assert table.nodes == dom.css("*")
+
+
+def test_node_table_columns():
+    dom = parse_html('<div id="a"><p hidden aria-live="polite">x</p></div>')
+    table = NodeTable(dom)
+
+    tags = [table.nodes[i].tag for i in range(len(table))]
+    assert tags == ["html", "head", "body", "div", "p"]
+    assert table.parent.tolist() == [-1, 0, 0, 2, 3]
+    assert table.depth.tolist() == [0, 1, 1, 2, 3]
+    assert table.has_attribute("hidden").tolist() == [
+        False,
+        False,
+        False,
+        False,
+        True,
+    ]
+    assert table.has_attribute("aria-live")[4]
+    assert not table.has_attribute("role").any()
+
+
+@pytest.mark.parametrize("role", ROLES)
+def test_node_table_roles_match_role_resolver(role):
+    dom = parse_html(HTML)
+    table = NodeTable(dom)
+
+    expected = [
+        element
+        for element in dom.css("*")
+        if RoleResolver(element=element, target_role=role).matches()
+    ]
+
+    assert table.get_role_elements(role) == expected
+
+
+def test_node_table_unknown_role():
+    table = NodeTable(parse_html("<p>text</p>"))
+
+    assert table.get_role_elements("tree") == []
+    assert not table.get_role_mask("tree").any()
+
+
+def test_node_table_falls_back_to_role_resolver(monkeypatch):
+    monkeypatch.setattr("unbrowsed.nodetable.VECTORIZED_TAGS", ["a", "img"])
+    dom = parse_html(HTML)
+    table = NodeTable(dom)
+
+    for role in ("cell", "combobox", "contentinfo", "link"):
+        assert table.get_role_elements(role) == [
+            element
+            for element in dom.css("*")
+            if RoleResolver(element=element, target_role=role).matches()
+        ]
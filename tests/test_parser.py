@@ -0,0 +1,101 @@
+import codecs
+
+import pytest
+
+from unbrowsed import (
+    HTMLDocument,
+    get_by_role,
+    get_by_text,
+    parse_html_bytes,
+    parse_html_file,
+)
+from unbrowsed.parser import sniff_encoding
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (b"<p>plain</p>", "utf-8"),
+        (codecs.BOM_UTF8 + b"<p>bom</p>", "utf-8"),
+        (codecs.BOM_UTF16_LE + "<p>bom</p>".encode("utf-16-le"), "utf-16-le"),
+        (codecs.BOM_UTF16_BE + "<p>bom</p>".encode("utf-16-be"), "utf-16-be"),
+        (b'<meta charset="windows-1251"><p></p>', "cp1251"),
+        (b"<META CHARSET=Shift_JIS>", "shift_jis"),
+        (
+            b'<meta http-equiv="Content-Type" '
+            b'content="text/html; charset=koi8-r">',
+            "koi8-r",
+        ),
+        (b'<meta charset="iso-8859-1">', "cp1252"),
+        (b'<meta charset="utf-16">', "utf-8"),
+        (b'<meta charset="no-such-charset">', "utf-8"),
+        (b" " * 1024 + b'<meta charset="windows-1251">', "utf-8"),
+        (
+            codecs.BOM_UTF8 + b'<meta charset="windows-1251">',
+            "utf-8",
+        ),
+    ],
+)
+def test_sniff_encoding(data, expected):
+    assert sniff_encoding(data) == expected
+
+
+def test_parse_html_bytes_utf8():
+    dom = parse_html_bytes("<button>Café</button>".encode())
+    assert isinstance(dom, HTMLDocument)
+    assert get_by_role(dom, "button", name="Café")
+
+
+def test_parse_html_bytes_strips_bom():
+    dom = parse_html_bytes(codecs.BOM_UTF8 + "<p>Café</p>".encode())
+    assert get_by_text(dom, "Café")
+    assert not dom.html.startswith("﻿")
+
+
+def test_parse_html_bytes_declared_charset():
+    html = '<meta charset="windows-1251"><p>Привет</p>'
+    dom = parse_html_bytes(html.encode("windows-1251"))
+    assert get_by_text(dom, "Привет")
+
+
+def test_parse_html_bytes_utf16_bom():
+    data = codecs.BOM_UTF16_LE + "<p>Привет</p>".encode("utf-16-le")
+    assert get_by_text(parse_html_bytes(data), "Привет")
+
+
+def test_parse_html_bytes_explicit_encoding():
+    data = "<p>Привет</p>".encode("koi8-r")
+    assert get_by_text(parse_html_bytes(data, encoding="KOI8-R"), "Привет")
+
+
+def test_parse_html_file(tmp_path):
+    path = tmp_path / "page.html"
+    path.write_bytes(
+        '<meta charset="windows-1252"><label>Año<input></label>'.encode(
+            "cp1252"
+        )
+    )
+    assert get_by_text(parse_html_file(path), "Año")
+    assert get_by_text(parse_html_file(str(path)), "Año")
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        codecs.BOM_UTF8 + "<p>Привет</p>".encode(),
+        codecs.BOM_UTF16_BE + "<p>Привет</p>".encode("utf-16-be"),
+        '<meta charset="koi8-r"><p>Привет</p>'.encode("koi8-r"),
+    ],
+)
+def test_parse_html_file_is_mapped(tmp_path, data):
+    path = tmp_path / "page.html"
+    path.write_bytes(data)
+    dom = parse_html_file(path)
+    assert dom.css_first("p").text() == "Привет"
+    assert "\ufeff" not in dom.html
+
+
+def test_parse_html_file_empty(tmp_path):
+    path = tmp_path / "empty.html"
+    path.write_bytes(b"")
+    assert parse_html_file(path).body is not None
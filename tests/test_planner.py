@@ -0,0 +1,170 @@
+import pytest
+
+from selectolax.lexbor import LexborHTMLParser
+
+import unbrowsed
+import unbrowsed.index
+from unbrowsed import (
+    MultipleElementsFoundError,
+    get_by_text,
+    parse_html,
+    query_all_by_role,
+    query_by_label_text,
+    query_by_role,
+    query_by_text,
+)
+from unbrowsed.index import get_index, resolve_state
+from unbrowsed.matchers import TextMatch
+from unbrowsed.queries import (
+    get_role_tags,
+    plan_role_query,
+    plan_text_query,
+    scan_role_elements,
+)
+
+from .test_index import HTML, ROLES
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(unbrowsed.index, "NodeTable", None)
+    return request.param
+
+
+@pytest.mark.parametrize("role", ROLES + ["dialog"])
+def test_scan_matches_index(role):
+    dom = parse_html(HTML, tracked=True)
+    assert scan_role_elements(dom, role) == get_index(dom).get_role_elements(
+        role
+    )
+
+
+def test_role_tags():
+    assert get_role_tags("heading") == ("h1", "h2", "h3", "h4", "h5", "h6")
+    assert "a" in get_role_tags("link")
+    assert "a" not in get_role_tags("button")
+    assert get_role_tags("dialog") == ()
+
+
+def test_small_document_is_scanned(backend):
+    dom = parse_html(
+        "<main><button>Save</button><p>Text</p></main>", tracked=True
+    )
+    index = get_index(dom)
+    assert plan_role_query(index, "button", "Save")[0] == "scan"
+
+    with unbrowsed.stats() as s:
+        for i in range(20):
+            query_by_role(dom, "button", name=f"Save {i}")
+
+    # The scans pay for the index, which is then built once.
+    assert s.plans["scan"] >= 1
+    assert s.plans["index build"] == 1
+    assert s.plans["index"] == 19 - s.plans["scan"]
+    assert plan_role_query(index, "button", "Save")[0] == "index"
+
+
+def test_index_plans(backend):
+    dom = parse_html("<button>Save</button>" * 10)
+    index = get_index(dom)
+    index.get_role_elements("button")
+    assert plan_role_query(index, "button") == ("index", 0)
+    assert plan_role_query(index, "button", "Save") == ("index build", 0)
+    index.get_named_elements("button", "Save")
+    assert plan_role_query(index, "button", "Save") == ("index", 0)
+    if backend == "numpy":
+        # The table classifies every element already.
+        assert plan_role_query(index, "link") == ("index build", 0)
+
+
+def test_selective_scan():
+    dom = parse_html("<p>filler</p>" * 1000 + "<h2>Title</h2>")
+    with unbrowsed.stats() as s:
+        assert query_by_role(dom, "heading", level=2) is not None
+    assert s.plans == {"scan": 1}
+    # The histogram pass, then the heading itself.
+    assert s.nodes_visited == len(dom.css("*")) + 1
+
+
+def test_plain_parser_is_scanned():
+    dom = LexborHTMLParser("<button>Save</button>")
+    with unbrowsed.stats() as s:
+        for _ in range(10):
+            query_by_role(dom, "button", name="Save")
+    assert s.plans == {"scan": 10}
+
+
+def test_scan_state_filters():
+    dom = parse_html("""
+        <fieldset disabled>
+            <legend><button>Inside legend</button></legend>
+            <legend><button>Second legend</button></legend>
+            <button>Inside</button>
+        </fieldset>
+        <button>Outside</button>
+        """)
+    index = get_index(dom)
+    assert [
+        result.element.text() for result in query_all_by_role(dom, "button")
+    ] == ["Inside legend", "Second legend", "Inside", "Outside"]
+    assert [
+        result.element.text()
+        for result in query_all_by_role(dom, "button", disabled=False)
+    ] == ["Inside legend", "Outside"]
+    assert index.states is None
+
+    for element in dom.css("*"):
+        assert resolve_state(element) == index.get_state(element)
+
+
+def test_text_plans():
+    dom = parse_html(
+        "<main><p>Hello</p><button>Save</button></main>", tracked=True
+    )
+    index = get_index(dom)
+
+    with unbrowsed.stats() as s:
+        assert query_by_text(dom, "Missing") is None
+        assert query_by_label_text(dom, "Missing") is None
+    assert s.plans == {"skip": 2}
+    assert s.text_extractions == 0
+
+    with unbrowsed.stats() as s:
+        assert get_by_text(dom, "Hello").element.tag == "p"
+        assert get_by_text(dom, "Save").element.tag == "button"
+        assert get_by_text(dom, "save", exact=False).element.tag == "main"
+        assert query_by_text(dom, "Sav") is None
+    assert s.plans == {"scan": 1, "index build": 1, "index": 2}
+    assert plan_text_query(index, TextMatch("Hello")) == ("index", 0)
+
+    # Nested matches resolve to the outer element, as with a scan.
+    assert get_by_text(dom, "l", exact=False).element.tag == "main"
+    with pytest.raises(MultipleElementsFoundError):
+        query_by_text(parse_html("<p>A</p><p>A</p>" * 2), "A")
+
+
+def test_budgeted_plans():
+    dom = parse_html(
+        "<main><p>Hello</p><button>Save</button></main>", tracked=True
+    )
+    limits = {"max_nodes": 1_000}
+
+    with unbrowsed.stats() as s:
+        assert query_by_role(dom, "button", name="Save", **limits)
+        assert get_by_text(dom, "Hello", **limits).element.tag == "p"
+        assert get_by_text(dom, "Save", **limits).element.tag == "button"
+        assert query_by_text(dom, "save", exact=False, **limits)
+    assert s.plans == {"scan": 2, "index build": 1, "index": 1}
+
+
+def test_plans_in_stats_dict():
+    dom = parse_html("<button>Save</button>")
+    with unbrowsed.stats() as s:
+        unbrowsed.get_by_role(dom, "button")
+    counters = s.as_dict()
+    assert counters["plans"] == {"scan": 1}
+    assert counters["queries"]["get_by_role"]["plans"] == {"scan": 1}
+    assert counters["queries"]["query_by_role"]["plans"] == {"scan": 1}
@@ -0,0 +1,136 @@
+import pytest
+
+from unbrowsed.mutations import decompose
+from unbrowsed.pytest_plugin import ParseCache
+
+pytest_plugins = ["pytester"]
+
+HTML = "<button>Save</button><button>Cancel</button>"
+
+
+def test_parse_cache_reuses_documents():
+    cache = ParseCache(maxsize=2)
+    document = cache.parse(HTML)
+    assert cache.parse(HTML.encode()) is document
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_parse_cache_accepts_responses():
+    class Response:
+        content = HTML.encode()
+
+    cache = ParseCache(maxsize=2)
+    assert cache.parse(Response()) is cache.parse(HTML)
+
+
+def test_parse_cache_evicts_least_recently_used():
+    cache = ParseCache(maxsize=2)
+    first = cache.parse("<p>1</p>")
+    cache.parse("<p>2</p>")
+    cache.parse("<p>1</p>")
+    cache.parse("<p>3</p>")
+    assert list(cache.entries) and len(cache.entries) == 2
+    assert cache.parse("<p>1</p>") is first
+    assert cache.misses == 3
+
+
+def test_parse_cache_reparses_modified_documents():
+    cache = ParseCache(maxsize=2)
+    document = cache.parse(HTML)
+    assert document.tracked
+    decompose(document, document.css_first("button"))
+    assert cache.parse(HTML) is not document
+
+    document = cache.parse(HTML)
+    document.css_first("button").decompose()
+    document.invalidate()
+    assert cache.parse(HTML) is not document
+
+
+def test_parse_cache_disabled():
+    cache = ParseCache(maxsize=0)
+    assert cache.parse(HTML) is not cache.parse(HTML)
+
+
+@pytest.fixture
+def suite(pytester):
+    pytester.makepyfile("""
+        from unbrowsed import get_by_role, get_by_text
+
+        HTML = "<main>" + "<p>filler</p>" * 50 + "<button>Save</button></main>"
+
+        def test_role(dom):
+            get_by_role(dom(HTML), "button", name="Save")
+
+        def test_text(dom):
+            get_by_text(dom(HTML), "Save")
+
+        def test_no_queries(dom):
+            dom(HTML)
+        """)
+    return pytester
+
+
+def test_plugin_reports_slowest_queries(suite):
+    result = suite.runpytest(
+        "-p", "no:cacheprovider", "--unbrowsed-slowest=10"
+    )
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(
+        [
+            "*unbrowsed slowest queries*",
+            "*ms*nodes*get_by_*test_plugin_reports_slowest_queries.py::*",
+            "slowest tests by query time:",
+            "*parse cache: 2 hits, 1 misses",
+        ]
+    )
+    assert "test_no_queries" not in result.stdout.str()
+
+
+def test_plugin_limits_report(suite):
+    result = suite.runpytest("--unbrowsed-slowest=1")
+    result.assert_outcomes(passed=3)
+    lines = result.stdout.str().splitlines()
+    start = lines.index("slowest tests by query time:")
+    assert "queries" in lines[start + 1]
+    assert lines[start + 2].startswith("parse cache")
+
+
+def test_plugin_report_disabled(suite):
+    result = suite.runpytest()
+    result.assert_outcomes(passed=3)
+    assert "unbrowsed slowest queries" not in result.stdout.str()
+
+
+def test_plugin_records_user_properties(pytester):
+    pytester.makepyfile("""
+        from unbrowsed import query_by_role
+
+        def test_role(dom):
+            query_by_role(dom("<button>Save</button>"), "button")
+        """)
+    result = pytester.runpytest(
+        "--junitxml=report.xml", "--unbrowsed-slowest=10"
+    )
+    result.assert_outcomes(passed=1)
+    report = (pytester.path / "report.xml").read_text()
+    assert 'name="unbrowsed_query_seconds"' in report
+    assert 'name="unbrowsed_nodes_visited"' in report
+
+
+def test_plugin_keeps_the_slowest_query(pytester):
+    pytester.makepyfile("""
+        from unbrowsed import query_by_text
+
+        def test_small(dom):
+            query_by_text(dom("<p>Small</p>"), "Small")
+
+        def test_large(dom):
+            query_by_text(dom("<p>Large</p>" * 5000), "Missing")
+        """)
+    result = pytester.runpytest("--unbrowsed-slowest=1")
+    result.assert_outcomes(passed=2)
+    lines = result.stdout.str().splitlines()
+    start = lines.index("slowest tests by query time:")
+    assert "test_large" in lines[start - 2]
+    assert "test_small" not in "\n".join(lines[:start])
@@ -0,0 +1,180 @@
+import pytest
+
+from selectolax.lexbor import LexborHTMLParser
+
+from unbrowsed import (
+    MultipleElementsFoundError,
+    get_all_by_role,
+    get_by_role,
+    parse_html,
+    query_all_by_role,
+    query_by_role,
+)
+from unbrowsed.index import get_index, resolve_state
+
+
+def test_query_by_role_with_level():
+    html = """
+    <h1>Title</h1>
+    <h2>Section</h2>
+    <div role="heading" aria-level="3">Subsection</div>
+    """
+    dom = parse_html(html)
+
+    assert get_by_role(dom, "heading", level=1).to_have_text_content("Title")
+    assert get_by_role(dom, "heading", level=2).to_have_text_content("Section")
+    assert get_by_role(dom, "heading", level=3).to_have_text_content(
+        "Subsection"
+    )
+    assert query_by_role(dom, "heading", level=4) is None
+
+
+def test_query_by_role_with_checked():
+    html = """
+    <input type="checkbox" checked aria-label="Accept">
+    <input type="checkbox" aria-label="Subscribe">
+    <div role="checkbox" aria-checked="mixed" aria-label="All"></div>
+    """
+    dom = parse_html(html)
+
+    result = get_by_role(dom, "checkbox", checked=True)
+    assert result.to_have_attribute("aria-label", "Accept")
+
+    result = get_by_role(dom, "checkbox", checked=False)
+    assert result.to_have_attribute("aria-label", "Subscribe")
+
+    result = get_by_role(dom, "checkbox", checked="mixed")
+    assert result.to_have_attribute("aria-label", "All")
+
+    result = get_by_role(dom, "checkbox", checked="true")
+    assert result.to_have_attribute("aria-label", "Accept")
+    result = get_by_role(dom, "checkbox", checked="False")
+    assert result.to_have_attribute("aria-label", "Subscribe")
+    result = get_by_role(dom, "checkbox", checked="MIXED")
+    assert result.to_have_attribute("aria-label", "All")
+
+
+def test_query_by_role_with_pressed_expanded_selected():
+    html = """
+    <button aria-pressed="true">Bold</button>
+    <button aria-pressed="false">Italic</button>
+    <button aria-expanded="true">Menu</button>
+    <div role="tab" aria-selected="true">First</div>
+    <div role="tab" aria-selected="false">Second</div>
+    """
+    dom = parse_html(html)
+
+    assert get_by_role(dom, "button", pressed=True).to_have_text_content(
+        "Bold"
+    )
+    assert get_by_role(dom, "button", pressed=False).to_have_text_content(
+        "Italic"
+    )
+    assert get_by_role(dom, "button", pressed="true").to_have_text_content(
+        "Bold"
+    )
+    assert get_by_role(dom, "button", expanded=True).to_have_text_content(
+        "Menu"
+    )
+    assert query_by_role(dom, "button", expanded=False) is None
+    assert get_by_role(dom, "tab", selected=True).to_have_text_content("First")
+
+
+def test_query_by_role_with_disabled():
+    html = """
+    <button disabled>Save</button>
+    <button>Cancel</button>
+    <button aria-disabled="true">Delete</button>
+    """
+    dom = parse_html(html)
+
+    disabled = query_all_by_role(dom, "button", disabled=True)
+    assert [r.element.text() for r in disabled] == ["Save", "Delete"]
+    assert get_by_role(dom, "button", disabled=False).to_have_text_content(
+        "Cancel"
+    )
+
+
+def test_query_by_role_disabled_inherited_from_fieldset():
+    html = """
+    <fieldset disabled>
+      <legend><input type="checkbox" aria-label="Toggle"></legend>
+      <input type="text" aria-label="Name">
+      <div><button>Send</button></div>
+    </fieldset>
+    <button>Help</button>
+    """
+    dom = parse_html(html)
+
+    assert get_by_role(dom, "textbox", disabled=True)
+    assert get_by_role(dom, "button", disabled=True).to_have_text_content(
+        "Send"
+    )
+    assert get_by_role(dom, "button", disabled=False).to_have_text_content(
+        "Help"
+    )
+    assert get_by_role(dom, "checkbox", disabled=False)
+
+
+def test_fieldset_disables_only_form_controls():
+    html = """
+    <fieldset disabled>
+      <a href="/help">Help</a>
+      <div role="button">Custom</div>
+      <button>Send</button>
+    </fieldset>
+    """
+    for dom in [parse_html(html), LexborHTMLParser(html)]:
+        assert get_by_role(dom, "link", disabled=False)
+        assert get_by_role(dom, "button", disabled=False).to_have_text_content(
+            "Custom"
+        )
+        assert get_by_role(dom, "button", disabled=True).to_have_text_content(
+            "Send"
+        )
+    dom = parse_html(html)
+    index = get_index(dom)
+    for element in dom.css("*"):
+        assert index.get_state(element) == resolve_state(element)
+
+
+def test_query_by_role_combines_states_with_name():
+    html = """
+    <input type="checkbox" id="a" checked><label for="a">A</label>
+    <input type="checkbox" id="b" checked><label for="b">B</label>
+    """
+    dom = parse_html(html)
+
+    with pytest.raises(MultipleElementsFoundError):
+        query_by_role(dom, "checkbox", checked=True)
+
+    result = get_by_role(dom, "checkbox", checked=True, name="B")
+    assert result.to_have_attribute("id", "b")
+
+
+def test_get_all_by_role_with_states():
+    html = """
+    <h2>One</h2>
+    <h2>Two</h2>
+    <h3>Three</h3>
+    """
+    dom = parse_html(html)
+
+    assert len(get_all_by_role(dom, "heading", level=2)) == 2
+
+
+def test_query_by_role_states_on_plain_parser():
+    dom = LexborHTMLParser("<h1>Title</h1><h2>Section</h2>")
+
+    assert get_by_role(dom, "heading", level=2).to_have_text_content("Section")
+
+
+def test_state_table_follows_mutations():
+    dom = parse_html('<input type="checkbox" aria-label="Accept">')
+
+    assert query_by_role(dom, "checkbox", checked=True) is None
+
+    dom.css_first("input").attrs["checked"] = ""
+    dom.invalidate()
+
+    assert get_by_role(dom, "checkbox", checked=True)
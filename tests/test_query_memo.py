@@ -0,0 +1,161 @@
+import pytest
+
+from selectolax.lexbor import LexborHTMLParser
+
+import unbrowsed
+import unbrowsed.queries
+from unbrowsed import (
+    Document,
+    MultipleElementsFoundError,
+    get_by_role,
+    parse_html,
+    query_all_by_role,
+    query_by_label_text,
+    query_by_role,
+    query_by_text,
+)
+from unbrowsed.index import get_index
+
+HTML = """
+<main>
+    <label>Email <input type="text"></label>
+    <button>Save</button>
+    <button>Cancel</button>
+    <p>Saved drafts</p>
+</main>
+"""
+
+
+def test_repeated_queries_are_remembered():
+    dom = parse_html(HTML, tracked=True)
+    first = get_by_role(dom, "button", name="Save")
+
+    with unbrowsed.stats() as s:
+        assert get_by_role(dom, "button", name="Save") is first
+        assert query_by_role(dom, "BUTTON", None, "Save") is first
+        assert query_by_role(dom, "button", name="Save", timeout=5) is first
+        assert query_by_text(dom, "Saved drafts") is query_by_text(
+            dom, " Saved drafts ", exact=1
+        )
+        assert query_by_label_text(dom, "Email") is not None
+
+    assert s.plans == {"memo": 4, "scan": 2}
+    assert s.name_resolutions == 0
+
+    with unbrowsed.stats() as s:
+        query_by_role(dom, "button", name="Save", current=False)
+        query_by_role(dom, "button", name="Save", current="false")
+    assert s.plans["memo"] == 1
+
+
+def test_multiple_elements_are_remembered():
+    dom = parse_html(HTML, tracked=True)
+    with pytest.raises(MultipleElementsFoundError):
+        query_by_role(dom, "button")
+
+    with unbrowsed.stats() as s:
+        with pytest.raises(MultipleElementsFoundError) as exc_info:
+            get_by_role(dom, "button")
+    assert s.plans == {"memo": 1}
+    assert "get_all_by_role" in exc_info.value.message
+
+
+def test_lists_are_copied():
+    dom = parse_html(HTML, tracked=True)
+    results = query_all_by_role(dom, "button")
+    results.clear()
+    assert len(query_all_by_role(dom, "button")) == 2
+
+
+def test_edits_drop_the_results():
+    dom = parse_html(HTML, tracked=True)
+    assert get_by_role(dom, "button", name="Save")
+
+    dom.css_first("button").decompose()
+    dom.invalidate()
+    assert query_by_role(dom, "button", name="Save") is None
+
+    other = parse_html("<button>Cancel</button>")
+    dom.css_first("main").insert_child(other.css_first("button"))
+    dom.invalidate()
+    with pytest.raises(MultipleElementsFoundError):
+        query_by_role(dom, "button", name="Cancel")
+    assert dom.generation == 2
+
+
+def test_raw_edits_of_tracked_documents_are_not_noticed():
+    dom = parse_html(HTML, tracked=True)
+    assert get_by_role(dom, "button", name="Save")
+    dom.css_first("button").decompose()
+    assert get_by_role(dom, "button", name="Save")
+    dom.invalidate()
+    assert query_by_role(dom, "button", name="Save") is None
+
+
+def test_raw_edits_of_untracked_documents_drop_the_results():
+    dom = parse_html("<button>Save</button><button>Cancel</button>")
+    assert query_by_role(dom, "button", name="Save") is not None
+
+    dom.css_first("button").decompose()
+    with unbrowsed.stats() as s:
+        assert query_by_role(dom, "button", name="Save") is None
+    assert "memo" not in s.plans
+
+
+def test_invalidate():
+    dom = parse_html(HTML, tracked=True)
+    index = get_index(dom)
+    query_by_role(dom, "button", name="Save")
+    assert len(index.results) == 1
+
+    dom.invalidate()
+    assert get_index(dom) is not index
+    with unbrowsed.stats() as s:
+        query_by_role(dom, "button", name="Save")
+    assert "memo" not in s.plans
+
+
+def test_unkept_documents_are_queried_every_time():
+    dom = LexborHTMLParser(HTML)
+    with unbrowsed.stats() as s:
+        query_by_role(dom, "button", name="Save")
+        query_by_role(dom, "button", name="Save")
+    assert "memo" not in s.plans
+
+    page = Document(HTML)
+    query_by_role(page, "button", name="Save")
+    with unbrowsed.stats() as s:
+        query_by_role(page, "button", name="Save")
+    assert "memo" not in s.plans
+
+    page = Document(HTML, tracked=True)
+    assert query_by_text(page, "Missing") is None
+    assert page.parsed is None
+    # The first query parses the source, the next ones remember.
+    query_by_role(page, "button", name="Save")
+    assert query_by_role(page, "button", name="Save") is query_by_role(
+        page, "button", name="Save"
+    )
+
+
+def test_max_results(monkeypatch):
+    monkeypatch.setattr(unbrowsed.queries, "MAX_RESULTS", 2)
+    dom = parse_html(HTML, tracked=True)
+    for name in ["Save", "Cancel", "Missing"]:
+        query_by_role(dom, "button", name=name)
+    assert len(get_index(dom).results) == 2
+
+    with unbrowsed.stats() as s:
+        query_by_role(dom, "button", name="Missing")
+    assert "memo" not in s.plans
+
+    with pytest.raises(MultipleElementsFoundError):
+        query_by_role(dom, "button")
+    assert len(get_index(dom).results) == 2
+
+
+def test_invalid_arguments_are_not_chained():
+    dom = parse_html(HTML, tracked=True)
+    with pytest.raises(TypeError) as exc_info:
+        query_by_role(dom, "button", bogus=1)
+    assert exc_info.value.__context__ is None
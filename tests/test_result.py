@@ -0,0 +1,97 @@
+import pytest
+
+import unbrowsed
+from unbrowsed import (
+    MultipleElementsFoundError,
+    Result,
+    get_by_label_text,
+    get_by_role,
+    get_by_text,
+    parse_html,
+    query_all_by_role,
+    query_by_text,
+    user,
+)
+from unbrowsed.index import get_index
+from unbrowsed.matchers import TextMatch
+from unbrowsed.mutations import set_attribute
+
+HTML = """
+<main>
+    <p id="hint">Saves the draft</p>
+    <button aria-describedby="hint">Save</button>
+    <label for="notes">Notes</label>
+    <textarea id="notes">Draft</textarea>
+    <a href="/">Home</a>
+</main>
+"""
+
+
+def test_slots():
+    result = Result(parse_html(HTML).css_first("button"))
+    assert not hasattr(result, "__dict__")
+    with pytest.raises(AttributeError):
+        result.extra = 1  # type: ignore
+
+
+def test_known_values_are_kept():
+    dom = parse_html(HTML)
+    button = get_by_role(dom, "BUTTON", name="Save", description=None)
+    paragraph = get_by_text(dom, "Saves the draft")
+
+    with unbrowsed.stats() as s:
+        assert button.role == "button"
+        assert button.name == "Save"
+        assert paragraph.text == "Saves the draft"
+        assert paragraph.to_have_text_content("Saves the draft")
+    assert s.name_resolutions == 0
+
+    assert [result.role for result in query_all_by_role(dom, "link")] == [
+        "link"
+    ]
+
+
+def test_values_are_computed_once():
+    dom = parse_html(HTML)
+    button = get_by_role(dom, "button")
+    with unbrowsed.stats() as s:
+        for _ in range(3):
+            assert button.name == "Save"
+            assert button.description == "Saves the draft"
+    assert s.name_resolutions == 1
+    assert s.description_resolutions == 1
+
+    notes = get_by_label_text(dom, "Notes")
+    assert notes.role == "textbox"
+    assert notes.name == "Notes"
+    assert notes.text == "Draft"
+    assert Result(dom.css_first("main").parent).role == "generic"
+
+
+def test_edits_drop_the_values():
+    dom = parse_html(HTML)
+    notes = get_by_label_text(dom, "Notes")
+    assert notes.to_have_text_content("Draft")
+    user.type(dom, notes, " two")
+    assert notes.to_have_text_content("Draft two")
+
+    button = get_by_role(dom, "button", name="Save")
+    set_attribute(dom, button.element, "role", "link")
+    assert button.role == "link"
+
+
+def test_text_is_read_from_the_element():
+    dom = parse_html(HTML)
+    paragraph = get_by_text(dom, "Saves the draft")
+    assert paragraph.to_have_text_content("Saves the draft")
+    paragraph.element.insert_child(".")
+    assert paragraph.text == "Saves the draft."
+    assert paragraph.to_have_text_content("Saves the draft.")
+
+
+def test_error_shows_the_searched_text():
+    dom = parse_html("<p>Draft one</p><p>Draft two</p>")
+    get_index(dom).get_text_elements(TextMatch("Draft", exact=False))
+    with pytest.raises(MultipleElementsFoundError) as exc_info:
+        query_by_text(dom, "draft", exact=False)
+    assert "with text 'draft'" in exc_info.value.message
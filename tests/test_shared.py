@@ -0,0 +1,131 @@
+import multiprocessing
+
+import pytest
+
+from unbrowsed import (
+    MultipleElementsFoundError,
+    parse_html,
+    query_all_by_role,
+    query_by_role,
+    query_by_text,
+)
+from unbrowsed.shared import SharedDocument
+
+HTML = """
+<html>
+<body>
+    <nav aria-label="Main">
+        <a href="/" aria-current="true">Home</a>
+        <a href="/about">About</a>
+    </nav>
+    <main>
+        <h1>Welcome</h1>
+        <p>Plain <b>bold</b> text, café</p>
+        <button aria-describedby="hint">Save</button>
+        <button>Cancel</button>
+        <p id="hint">Saves the draft</p>
+        <label for="q">Search</label><input id="q" type="search">
+        <div role="button">Custom</div>
+        <p>Note</p>
+        <p>Note</p>
+    </main>
+</body>
+</html>
+"""
+
+
+@pytest.fixture
+def shared():
+    with SharedDocument.publish(parse_html(HTML)) as document:
+        yield document
+
+
+def position_of(dom, result):
+    return dom.css("*").index(result.element)
+
+
+def test_shared_document_matches_queries(shared):
+    dom = parse_html(HTML)
+
+    for role, kwargs in [
+        ("button", {"name": "Save"}),
+        ("button", {"description": "Saves the draft"}),
+        ("link", {"current": True}),
+        ("navigation", {"name": "Main"}),
+        ("searchbox", {"name": "Search"}),
+        ("heading", {}),
+    ]:
+        expected = query_by_role(dom, role, **kwargs)
+        assert shared.query_by_role(role, **kwargs) == position_of(
+            dom, expected
+        )
+
+    assert shared.query_by_role("button", name="Missing") is None
+    assert shared.query_by_role("tree") is None
+
+    assert shared.query_all_by_role("button") == [
+        position_of(dom, result) for result in query_all_by_role(dom, "button")
+    ]
+
+    for text, exact in [("Welcome", True), ("café", False), ("bold", True)]:
+        expected = query_by_text(dom, text, exact=exact)
+        assert shared.query_by_text(text, exact=exact) == position_of(
+            dom, expected
+        )
+
+    assert shared.query_by_text("Nothing") is None
+
+
+def test_shared_document_multiple_matches(shared):
+    with pytest.raises(MultipleElementsFoundError):
+        shared.query_by_role("button")
+
+    with pytest.raises(MultipleElementsFoundError):
+        shared.query_by_text("Note")
+
+
+def test_shared_document_nested_matches():
+    dom = parse_html("<a><!-- Anchor --><b>Inner</b></a>")
+    expected = query_by_role(dom, "generic")
+
+    with SharedDocument.publish(dom) as document:
+        assert document.query_by_role("generic") == position_of(dom, expected)
+
+
+def test_shared_document_text_and_names(shared):
+    dom = parse_html(HTML)
+    elements = dom.css("*")
+
+    assert len(shared) == len(elements)
+    for position, element in enumerate(elements):
+        assert shared.get_text(position) == element.text(deep=True, strip=True)
+
+
+def run_queries(name, queries):
+    with SharedDocument.attach(name) as document:
+        return [document.query_by_role(role, name=n) for role, n in queries]
+
+
+def test_shared_document_across_processes(shared):
+    queries = [("button", "Save"), ("button", "Cancel"), ("link", "About")]
+    context = multiprocessing.get_context("spawn")
+
+    with context.Pool(2) as pool:
+        results = pool.starmap(
+            run_queries,
+            [(shared.name, queries[:2]), (shared.name, queries[2:])],
+        )
+
+    assert results[0] + results[1] == [
+        shared.query_by_role(role, name=name) for role, name in queries
+    ]
+    assert run_queries(shared.name, queries) == results[0] + results[1]
+
+
+def test_attached_document_cannot_unlink(shared):
+    document = SharedDocument.attach(shared.name)
+    try:
+        with pytest.raises(RuntimeError):
+            document.unlink()
+    finally:
+        document.close()
@@ -0,0 +1,143 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import unbrowsed
+from unbrowsed import (
+    MultipleElementsFoundError,
+    get_by_label_text,
+    get_by_role,
+    parse_html,
+    query_by_text,
+)
+from unbrowsed.index import get_index
+from unbrowsed.instrumentation import ACTIVE, CALLS
+
+HTML = """
+<main>
+    <h1 id="title">Profile</h1>
+    <label for="email">Email</label>
+    <input id="email" type="text" aria-describedby="hint">
+    <p id="hint">We never share it</p>
+    <button>Save</button>
+    <button>Cancel</button>
+</main>
+"""
+
+
+def test_stats_counts_text_query():
+    dom = parse_html(HTML, tracked=True)
+    elements = len(dom.css("*:not(html):not(body)"))
+
+    with unbrowsed.stats() as s:
+        query_by_text(dom, "Profile")
+
+    assert s.calls == 1
+    assert s.nodes_visited == elements
+    assert s.text_extractions == elements
+    assert s.selector_calls == 1
+    assert s.queries["query_by_text"].calls == 1
+    assert s.queries["query_by_text"].elapsed > 0
+
+
+def test_stats_counts_role_query_and_index_reuse():
+    dom = parse_html(HTML, tracked=True)
+
+    with unbrowsed.stats() as first:
+        get_by_role(dom, "button", name="Save")
+
+    assert first.calls == 1
+    assert first.role_candidates == 2
+    assert first.name_resolutions == 2
+    assert first.nodes_visited >= len(dom.css("*"))
+    assert first.queries["get_by_role"].name_resolutions == 2
+    assert first.queries["query_by_role"].name_resolutions == 2
+    assert first.plans == {"scan": 1}
+
+    # Small documents are scanned until the scans cost more than the index.
+    with unbrowsed.stats() as repeated:
+        for i in range(10):
+            unbrowsed.query_by_role(dom, "button", name=f"Missing {i}")
+
+    assert repeated.plans["index build"] == 1
+
+    with unbrowsed.stats() as second:
+        get_by_role(dom, "button", name="Cancel")
+
+    assert second.plans == {"index": 1}
+    assert second.name_resolutions == 0
+    assert second.nodes_visited == 0
+
+
+def test_stats_counts_description_and_idref_lookups():
+    dom = parse_html(HTML, tracked=True)
+
+    with unbrowsed.stats() as s:
+        get_by_role(dom, "textbox", description="We never share it")
+        get_by_label_text(dom, "Email")
+
+    assert s.calls == 2
+    assert s.description_resolutions == 1
+    assert s.queries["get_by_label_text"].selector_calls == 2
+
+
+def test_stats_counts_state_table_builds():
+    dom = parse_html(HTML, tracked=True)
+    index = get_index(dom)
+
+    with unbrowsed.stats() as s:
+        index.get_state(dom.root)
+
+    assert s.nodes_visited == len(dom.css("*"))
+
+
+def test_stats_blocks_nest_and_clean_up():
+    dom = parse_html(HTML, tracked=True)
+
+    with unbrowsed.stats() as outer:
+        query_by_text(dom, "Save")
+        with unbrowsed.stats() as inner:
+            with pytest.raises(MultipleElementsFoundError):
+                get_by_role(dom, "button")
+
+    assert outer.calls == 2
+    assert inner.calls == 1
+    assert inner.as_dict()["queries"]["get_by_role"]["calls"] == 1
+    assert ACTIVE.get() == ()
+    assert CALLS.get() == ()
+
+
+def test_stats_blocks_are_per_thread():
+    dom = parse_html(HTML, tracked=True)
+    with unbrowsed.stats() as s:
+        with ThreadPoolExecutor(1) as executor:
+            assert executor.submit(query_by_text, dom, "Save").result()
+    assert s.calls == 0
+
+
+def test_stats_disabled_records_nothing():
+    dom = parse_html(HTML, tracked=True)
+    with unbrowsed.stats() as s:
+        pass
+
+    get_by_role(dom, "button", name="Save")
+
+    assert s.calls == 0
+    assert s.queries == {}
+
+
+def test_stats_history_lists_top_level_calls():
+    dom = parse_html(HTML, tracked=True)
+
+    with unbrowsed.stats() as s:
+        query_by_text(dom, "Save")
+        with pytest.raises(MultipleElementsFoundError):
+            get_by_role(dom, "button", name=None)
+
+    assert [call.name for call in s.history] == [
+        "query_by_text",
+        "get_by_role",
+    ]
+    assert s.history[0].describe() == "query_by_text('Save')"
+    assert s.history[1].describe() == "get_by_role('button', name=None)"
+    assert sum(call.nodes_visited for call in s.history) == s.nodes_visited
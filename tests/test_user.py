@@ -0,0 +1,254 @@
+import pytest
+
+import unbrowsed
+from unbrowsed import (
+    get_by_label_text,
+    get_by_role,
+    parse_html,
+    query_all_by_role,
+    query_by_role,
+    user,
+)
+from unbrowsed.index import DocumentIndex, get_index, resolve_state
+from unbrowsed.mutations import remove_attribute
+
+HTML = """
+<form>
+    <label for="email">Email</label>
+    <input id="email" type="text" name="email" maxlength="12">
+    <label>Notes <textarea name="notes">Hi</textarea></label>
+    <label><input type="checkbox" name="news" aria-label="News"></label>
+    <input type="checkbox" name="terms" value="yes" aria-label="Terms">
+    <input type="radio" name="plan" value="free" aria-label="Free" checked>
+    <input type="radio" name="plan" value="pro" aria-label="Pro">
+    <select name="size" aria-label="Size">
+        <option>Small</option>
+        <option value="m">Medium</option>
+        <option disabled>Large</option>
+    </select>
+    <select name="tags" aria-label="Tags" multiple>
+        <option selected>a</option>
+        <option>b</option>
+    </select>
+    <fieldset disabled><input type="text" name="code" value="x"></fieldset>
+    <input type="text" value="unnamed">
+    <button name="action" value="save">Save</button>
+    <button name="action" value="send">Send</button>
+</form>
+<form><input type="radio" name="plan" value="other" aria-label="Other"></form>
+"""
+
+
+def checked_names(dom, role):
+    return [
+        result.element.attributes.get("aria-label")
+        for result in query_all_by_role(dom, role, checked=True)
+    ]
+
+
+def test_type_and_clear():
+    dom = parse_html(HTML)
+    email = get_by_label_text(dom, "Email")
+    user.type(dom, email, "ada@")
+    user.type(dom, email, "example.com")
+    assert email.to_have_attribute("value", "ada@example.")
+
+    notes = dom.css_first("textarea")
+    user.type(dom, notes, " there")
+    assert notes.text() == "Hi there"
+    user.clear(dom, notes)
+    assert notes.text() == ""
+    user.clear(dom, email)
+    assert email.to_have_attribute("value", "")
+
+    with pytest.raises(ValueError):
+        user.type(dom, get_by_role(dom, "button", name="Save"), "x")
+    with pytest.raises(ValueError):
+        user.type(dom, dom.css_first("input[name='code']"), "x")
+
+
+def test_checkboxes():
+    dom = parse_html(HTML)
+    assert checked_names(dom, "checkbox") == []
+
+    user.click(dom, get_by_role(dom, "checkbox", name="Terms"))
+    user.click(dom, dom.css_first("label:nth-of-type(3)"))
+    assert checked_names(dom, "checkbox") == ["News", "Terms"]
+
+    user.click(dom, get_by_role(dom, "checkbox", name="News"))
+    assert checked_names(dom, "checkbox") == ["Terms"]
+
+
+def test_radio_groups():
+    dom = parse_html(HTML)
+    user.click(dom, get_by_role(dom, "radio", name="Other"))
+    assert checked_names(dom, "radio") == ["Free", "Other"]
+
+    user.click(dom, get_by_role(dom, "radio", name="Pro"))
+    assert checked_names(dom, "radio") == ["Pro", "Other"]
+    user.click(dom, get_by_role(dom, "radio", name="Pro"))
+    assert checked_names(dom, "radio") == ["Pro", "Other"]
+
+
+def test_aria_checkboxes():
+    dom = parse_html("<div role='switch' aria-checked='false'>Dark</div>")
+    user.click(dom, get_by_role(dom, "switch"))
+    assert get_by_role(dom, "switch", checked=True)
+    user.click(dom, get_by_role(dom, "switch"))
+    assert get_by_role(dom, "switch", checked=False)
+
+
+def test_select_options():
+    dom = parse_html(HTML)
+    size = get_by_role(dom, "combobox", name="Size")
+    user.select_options(dom, size, "m")
+    assert size.element.css_first("option[value='m']").attributes == {
+        "value": "m",
+        "selected": "",
+    }
+    user.select_options(dom, size, "Small")
+    assert len(size.element.css("[selected]")) == 1
+
+    with pytest.raises(ValueError):
+        user.select_options(dom, size, ["Small", "m"])
+    with pytest.raises(ValueError):
+        user.select_options(dom, size, "Large")
+    with pytest.raises(ValueError):
+        user.select_options(dom, size, "Huge")
+
+    tags = get_by_role(dom, "listbox", name="Tags")
+    user.select_options(dom, tags, ["b", "a"])
+    assert len(tags.element.css("[selected]")) == 2
+    user.click(dom, tags.element.css_first("option"))
+    assert [option.text() for option in tags.element.css("[selected]")] == [
+        "b"
+    ]
+
+
+def test_submit():
+    dom = parse_html(HTML)
+    assert user.submit(dom, dom.css_first("form")) == [
+        ("email", ""),
+        ("notes", "Hi"),
+        ("plan", "free"),
+        ("size", "Small"),
+        ("tags", "a"),
+    ]
+
+    user.type(dom, get_by_label_text(dom, "Email"), "ada@example")
+    user.click(dom, get_by_role(dom, "checkbox", name="News"))
+    user.click(dom, get_by_role(dom, "checkbox", name="Terms"))
+    user.select_options(dom, get_by_role(dom, "combobox"), "Medium")
+    assert user.submit(dom, get_by_role(dom, "button", name="Send")) == [
+        ("email", "ada@example"),
+        ("notes", "Hi"),
+        ("news", "on"),
+        ("terms", "yes"),
+        ("plan", "free"),
+        ("size", "m"),
+        ("tags", "a"),
+        ("action", "send"),
+    ]
+
+    other = parse_html("<button>Go</button>")
+    with pytest.raises(ValueError):
+        user.submit(other, other.css_first("button"))
+
+
+def test_index_is_kept_current():
+    dom = parse_html("<p>Filler</p>" * 200 + HTML, tracked=True)
+    index = get_index(dom)
+    index.get_named_elements("checkbox", "Terms")
+    index.get_state(dom.root)
+    assert query_by_role(dom, "checkbox", checked=True) is None
+
+    with unbrowsed.stats() as s:
+        user.click(dom, get_by_role(dom, "checkbox", name="Terms"))
+        assert get_by_role(dom, "checkbox", checked=True)
+    assert s.plans == {"index": 2}
+    assert s.nodes_visited == 0
+    assert get_index(dom) is index
+
+    fresh = DocumentIndex(dom)
+    for role in ["checkbox", "radio", "combobox"]:
+        assert [e.mem_id for e in index.get_role_elements(role)] == [
+            e.mem_id for e in fresh.get_role_elements(role)
+        ]
+    for element in dom.css("input, option"):
+        assert index.get_state(element) == resolve_state(element)
+
+
+def test_labels_and_options():
+    dom = parse_html(
+        "<label for='c'>Remember</label><input id='c' type='checkbox'>"
+        "<label>Nothing</label><button>Save</button>"
+        "<input type='text' readonly aria-label='Code'>"
+        "<select aria-label='Size'><option>S</option><option>M</option>"
+        "</select><div><option>Loose</option></div>"
+    )
+    user.click(dom, dom.css_first("label"))
+    assert "checked" in dom.css_first("input").attributes
+    user.click(dom, dom.css_first("label:nth-of-type(2)"))
+    user.click(dom, get_by_role(dom, "button"))
+
+    user.click(dom, dom.css("option")[1])
+    assert dom.css_first("option[selected]").text() == "M"
+    user.select_options(dom, dom.css_first("select"), "M")
+    user.click(dom, dom.css("option")[2])
+    assert len(dom.css("[selected]")) == 1
+
+    with pytest.raises(ValueError):
+        user.type(dom, get_by_role(dom, "textbox", name="Code"), "x")
+    with pytest.raises(ValueError):
+        user.select_options(dom, get_by_role(dom, "button"), "S")
+
+
+def test_radio_groups_outside_forms():
+    dom = parse_html(
+        "<input type='radio' name='a' aria-label='A' checked>"
+        "<input type='radio' name='a' aria-label='B'>"
+        "<input type='radio' name='a' aria-label='C'>"
+        "<input type='radio' aria-label='D'>"
+    )
+    user.click(dom, get_by_role(dom, "radio", name="B"))
+    user.click(dom, get_by_role(dom, "radio", name="D"))
+    assert checked_names(dom, "radio") == ["B", "D"]
+
+
+def test_disabled_optgroups():
+    dom = parse_html(
+        "<form><select name='size'>"
+        "<optgroup label='Old' disabled><option>XS</option></optgroup>"
+        "<optgroup label='New'><option>S</option></optgroup>"
+        "</select></form>",
+        tracked=True,
+    )
+    select = dom.css_first("select")
+    with pytest.raises(ValueError):
+        user.select_options(dom, select, "XS")
+    assert user.submit(dom, dom.css_first("form")) == [("size", "S")]
+
+    option = dom.css_first("option")
+    assert resolve_state(option).disabled
+    index = get_index(dom)
+    assert index.get_state(option).disabled
+    remove_attribute(dom, dom.css_first("optgroup"), "disabled")
+    assert not index.get_state(option).disabled
+
+
+def test_submit_values():
+    dom = parse_html(
+        "<form>"
+        "<input type='checkbox' name='empty' value='' checked>"
+        "<input type='checkbox' name='bare' value checked>"
+        "<input type='file' name='file'>"
+        "<select name='sized' size='3'><option>a</option></select>"
+        "<select name='off'><option disabled>a</option></select>"
+        "<input type='submit' name='go' value='Go'>"
+        "</form>"
+    )
+    assert user.submit(dom, dom.css_first("input[type='submit']")) == [
+        ("empty", ""),
+        ("bare", ""),
+        ("go", "Go"),
+    ]